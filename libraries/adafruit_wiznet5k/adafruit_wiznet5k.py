@@ -32,10 +32,10 @@ Implementation Notes
 from __future__ import annotations
 
 try:
-    from typing import TYPE_CHECKING, Optional, Union, Tuple
+    from typing import TYPE_CHECKING, Optional, Union, Tuple, Sequence, List, Callable
 
     if TYPE_CHECKING:
-        from circuitpython_typing import WriteableBuffer
+        from circuitpython_typing import ReadableBuffer, WriteableBuffer
         import busio
         import digitalio
 
@@ -55,7 +55,11 @@ from micropython import const
 from adafruit_bus_device.spi_device import SPIDevice
 import adafruit_wiznet5k.adafruit_wiznet5k_dhcp as dhcp
 import adafruit_wiznet5k.adafruit_wiznet5k_dns as dns
-from adafruit_wiznet5k.adafruit_wiznet5k_debug import debug_msg
+from adafruit_wiznet5k.adafruit_wiznet5k_debug import (
+    debug_msg,
+    Instrumentation,
+    INSTRUMENTED_METHODS,
+)
 
 # *** Wiznet Common Registers ***
 _REG_MR = {"w5100s": const(0x0000), "w5500": const(0x0000)}
@@ -80,6 +84,10 @@ _REG_LINK_FLAG = {
     "w6100": const(0x3000),
 }
 _REG_RCR = {"w5100s": const(0x0019), "w5500": const(0x001B), "w6100": const(0x4204)}
+# Socket Interrupt, one bit per socket.
+_REG_SIR = {"w5100s": const(0x0015), "w5500": const(0x0017), "w6100": const(0x2101)}
+# Socket Interrupt Mask.
+_REG_SIMR = {"w5100s": const(0x0016), "w5500": const(0x0018), "w6100": const(0x2114)}
 _REG_RTR = {"w5100s": const(0x0017), "w5500": const(0x0019), "w6100": const(0x4200)}
 
 # *** Wiznet Socket Registers ***
@@ -89,6 +97,25 @@ _REG_SNMR = const(0x0000)
 _REG_SNCR = {"w5100s": const(0x0001), "w5500": const(0x0001), "w6100": const(0x0010)}
 # Socket n Interrupt.
 _REG_SNIR = {"w5100s": const(0x0002), "w5500": const(0x0002), "w6100": const(0x0020)}
+# Socket n Interrupt Mask.
+_REG_SNIMR = {"w5100s": const(0x002C), "w5500": const(0x002C), "w6100": const(0x0024)}
+# Socket n Interrupt Clear (Sn_IR is read only on the W6100).
+_REG_SNIRCLR = {
+    "w5100s": const(0x0002),
+    "w5500": const(0x0002),
+    "w6100": const(0x0028),
+}
+# Socket n RX and TX Buffer Size, in KB.
+_REG_SNRXBUF_SIZE = {
+    "w5100s": const(0x001E),
+    "w5500": const(0x001E),
+    "w6100": const(0x0220),
+}
+_REG_SNTXBUF_SIZE = {
+    "w5100s": const(0x001F),
+    "w5500": const(0x001F),
+    "w6100": const(0x0200),
+}
 # Socket n Status.
 _REG_SNSR = {"w5100s": const(0x0003), "w5500": const(0x0003), "w6100": const(0x0030)}
 # Socket n Source Port.
@@ -113,6 +140,15 @@ _REG_SNTX_FSR = {
 }
 # TX Write Pointer.
 _REG_SNTX_WR = {"w5100s": const(0x0024), "w5500": const(0x0024), "w6100": const(0x020C)}
+# Retransmission Time and Retry Count, the W5500 only has the common RTR and RCR.
+_REG_SNRTR = {"w5100s": const(0x0032), "w5500": None, "w6100": const(0x0180)}
+_REG_SNRCR = {"w5100s": const(0x0034), "w5500": None, "w6100": const(0x0184)}
+# Keep Alive Timer, in units of 5 seconds.
+_REG_SNKPALVTR = {
+    "w5100s": const(0x002F),
+    "w5500": const(0x002F),
+    "w6100": const(0x0188),
+}
 
 # SNSR Commands
 SNSR_SOCK_CLOSED = const(0x00)
@@ -145,13 +181,25 @@ _CMD_SOCK_RECV = const(0x40)
 # Socket n Interrupt Register
 _SNIR_SEND_OK = const(0x10)
 SNIR_TIMEOUT = const(0x08)
-_SNIR_RECV = const(0x04)
+SNIR_RECV = const(0x04)
 SNIR_DISCON = const(0x02)
-_SNIR_CON = const(0x01)
+SNIR_CON = const(0x01)
+# Socket interrupts enabled in interrupt mode.
+_SNIMR_ALL = const(0x1F)
+# Seconds to sleep between reads of the INTn pin while waiting for an interrupt.
+_IRQ_SLEEP = 0.001
 
 _CH_SIZE = const(0x100)
-_SOCK_SIZE = const(0x800)  # MAX W5k socket size
-_SOCK_MASK = const(0x7FF)
+# Socket buffer sizes in KB, each of TX and RX memory is shared by the sockets.
+_BUFFER_SIZES = (0, 1, 2, 4, 8, 16)
+_BUFFER_MEMORY = {"w5100s": const(8), "w5500": const(16), "w6100": const(16)}
+_DEFAULT_BUFFER_SIZE = const(2)
+# Start of the W5100S socket registers, TX memory and RX memory.
+_W5100S_SOCKET_BASE = const(0x0400)
+_W5100S_TX_BASE = const(0x4000)
+_W5100S_RX_BASE = const(0x6000)
+# Longest keep-alive interval in seconds.
+_KEEPALIVE_MAX = const(1275)
 # Register commands
 _MR_RST = const(0x80)  # Mode Register RST
 # Socket mode register
@@ -180,6 +228,258 @@ def _unprettyfy(data: str, seperator: str, correct_length: int) -> bytes:
     raise ValueError("Invalid IP or MAC address.")
 
 
+class _Chip:
+    """
+    Register addresses, SPI framing and socket buffer access for one chip type.
+
+    An instance is bound to the interface when the chip is detected, so register
+    access neither looks up addresses by chip name nor compares chip names.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    name = None
+    # Sn_SR to Sn_RX_RSR are close enough to read in one burst.
+    status_in_block = True
+
+    def __init__(self, readinto: Callable, write: Callable) -> None:
+        """
+        :param Callable readinto: The interface's _readinto method.
+        :param Callable write: The interface's _write method.
+        """
+        self._readinto = readinto
+        self._write = write
+        name = self.name
+        self.max_sockets = _MAX_SOCK_NUM[name]
+        self.memory = _BUFFER_MEMORY[name]
+        # Common registers.
+        self.mr = _REG_MR.get(name)
+        self.gar = _REG_GAR[name]
+        self.subr = _REG_SUBR[name]
+        self.versionr = _REG_VERSIONR[name]
+        self.shar = _REG_SHAR[name]
+        self.sipr = _REG_SIPR[name]
+        self.link_flag = _REG_LINK_FLAG[name]
+        self.rcr = _REG_RCR[name]
+        self.sir = _REG_SIR[name]
+        self.simr = _REG_SIMR[name]
+        self.rtr = _REG_RTR[name]
+        # Socket registers.
+        self.sncr = _REG_SNCR[name]
+        self.snir = _REG_SNIR[name]
+        self.snimr = _REG_SNIMR[name]
+        self.snirclr = _REG_SNIRCLR[name]
+        self.snrxbuf_size = _REG_SNRXBUF_SIZE[name]
+        self.sntxbuf_size = _REG_SNTXBUF_SIZE[name]
+        self.snsr = _REG_SNSR[name]
+        self.snport = _REG_SNPORT[name]
+        self.sndipr = _REG_SNDIPR[name]
+        self.sndport = _REG_SNDPORT[name]
+        self.snrx_rsr = _REG_SNRX_RSR[name]
+        self.snrx_rd = _REG_SNRX_RD[name]
+        self.sntx_fsr = _REG_SNTX_FSR[name]
+        self.sntx_wr = _REG_SNTX_WR[name]
+        self.snrtr = _REG_SNRTR[name]
+        self.snrcr = _REG_SNRCR[name]
+        self.snkpalvtr = _REG_SNKPALVTR[name]
+        # Per socket address offsets and control bytes for the socket registers.
+        self.sock_base = [0] * self.max_sockets
+        self.sock_read = [0] * self.max_sockets
+        self.sock_write = [0] * self.max_sockets
+        # Socket TX and RX buffer sizes in bytes, set by set_buffer_sizes().
+        self.tx_sizes = [0] * self.max_sockets
+        self.rx_sizes = [0] * self.max_sockets
+
+    def set_buffer_sizes(self, tx_sizes: List[int], rx_sizes: List[int]) -> None:
+        """
+        Record the socket buffer sizes written to the chip.
+
+        :param List[int] tx_sizes: The TX buffer size of each socket in bytes.
+        :param List[int] rx_sizes: The RX buffer size of each socket in bytes.
+        """
+        self.tx_sizes = tx_sizes
+        self.rx_sizes = rx_sizes
+
+    @staticmethod
+    def udp_header(header: ReadableBuffer) -> Tuple[bytes, int, int]:
+        """
+        Split the 8 byte header the chip puts before each received UDP message.
+
+        :param ReadableBuffer header: The header.
+
+        :return Tuple[bytes, int, int]: The source IPv4 address, the source port and
+            the UDP data length.
+        """
+        return (
+            bytes(header[:4]),
+            int.from_bytes(header[4:6], "big"),
+            int.from_bytes(header[6:8], "big"),
+        )
+
+
+class _W5500(_Chip):
+    """The W5500, which selects register blocks with a control byte."""
+
+    name = "w5500"
+
+    def __init__(self, readinto: Callable, write: Callable) -> None:
+        super().__init__(readinto, write)
+        sockets = range(self.max_sockets)
+        self.sock_read = [(sock << 5) + 0x08 for sock in sockets]
+        self.sock_write = [(sock << 5) + 0x0C for sock in sockets]
+        self._tx_buffer = [(sock << 5) + 0x14 for sock in sockets]
+        self._rx_buffer = [(sock << 5) + 0x18 for sock in sockets]
+
+    @staticmethod
+    def read_header(header: bytearray, address: int, control: int) -> None:
+        """Fill in the SPI frame header to read from address."""
+        header[0] = address >> 8
+        header[1] = address & 0xFF
+        header[2] = control
+
+    write_header = read_header
+
+    def socket_readinto(
+        self, sock: int, pointer: int, buffer: WriteableBuffer, length: int
+    ) -> None:
+        """
+        Read from a socket's RX buffer, the chip wraps the address around the buffer.
+
+        :param int sock: Socket number.
+        :param int pointer: The Sn_RX_RD pointer to read from.
+        :param WriteableBuffer buffer: Buffer to read into.
+        :param int length: Number of bytes to read.
+        """
+        self._readinto(pointer, self._rx_buffer[sock], buffer, length)
+
+    def socket_write(
+        self, sock: int, pointer: int, buffer: ReadableBuffer, length: int
+    ) -> None:
+        """
+        Write to a socket's TX buffer, the chip wraps the address around the buffer.
+
+        :param int sock: Socket number.
+        :param int pointer: The Sn_TX_WR pointer to write at.
+        :param ReadableBuffer buffer: The data to write.
+        :param int length: Number of bytes to write.
+        """
+        self._write(pointer, self._tx_buffer[sock], buffer, length)
+
+
+class _W6100(_W5500):
+    """The W6100, with the W5500 SPI frame but different register addresses."""
+
+    name = "w6100"
+    status_in_block = False
+
+    @staticmethod
+    def udp_header(header: ReadableBuffer) -> Tuple[bytes, int, int]:
+        """
+        Split the 8 byte header the chip puts before each received UDP message.
+
+        :param ReadableBuffer header: The header.
+
+        :return Tuple[bytes, int, int]: The source IPv4 address, the source port and
+            the UDP data length.
+        """
+        # Packet info and length, then the source address and port.
+        return (
+            bytes(header[2:6]),
+            int.from_bytes(header[6:8], "big"),
+            int.from_bytes(header[:2], "big") & 0x07FF,
+        )
+
+
+class _W5100S(_Chip):
+    """The W5100S, with a flat address space and an opcode in the SPI frame."""
+
+    name = "w5100s"
+
+    def __init__(self, readinto: Callable, write: Callable) -> None:
+        super().__init__(readinto, write)
+        self.sock_base = [
+            _W5100S_SOCKET_BASE + sock * _CH_SIZE for sock in range(self.max_sockets)
+        ]
+        self._tx_bases = [_W5100S_TX_BASE] * self.max_sockets
+        self._rx_bases = [_W5100S_RX_BASE] * self.max_sockets
+
+    def set_buffer_sizes(self, tx_sizes: List[int], rx_sizes: List[int]) -> None:
+        """
+        Record the socket buffer sizes written to the chip.
+
+        The W5100S allocates memory to the sockets in order, from the start of the TX
+        and RX memory.
+
+        :param List[int] tx_sizes: The TX buffer size of each socket in bytes.
+        :param List[int] rx_sizes: The RX buffer size of each socket in bytes.
+        """
+        super().set_buffer_sizes(tx_sizes, rx_sizes)
+        for sock in range(1, self.max_sockets):
+            self._tx_bases[sock] = self._tx_bases[sock - 1] + tx_sizes[sock - 1]
+            self._rx_bases[sock] = self._rx_bases[sock - 1] + rx_sizes[sock - 1]
+
+    @staticmethod
+    def read_header(header: bytearray, address: int, control: int) -> None:
+        """Fill in the SPI frame header to read from address."""
+        header[0] = 0x0F
+        header[1] = address >> 8
+        header[2] = address & 0xFF
+
+    @staticmethod
+    def write_header(header: bytearray, address: int, control: int) -> None:
+        """Fill in the SPI frame header to write to address."""
+        header[0] = 0xF0
+        header[1] = address >> 8
+        header[2] = address & 0xFF
+
+    def socket_readinto(
+        self, sock: int, pointer: int, buffer: WriteableBuffer, length: int
+    ) -> None:
+        """
+        Read from a socket's RX buffer, wrapping around the end of the buffer.
+
+        :param int sock: Socket number.
+        :param int pointer: The Sn_RX_RD pointer to read from.
+        :param WriteableBuffer buffer: Buffer to read into.
+        :param int length: Number of bytes to read.
+        """
+        size = self.rx_sizes[sock]
+        base = self._rx_bases[sock]
+        offset = pointer & (size - 1)
+        if offset + length > size:
+            # The data wraps around the end of the ring buffer, read it with two
+            # transfers into the same buffer.
+            split_point = size - offset
+            self._readinto(base + offset, 0x00, buffer, split_point)
+            self._readinto(
+                base, 0x00, memoryview(buffer)[split_point:], length - split_point
+            )
+        else:
+            self._readinto(base + offset, 0x00, buffer, length)
+
+    def socket_write(
+        self, sock: int, pointer: int, buffer: ReadableBuffer, length: int
+    ) -> None:
+        """
+        Write to a socket's TX buffer, wrapping around the end of the buffer.
+
+        :param int sock: Socket number.
+        :param int pointer: The Sn_TX_WR pointer to write at.
+        :param ReadableBuffer buffer: The data to write.
+        :param int length: Number of bytes to write.
+        """
+        size = self.tx_sizes[sock]
+        base = self._tx_bases[sock]
+        offset = pointer & (size - 1)
+        if offset + length > size:
+            split_point = size - offset
+            self._write(base + offset, 0x00, buffer, split_point)
+            self._write(
+                base, 0x00, memoryview(buffer)[split_point:], length - split_point
+            )
+        else:
+            self._write(base + offset, 0x00, buffer, length)
+
+
 class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-attributes
     """Interface for WIZNET5K module."""
 
@@ -187,8 +487,6 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
     _UDP_MODE = const(0x02)
     _TLS_MODE = const(0x03)  # This is NOT currently implemented
 
-    _sockets_reserved = []
-
     # pylint: disable=too-many-arguments
     def __init__(
         self,
@@ -199,6 +497,9 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         mac: Union[MacAddressRaw, str] = _DEFAULT_MAC,
         hostname: Optional[str] = None,
         debug: bool = False,
+        irq: Optional[digitalio.DigitalInOut] = None,
+        tx_buffer_sizes: Optional[Sequence[int]] = None,
+        rx_buffer_sizes: Optional[Sequence[int]] = None,
     ) -> None:
         """
         :param busio.SPI spi_bus: The SPI bus the Wiznet module is connected to.
@@ -210,10 +511,24 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :param str hostname: The desired hostname, with optional {} to fill in the MAC
             address, defaults to None.
         :param bool debug: Enable debugging output, defaults to False.
+        :param digitalio.DigitalInOut irq: Optional pin connected to the chip's active
+            low INTn output, defaults to None. When set, socket events are latched from
+            the interrupt registers and waits watch the pin instead of polling the
+            socket registers over SPI.
+        :param Sequence[int] tx_buffer_sizes: Optional TX buffer size in KB for each
+            socket, defaults to None which allocates 2 KB to every socket. Sizes must be
+            0, 1, 2, 4, 8 or 16 KB, with a total of at most 16 KB on the W5500 and
+            W6100 or 8 KB on the W5100S. A socket with a 0 KB buffer is never
+            allocated.
+        :param Sequence[int] rx_buffer_sizes: Optional RX buffer size in KB for each
+            socket, defaults to None. The same rules as tx_buffer_sizes apply.
+
+        :raises ValueError: If the buffer sizes are invalid for the chip.
         """
         self._debug = debug
         self._chip_type = None
         self._device = SPIDevice(spi_bus, cs, baudrate=8000000, polarity=0, phase=0)
+        self._instrumentation = None
         # init c.s.
         self._cs = cs
 
@@ -234,16 +549,55 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         # Buffer for reading params from module
         self._pbuff = bytearray(8)
         self._rxbuf = bytearray(_MAX_PACKET)
+        # Reusable buffers for the SPI frame header and register values, so
+        # register access does not allocate memory.
+        self._header = bytearray(3)
+        self._regbuf = bytearray(16)
 
         # attempt to initialize the module
-        self._ch_base_msb = 0
+        self._chip = None
+        # Shadow copies of the network configuration registers, by address. Written
+        # through by the setters and cleared when the chip is reset.
+        self._config = {}
+        # Link state seen at the last PHY read, and when socket operations next read
+        # the PHY instead of trusting it.
+        self._link_up = None
+        self._link_next_check = 0.0
+        # Seconds between PHY link checks made by socket operations.
+        self.link_check_interval = 1.0
+        # Called with the new link state when the link goes up or down.
+        self.link_callback = None
         self._src_ports_in_use = []
+        # Reservations of sockets 1 and up, and the unreserved sockets in the order
+        # get_socket() tries them.
+        self._sockets_reserved = []
+        self._free_sockets = []
+        self._tx_buffer_sizes = tx_buffer_sizes
+        self._rx_buffer_sizes = rx_buffer_sizes
         self._wiznet_chip_init()
 
+        # Setup interrupt pin.
+        self._irq = irq
+        self._sock_events = [0] * self.max_sockets
+        # Counts the times events have been latched, so that a task waiting on the
+        # latched events can tell when other code has serviced INTn.
+        self._interrupt_count = 0
+        # Sockets with a SEND command in progress, and the number of bytes written to
+        # their TX buffers since the last SEND command.
+        self._send_pending = [False] * self.max_sockets
+        self._tx_unsent = [0] * self.max_sockets
+        if self._irq is not None:
+            self._irq.switch_to_input()
+            self._setup_interrupts()
+
         # Set MAC address
         self.mac_address = mac
         self.src_port = 0
         self._dns = b"\x00\x00\x00\x00"
+        self._secondary_dns = None
+        self._dns_client = None
+        # Cache of DNS lookups, set to None to disable caching.
+        self.dns_cache = dns.DNSCache()
         # udp related
         self.udp_from_ip = [b"\x00\x00\x00\x00"] * self.max_sockets
         self.udp_from_port = [0] * self.max_sockets
@@ -261,18 +615,43 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         if is_dhcp:
             self.set_dhcp(hostname)
 
-    def set_dhcp(self, hostname: Optional[str] = None) -> None:
+    def set_dhcp(
+        self,
+        hostname: Optional[str] = None,
+        blocking: bool = True,
+        lease_store: Optional[WriteableBuffer] = None,
+        lease_offset: int = 0,
+    ) -> None:
         """
         Initialize the DHCP client and attempt to retrieve and set network
         configuration from the DHCP server.
 
         :param Optional[str] hostname: The desired hostname for the DHCP server with
             optional {} to fill in the MAC address, defaults to None.
+        :param bool blocking: Wait until a lease is established, defaults to True. If
+            False, the lease is obtained by calling maintain_dhcp_lease() from the main
+            loop, and the IP address is 0.0.0.0 until it has been obtained.
+        :param Optional[WriteableBuffer] lease_store: Non-volatile memory, such as
+            microcontroller.nvm, to save the lease in, so that after a restart the same
+            lease is requested again in a single exchange. Leases are only saved once
+            time.time() has been set, e.g. by NTP. Defaults to None.
+        :param int lease_offset: Offset of the 16 byte lease record in lease_store,
+            defaults to 0.
 
         :raises RuntimeError: If DHCP lease cannot be established.
         """
         debug_msg("* Initializing DHCP", self._debug)
-        self._dhcp_client = dhcp.DHCP(self, self.mac_address, hostname, self._debug)
+        self._dhcp_client = dhcp.DHCP(
+            self,
+            self.mac_address,
+            hostname,
+            self._debug,
+            lease_store=lease_store,
+            lease_offset=lease_offset,
+        )
+        if not blocking:
+            self._dhcp_client.maintain_dhcp_lease()
+            return
         if self._dhcp_client.request_dhcp_lease():
             debug_msg(
                 "Found DHCP Server:\nIP: {}\n  Subnet Mask: {}\n  GW Addr: {}"
@@ -284,7 +663,10 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             raise RuntimeError("Failed to configure DHCP Server!")
 
     def maintain_dhcp_lease(self) -> None:
-        """Maintain the DHCP lease."""
+        """
+        Maintain the DHCP lease. Call this regularly, each call sends a DHCP message
+        or checks for one response at most.
+        """
         if self._dhcp_client:
             self._dhcp_client.maintain_dhcp_lease()
 
@@ -292,24 +674,157 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         """
         Convert a hostname to a packed 4-byte IP Address.
 
+        Lookups are cached in dns_cache for the time to live given by the DNS server,
+        and failed lookups for a few seconds.
+
         :param str hostname: The host name to be converted.
 
         :return bytes: The IPv4 address as a 4 byte array.
 
         :raises RuntimeError: If the DNS lookup fails.
+        :raises ConnectionError: If the Ethernet link is down.
+        """
+        return self.get_host_addresses(hostname)[0]
+
+    def get_host_addresses(self, hostname: str) -> List[bytes]:
+        """
+        Convert a hostname to all its packed 4-byte IP addresses, so that a connection
+        can be tried to the next address if the first is unreachable.
+
+        Lookups are cached in dns_cache, as for get_host_by_name().
+
+        :param str hostname: The host name to be converted.
+
+        :return List[bytes]: The IPv4 addresses as 4 byte arrays.
+
+        :raises RuntimeError: If the DNS lookup fails.
+        :raises ConnectionError: If the Ethernet link is down.
         """
         debug_msg("Get host by name", self._debug)
         if isinstance(hostname, str):
             hostname = bytes(hostname, "utf-8")
-        # Return IP assigned by DHCP
-        _dns_client = dns.DNS(
-            self, self.pretty_ip(bytearray(self._dns)), debug=self._debug
-        )
-        ipv4 = _dns_client.gethostbyname(hostname)
-        debug_msg("* Resolved IP: {}".format(ipv4), self._debug)
-        if ipv4 == -1:
+        addresses = self._cached_hosts(hostname)
+        if addresses is not None:
+            return addresses
+        try:
+            addresses, ttl = self.dns_client.query_all(hostname)
+        except RuntimeError:
+            if self.dns_cache is not None:
+                self.dns_cache.add(hostname, None)
+            raise
+        return self._resolved_hosts(hostname, addresses, ttl)
+
+    def get_hosts_by_name(self, hostnames: List[str]) -> List[Optional[bytes]]:
+        """
+        Convert several host names to packed 4-byte IP addresses, with the DNS queries
+        for them in flight at the same time.
+
+        :param List[str] hostnames: The host names to be converted.
+
+        :return List[Optional[bytes]]: The IPv4 addresses as 4 byte arrays, in the
+            order of the host names. None for a host name that could not be resolved.
+        """
+        debug_msg("Get hosts by name", self._debug)
+        hostnames = [
+            bytes(hostname, "utf-8") if isinstance(hostname, str) else hostname
+            for hostname in hostnames
+        ]
+        addresses = {}
+        queries = {}
+        for hostname in hostnames:
+            if hostname in addresses or hostname in queries:
+                continue
+            try:
+                addresses[hostname] = self._cached_hosts(hostname)
+            except RuntimeError:
+                continue
+            if addresses[hostname] is None:
+                queries[hostname] = self.dns_client.start_query(hostname)
+        while queries:
+            time.sleep(0.01)
+            self._dns_client.poll()
+            for hostname, query_id in tuple(queries.items()):
+                result = self._dns_client.result(query_id)
+                if result is not None:
+                    del queries[hostname]
+                    try:
+                        addresses[hostname] = self._resolved_hosts(hostname, *result)
+                    except RuntimeError:
+                        pass
+        return [
+            addresses[hostname][0] if addresses.get(hostname) else None
+            for hostname in hostnames
+        ]
+
+    @property
+    def dns_client(self) -> dns.DNS:
+        """
+        The DNS client for host name lookups. It queries the DNS server from ifconfig,
+        then the secondary DNS server.
+        """
+        servers = [
+            server
+            for server in (self._dns, self._secondary_dns)
+            if server is not None and any(server)
+        ]
+        if self._dns_client is None:
+            self._dns_client = dns.DNS(self, servers, debug=self._debug)
+        else:
+            self._dns_client.servers = servers
+        return self._dns_client
+
+    @property
+    def secondary_dns(self) -> Optional[bytes]:
+        """
+        The DNS server to query when the DNS server from ifconfig does not respond,
+        None for no secondary DNS server. Set from the DHCP lease.
+        """
+        return self._secondary_dns
+
+    @secondary_dns.setter
+    def secondary_dns(self, address: Optional[IpAddress4Raw]) -> None:
+        if address is not None:
+            if len(address) != 4:
+                raise ValueError("IPv4 address must be 4 bytes.")
+            address = bytes(address)
+        self._secondary_dns = address
+
+    def _cached_hosts(self, hostname: bytes) -> Optional[List[bytes]]:
+        """
+        The cached addresses of a host name.
+
+        :return Optional[List[bytes]]: The IPv4 addresses, None if the host name is not
+            cached.
+
+        :raises RuntimeError: If a failed lookup of the host name is cached.
+        """
+        if self.dns_cache is None:
+            return None
+        cached, addresses = self.dns_cache.lookup_all(hostname)
+        if cached:
+            debug_msg("* Cached IP: {}".format(addresses), self._debug)
+            if addresses is None:
+                raise RuntimeError("Failed to resolve hostname!")
+        return addresses
+
+    def _resolved_hosts(
+        self, hostname: bytes, addresses: Union[int, List[bytes]], ttl: int
+    ) -> List[bytes]:
+        """
+        Cache the result of a DNS lookup.
+
+        :return List[bytes]: The IPv4 addresses.
+
+        :raises RuntimeError: If the DNS lookup failed.
+        """
+        debug_msg("* Resolved IP: {}".format(addresses), self._debug)
+        if isinstance(addresses, int):
+            if self.dns_cache is not None:
+                self.dns_cache.add(hostname, None)
             raise RuntimeError("Failed to resolve hostname!")
-        return ipv4
+        if self.dns_cache is not None:
+            self.dns_cache.add(hostname, addresses, ttl)
+        return addresses
 
     @property
     def max_sockets(self) -> int:
@@ -318,7 +833,50 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         :return int: Maximum supported sockets.
         """
-        return _MAX_SOCK_NUM[self._chip_type]
+        return self._chip.max_sockets
+
+    @property
+    def interrupt_mode(self) -> bool:
+        """
+        Whether socket events are signalled by the INTn pin.
+
+        :return bool: True if an interrupt pin is in use.
+        """
+        return self._irq is not None
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        """
+        The statistics collector if instrumentation is enabled.
+
+        :return Optional[Instrumentation]: The statistics collector, None if
+            instrumentation is disabled.
+        """
+        return self._instrumentation
+
+    def enable_instrumentation(
+        self, methods: Sequence[str] = INSTRUMENTED_METHODS
+    ) -> Instrumentation:
+        """
+        Start counting the SPI transactions, the bytes moved and the time spent, in
+        total and for each instrumented method. Use snapshot() and reset() on the
+        returned object to read and zero the statistics.
+
+        :param Sequence[str] methods: Names of the methods to instrument, defaults to
+            get_socket, socket_available, socket_connect, socket_read,
+            socket_read_into, socket_write, socket_send, read_udp and read_udp_into.
+
+        :return Instrumentation: The statistics collector.
+        """
+        if self._instrumentation is None:
+            self._instrumentation = Instrumentation(self, methods)
+        return self._instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Stop instrumentation and remove its overhead."""
+        if self._instrumentation is not None:
+            self._instrumentation.remove()
+            self._instrumentation = None
 
     @property
     def chip(self) -> str:
@@ -336,7 +894,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         :return bytes: IP address as four bytes.
         """
-        return self._read(_REG_SIPR[self._chip_type], 0x00, 4)
+        return self._read_config(self._chip.sipr, 4)
 
     @staticmethod
     def pretty_ip(ipv4: bytes) -> str:
@@ -373,7 +931,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         :return bytes: Six byte MAC address.
         """
-        return self._read(_REG_SHAR[self._chip_type], 0x00, 6)
+        return self._read_config(self._chip.shar, 6)
 
     @mac_address.setter
     def mac_address(self, address: Union[MacAddressRaw, str]) -> None:
@@ -392,7 +950,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             if len(address) != 6:
                 raise ValueError()
             # Bytes conversion will raise ValueError if values are not 0-255
-            self._write(_REG_SHAR[self._chip_type], 0x04, bytes(address))
+            self._write_config(self._chip.shar, bytes(address))
         except ValueError:
             # pylint: disable=raise-missing-from
             raise ValueError("Invalid MAC address.")
@@ -423,11 +981,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :raises ValueError: If the socket number is out of range.
         """
         self._sock_num_in_range(socket_num)
-        for octet in range(4):
-            self._pbuff[octet] = self._read_socket_register(
-                socket_num, _REG_SNDIPR[self._chip_type] + octet
-            )
-        return self.pretty_ip(self._pbuff[:4])
+        return self.pretty_ip(self._read_sndipr(socket_num))
 
     def remote_port(self, socket_num: int) -> int:
         """
@@ -440,7 +994,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :raises ValueError: If the socket number is out of range.
         """
         self._sock_num_in_range(socket_num)
-        return self._read_two_byte_sock_reg(socket_num, _REG_SNDPORT[self._chip_type])
+        return self._read_two_byte_sock_reg(socket_num, self._chip.sndport)
 
     @property
     def link_status(self) -> bool:
@@ -448,13 +1002,21 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         Physical hardware (PHY) connection status.
 
         Whether the WIZnet hardware is physically connected to an Ethernet network.
+        The PHY is read every time, and link_callback is called if the link has gone
+        up or down since the last read.
 
         :return bool: True if the link is up, False if the link is down.
         """
-        return bool(
-            int.from_bytes(self._read(_REG_LINK_FLAG[self._chip_type], 0x00), "big")
-            & 0x01
-        )
+        link_up = bool(self._read_register(self._chip.link_flag, 0x00) & 0x01)
+        self._link_next_check = time.monotonic() + self.link_check_interval
+        if link_up != self._link_up:
+            self._link_up = link_up
+            debug_msg(
+                "Ethernet link is {}".format("up" if link_up else "down"), self._debug
+            )
+            if self.link_callback is not None:
+                self.link_callback(link_up)
+        return link_up
 
     @property
     def ifconfig(self) -> Tuple[bytes, bytes, bytes, bytes]:
@@ -466,8 +1028,8 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         """
         return (
             self.ip_address,
-            self._read(_REG_SUBR[self._chip_type], 0x00, 4),
-            self._read(_REG_GAR[self._chip_type], 0x00, 4),
+            self._read_config(self._chip.subr, 4),
+            self._read_config(self._chip.gar, 4),
             self._dns,
         )
 
@@ -486,10 +1048,12 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
                 raise ValueError("IPv4 address must be 4 bytes.")
         ip_address, subnet_mask, gateway_address, dns_server = params
 
-        self._write(_REG_SIPR[self._chip_type], 0x04, bytes(ip_address))
-        self._write(_REG_SUBR[self._chip_type], 0x04, bytes(subnet_mask))
-        self._write(_REG_GAR[self._chip_type], 0x04, bytes(gateway_address))
+        self._write_config(self._chip.sipr, bytes(ip_address))
+        self._write_config(self._chip.subr, bytes(subnet_mask))
+        self._write_config(self._chip.gar, bytes(gateway_address))
 
+        if bytes(dns_server) != self._dns and self.dns_cache is not None:
+            self.dns_cache.clear()
         self._dns = bytes(dns_server)
 
     # *** Public Socket Methods ***
@@ -514,8 +1078,15 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             self._debug,
         )
         self._sock_num_in_range(socket_num)
+        if self._irq is not None:
+            # No SPI traffic unless the chip has signalled received data.
+            self._service_interrupt()
+            if not self._sock_events[socket_num] & SNIR_RECV:
+                return 0
 
         number_of_bytes = self._get_rx_rcv_size(socket_num)
+        if not number_of_bytes:
+            self._sock_events[socket_num] &= ~SNIR_RECV
         if self._read_snsr(socket_num) == SNMR_UDP:
             number_of_bytes -= 8  # Subtract UDP header from packet size.
         if number_of_bytes < 0:
@@ -537,12 +1108,109 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         """
         return self._read_snsr(socket_num)
 
+    def socket_state(self, socket_num: int) -> Tuple[int, int, int]:
+        """
+        Status, received data size and free transmit buffer size of a socket.
+
+        The Sn_SR to Sn_RX_RSR registers are contiguous on the W5500 and W5100S, so
+        they are read in one burst. The W6100 needs two.
+
+        :param int socket_num: ID of socket to check.
+
+        :return Tuple[int, int, int]: The connection status, the number of bytes in
+            the RX buffer and the number of bytes socket_send() can queue.
+
+        :raises ValueError: If the socket number is out of range.
+        """
+        self._sock_num_in_range(socket_num)
+        block = self._rxbuf
+        rx_rsr = self._chip.snrx_rsr
+        tx_fsr = self._chip.sntx_fsr
+        if self._chip.status_in_block:
+            first = self._chip.snsr
+            self._readinto_socket_block(socket_num, first, block, rx_rsr + 2 - first)
+            status = block[0]
+        else:
+            first = tx_fsr
+            status = self._read_snsr(socket_num)
+            self._readinto_socket_block(socket_num, first, block, rx_rsr + 2 - first)
+        rx_rsr -= first
+        tx_fsr -= first
+        rx_size = block[rx_rsr] << 8 | block[rx_rsr + 1]
+        tx_free = (block[tx_fsr] << 8 | block[tx_fsr + 1]) - self._tx_unsent[socket_num]
+        # Checking for a completed SEND also sends any queued data.
+        if self.socket_send_busy(socket_num) and status == _SNSR_SOCK_UDP:
+            tx_free = 0
+        return status, rx_size, max(tx_free, 0)
+
+    def wait_for_interrupt(
+        self, poll_interval: float, stop_time: Optional[float] = None
+    ) -> bool:
+        """
+        Wait for an event on any socket.
+
+        Without an interrupt pin this sleeps for poll_interval. In interrupt mode the
+        INTn pin is read every millisecond, without any SPI traffic, until it is
+        asserted and the socket events have been latched.
+
+        :param float poll_interval: Time to sleep in seconds when polling.
+        :param Optional[float] stop_time: The time.monotonic() value at which to stop
+            waiting in interrupt mode, defaults to None which waits indefinitely.
+
+        :return bool: True if socket events were latched, always False when polling.
+        """
+        if self._irq is None:
+            time.sleep(poll_interval)
+            return False
+        while self._irq.value:
+            if stop_time is not None and time.monotonic() > stop_time:
+                return False
+            time.sleep(_IRQ_SLEEP)
+        self._service_interrupt()
+        return True
+
+    def socket_wait_event(
+        self,
+        socket_num: int,
+        events: int,
+        poll_interval: float,
+        stop_time: Optional[float] = None,
+    ) -> int:
+        """
+        Wait for socket events.
+
+        Without an interrupt pin this sleeps for poll_interval so that the caller can
+        poll the socket registers again. In interrupt mode the INTn pin is read every
+        millisecond, without any SPI traffic while it is idle, until one of the events
+        is latched for the socket.
+
+        :param int socket_num: The socket to wait on.
+        :param int events: Mask of socket interrupt flags to wait for, e.g. SNIR_RECV.
+        :param float poll_interval: Time to sleep in seconds when polling.
+        :param Optional[float] stop_time: The time.monotonic() value at which to stop
+            waiting in interrupt mode, defaults to None which waits indefinitely.
+
+        :return int: The latched events from the mask, always 0 when polling.
+        """
+        if self._irq is None:
+            time.sleep(poll_interval)
+            return 0
+        while not self._sock_events[socket_num] & events:
+            if stop_time is not None and time.monotonic() > stop_time:
+                break
+            if self._irq.value:
+                time.sleep(_IRQ_SLEEP)
+            else:
+                self._service_interrupt()
+        return self._sock_events[socket_num] & events
+
     def socket_connect(
         self,
         socket_num: int,
         dest: IpAddress4Raw,
         port: int,
         conn_mode: int = _SNMR_TCP,
+        wait: bool = True,
     ) -> int:
         """
         Open and verify a connection from a socket to a destination IPv4 address
@@ -554,6 +1222,9 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :param int port: Port to connect to (0 - 65,535).
         :param int conn_mode: The connection mode. Use SNMR_TCP for TCP or SNMR_UDP for UDP,
             defaults to SNMR_TCP.
+        :param bool wait: Wait for a TCP connection to be established, defaults to True.
+            If False, return once the connection has been started and check
+            socket_status() for SNSR_SOCK_ESTABLISHED or SNSR_SOCK_CLOSED.
 
         :raises ValueError: if the socket number is out of range.
         :raises ConnectionError: If the connection to the socket cannot be established.
@@ -573,10 +1244,12 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         self._write_sndport(socket_num, port)
         self._write_sncr(socket_num, _CMD_SOCK_CONNECT)
 
-        if conn_mode == _SNMR_TCP:
+        if conn_mode == _SNMR_TCP and wait:
             # wait for tcp connection establishment
             while self.socket_status(socket_num) != SNSR_SOCK_ESTABLISHED:
-                time.sleep(0.001)
+                self.socket_wait_event(
+                    socket_num, SNIR_CON | SNIR_DISCON | SNIR_TIMEOUT, 0.001
+                )
                 debug_msg(
                     "SNSR: {}".format(self.socket_status(socket_num)), self._debug
                 )
@@ -584,14 +1257,119 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
                     raise ConnectionError("Failed to establish connection.")
         return 1
 
+    def socket_set_destination(
+        self, socket_num: int, dest: IpAddress4Raw, port: int
+    ) -> None:
+        """
+        Set the destination of the datagrams sent by an open UDP socket, without
+        reopening the socket.
+
+        :param int socket_num: ID of the socket.
+        :param IpAddress4Raw dest: The destination IP address.
+        :param int port: The destination port (0 - 65,535).
+
+        :raises ValueError: if the socket number is out of range.
+        """
+        self._sock_num_in_range(socket_num)
+        self._write_sndipr(socket_num, dest)
+        self._write_sndport(socket_num, port)
+
+    def socket_set_keepalive(self, socket_num: int, interval: int) -> None:
+        """
+        Set the interval of the TCP keep-alive packets sent by the chip.
+
+        Once data has been sent or received on a connection, the chip sends a
+        keep-alive packet each interval. If the peer does not respond the socket is
+        closed with a TIMEOUT event, without any action from the host. The interval is
+        reset to 0 when the socket is opened again.
+
+        :param int socket_num: ID of the socket.
+        :param int interval: Interval in seconds, rounded up to a multiple of 5
+            seconds. 0 stops the keep-alive packets, which can then be sent with
+            socket_send_keepalive().
+
+        :raises ValueError: If the socket number or interval is out of range.
+        """
+        self._sock_num_in_range(socket_num)
+        if not 0 <= interval <= _KEEPALIVE_MAX:
+            raise ValueError("Keep-alive interval must be 0 - 1275 seconds.")
+        units = (interval + 4) // 5
+        if units != self._keepalive[socket_num]:
+            self._write_socket_register(socket_num, self._chip.snkpalvtr, units)
+            self._keepalive[socket_num] = units
+
+    def socket_set_retries(
+        self,
+        socket_num: int,
+        retry_time: Optional[int] = None,
+        retry_count: Optional[int] = None,
+    ) -> None:
+        """
+        Set the TCP retransmission timeout and retry count of one socket, in place of
+        the chip's rtr and rcr. The settings take effect now and each time the socket
+        is opened, until the socket is released. Only the W6100 and W5100S have per
+        socket settings.
+
+        :param int socket_num: ID of the socket.
+        :param Optional[int] retry_time: Retransmission timeout in units of 100 µs
+            (1 - 65535), defaults to None which uses rtr.
+        :param Optional[int] retry_count: Number of retransmissions before a timeout
+            (0 - 255), defaults to None which uses rcr.
+
+        :raises ValueError: If the socket number or a setting is out of range, or the
+            chip has no per socket settings.
+        """
+        self._sock_num_in_range(socket_num)
+        if self._chip.snrtr is None:
+            raise ValueError("The chip has no per socket retry settings.")
+        if retry_time is not None and not 0 < retry_time <= 0xFFFF:
+            raise ValueError("Retry time must be from 1 to 65535.")
+        if retry_count is not None and not 0 <= retry_count <= 0xFF:
+            raise ValueError("Retries must be from 0 to 255.")
+        if retry_time is None and retry_count is None:
+            if self._sock_retries[socket_num] is None:
+                return
+            self._sock_retries[socket_num] = None
+        else:
+            self._sock_retries[socket_num] = (retry_time, retry_count)
+        self._write_sock_retries(socket_num, retry_time, retry_count)
+
+    def _write_sock_retries(
+        self, sock: int, retry_time: Optional[int], retry_count: Optional[int]
+    ) -> None:
+        """Write Sn_RTR and Sn_RCR, using RTR or RCR for a None setting."""
+        if retry_time is None:
+            retry_time = self.rtr
+        if retry_count is None:
+            retry_count = self.rcr
+        self._write_two_byte_sock_reg(sock, self._chip.snrtr, retry_time)
+        self._write_socket_register(sock, self._chip.snrcr, retry_count)
+
+    def socket_send_keepalive(self, socket_num: int) -> None:
+        """
+        Send a TCP keep-alive packet on an established connection.
+
+        The chip only sends it if data has been sent or received on the connection and
+        the keep-alive interval is 0. If the peer does not respond the socket is closed
+        with a TIMEOUT event.
+
+        :param int socket_num: ID of the socket.
+
+        :raises ValueError: If the socket number is out of range.
+        """
+        self._sock_num_in_range(socket_num)
+        self._write_sncr(socket_num, _CMD_SOCK_SEND_KEEP)
+
     def get_socket(self, *, reserve_socket=False) -> int:
         """
         Request, allocate and return a socket from the WIZnet 5k chip.
 
-        Cycle through the sockets to find the first available one. If the called with
+        Unreserved sockets are tried in the order they were released, and only the
+        status of the sockets tried is read from the chip. If the called with
         reserve_socket=True, update the list of reserved sockets (intended to be used with
         socket.socket()). Note that reserved sockets must be released by calling
-        release_socket() once they are no longer needed.
+        release_socket() once they are no longer needed. Garbage collection, which may
+        release the sockets of deleted socket objects, only runs if no socket is free.
 
         If all sockets are reserved, no sockets are available for DNS calls, etc. Therefore,
         one socket cannot be reserved. Since socket 0 is the only socket that is capable of
@@ -605,28 +1383,31 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         """
         debug_msg("*** Get socket.", self._debug)
         # Prefer socket zero for none reserved calls as it cannot be reserved.
-        if not reserve_socket and self.socket_status(0) == SNSR_SOCK_CLOSED:
+        if (
+            not reserve_socket
+            and self._socket_has_buffers(0)
+            and self.socket_status(0) == SNSR_SOCK_CLOSED
+        ):
             debug_msg("Allocated socket # 0", self._debug)
             return 0
-        # Then check the other sockets.
-
-        #  Call garbage collection to encourage socket.__del__() be called to on any
-        #  destroyed instances. Not at all guaranteed to work!
-        gc.collect()
-        debug_msg(
-            "Reserved sockets: {}".format(WIZNET5K._sockets_reserved), self._debug
-        )
-
-        for socket_number, reserved in enumerate(WIZNET5K._sockets_reserved, start=1):
-            if not reserved and self.socket_status(socket_number) == SNSR_SOCK_CLOSED:
-                if reserve_socket:
-                    WIZNET5K._sockets_reserved[socket_number - 1] = True
-                    debug_msg(
-                        "Allocated socket # {}.".format(socket_number),
-                        self._debug,
-                    )
-                return socket_number
-        raise RuntimeError("All sockets in use.")
+        # Then check the unreserved sockets.
+        index = self._find_free_socket()
+        if index < 0:
+            #  Call garbage collection to encourage socket.__del__() be called to on any
+            #  destroyed instances. Not at all guaranteed to work!
+            gc.collect()
+            debug_msg(
+                "Reserved sockets: {}".format(self._sockets_reserved), self._debug
+            )
+            index = self._find_free_socket()
+            if index < 0:
+                raise RuntimeError("All sockets in use.")
+        if not reserve_socket:
+            return self._free_sockets[index]
+        socket_number = self._free_sockets.pop(index)
+        self._sockets_reserved[socket_number - 1] = True
+        debug_msg("Allocated socket # {}.".format(socket_number), self._debug)
+        return socket_number
 
     def release_socket(self, socket_number):
         """
@@ -637,7 +1418,12 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :raises ValueError: If the socket number is out of range.
         """
         self._sock_num_in_range(socket_number)
-        WIZNET5K._sockets_reserved[socket_number - 1] = False
+        # Socket 0 is never reserved, and a socket may be released more than once.
+        if socket_number and self._sockets_reserved[socket_number - 1]:
+            self._sockets_reserved[socket_number - 1] = False
+            self._free_sockets.append(socket_number)
+            if self._sock_retries[socket_number] is not None:
+                self.socket_set_retries(socket_number)
 
     def socket_listen(
         self, socket_num: int, port: int, conn_mode: int = _SNMR_TCP
@@ -736,6 +1522,11 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         self._write_snmr(socket_num, conn_mode)
         self.write_snir(socket_num, 0xFF)
+        self._send_pending[socket_num] = False
+        self._tx_unsent[socket_num] = 0
+        # Do not keep the keep-alive interval of the socket's previous connection.
+        if self._keepalive[socket_num]:
+            self.socket_set_keepalive(socket_num, 0)
 
         if self.src_port > 0:
             # write to socket source port
@@ -751,6 +1542,9 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         self._write_sncr(socket_num, _CMD_SOCK_OPEN)
         if self._read_snsr(socket_num) not in [_SNSR_SOCK_INIT, _SNSR_SOCK_UDP]:
             raise RuntimeError("Could not open socket in TCP or UDP mode.")
+        # Apply the socket's own retry settings to each new connection.
+        if self._sock_retries[socket_num] is not None:
+            self._write_sock_retries(socket_num, *self._sock_retries[socket_num])
 
     def socket_close(self, socket_num: int) -> None:
         """
@@ -806,16 +1600,19 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         self._sock_num_in_range(socket_num)
         self._check_link_status()
 
-        # Check if there is data available on the socket
-        bytes_on_socket = self._get_rx_rcv_size(socket_num)
+        # Check if there is data available on the socket, reading the starting save
+        # address of the received data in the same transaction.
+        bytes_on_socket, pointer = self._get_rx_rcv_size_and_pointer(socket_num)
         debug_msg("Bytes avail. on sock: {}".format(bytes_on_socket), self._debug)
         if bytes_on_socket:
-            bytes_on_socket = length if bytes_on_socket > length else bytes_on_socket
+            if bytes_on_socket <= length:
+                # The RX buffer will be empty, any new data raises a new event.
+                self._sock_events[socket_num] &= ~SNIR_RECV
+            else:
+                bytes_on_socket = length
             debug_msg(
                 "* Processing {} bytes of data".format(bytes_on_socket), self._debug
             )
-            # Read the starting save address of the received data.
-            pointer = self._read_snrx_rd(socket_num)
             # Read data from the hardware socket.
             bytes_read = self._chip_socket_read(socket_num, pointer, bytes_on_socket)
             # After reading the received data, update Sn_RX_RD register.
@@ -833,6 +1630,47 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             bytes_read = b""
         return bytes_on_socket, bytes_read
 
+    def socket_read_into(self, socket_num: int, buffer: WriteableBuffer) -> int:
+        """
+        Read data from a hardware socket directly into a buffer. Called directly by
+        TCP socket objects and via read_udp_into() for UDP socket objects.
+
+        The data is copied once, from the chip's RX buffer into the caller's buffer,
+        without allocating any intermediate objects.
+
+        :param int socket_num: The socket to read data from.
+        :param WriteableBuffer buffer: The buffer (or memoryview) to read into. Up to
+            len(buffer) bytes are read.
+
+        :return int: The number of bytes read, 0 if no data was available.
+
+        :raises ValueError: If the socket number is out of range.
+        :raises ConnectionError: If the Ethernet link is down.
+        :raises RuntimeError: If the socket connection has been lost.
+        """
+        self._sock_num_in_range(socket_num)
+        self._check_link_status()
+
+        bytes_on_socket, pointer = self._get_rx_rcv_size_and_pointer(socket_num)
+        if bytes_on_socket:
+            if bytes_on_socket <= len(buffer):
+                # The RX buffer will be empty, any new data raises a new event.
+                self._sock_events[socket_num] &= ~SNIR_RECV
+            else:
+                bytes_on_socket = len(buffer)
+            self._chip.socket_readinto(socket_num, pointer, buffer, bytes_on_socket)
+            # After reading the received data, update Sn_RX_RD register.
+            pointer = (pointer + bytes_on_socket) & 0xFFFF
+            self._write_snrx_rd(socket_num, pointer)
+            self._write_sncr(socket_num, _CMD_SOCK_RECV)
+        elif self._read_snmr(socket_num) in (
+            SNSR_SOCK_LISTEN,
+            SNSR_SOCK_CLOSED,
+            SNSR_SOCK_CLOSE_WAIT,
+        ):
+            raise RuntimeError("Lost connection to peer.")
+        return bytes_on_socket
+
     def read_udp(self, socket_num: int, length: int) -> Tuple[int, bytes]:
         """
         Read UDP socket's current message bytes.
@@ -866,18 +1704,118 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
                     self.socket_read(socket_num, data_length - length)
         return bytes_on_socket, bytes_read
 
+    def read_udp_into(self, socket_num: int, buffer: WriteableBuffer) -> int:
+        """
+        Read the UDP socket's current message directly into a buffer. If the message
+        is longer than the buffer, the rest of the message is discarded.
+
+        :param int socket_num: The socket to read data from.
+        :param WriteableBuffer buffer: The buffer (or memoryview) to read into.
+
+        :return int: The number of bytes read, 0 if no message was available.
+
+        :raises ValueError: If the socket number is out of range.
+        """
+        self._sock_num_in_range(socket_num)
+        bytes_on_socket = 0
+        # Parse the UDP packet header.
+        header_length = self.socket_read_into(socket_num, self._pbuff)
+        if header_length:
+            if header_length != 8:
+                raise ValueError("Invalid UDP header.")
+            data_length = self._chip_parse_udp_header(socket_num)
+            # Read the UDP packet data.
+            if data_length:
+                if data_length <= len(buffer):
+                    bytes_on_socket = self.socket_read_into(
+                        socket_num, memoryview(buffer)[:data_length]
+                    )
+                else:
+                    bytes_on_socket = self.socket_read_into(socket_num, buffer)
+                    # just consume the rest, it is lost to the higher layers
+                    self.socket_read(socket_num, data_length - len(buffer))
+        return bytes_on_socket
+
+    def read_udp_many_into(
+        self, socket_num: int, buffers: Sequence[WriteableBuffer]
+    ) -> List[Tuple[int, bytes, int]]:
+        """
+        Read the UDP messages waiting on a socket into a list of buffers, one message
+        per buffer. The waiting messages are read from the chip in one burst, parsed
+        in memory and released with a single RX buffer update. If a message is longer
+        than its buffer, the rest of the message is discarded.
+
+        :param int socket_num: The socket to read data from.
+        :param Sequence[WriteableBuffer] buffers: The buffers (or memoryviews) to read
+            into.
+
+        :return List[Tuple[int, bytes, int]]: The number of bytes read, the source
+            IPv4 address and the source port of each message read. An empty list if no
+            message was available.
+
+        :raises ValueError: If the socket number is out of range.
+        :raises ConnectionError: If the Ethernet link is down.
+        """
+        self._sock_num_in_range(socket_num)
+        self._check_link_status()
+        messages = []
+        bytes_on_socket, pointer = self._get_rx_rcv_size_and_pointer(socket_num)
+        burst = min(bytes_on_socket, len(self._rxbuf))
+        if not buffers or not burst:
+            return messages
+        data = memoryview(self._rxbuf)
+        self._chip.socket_readinto(socket_num, pointer, data, burst)
+        offset = 0
+        while len(messages) < len(buffers) and offset + 8 <= burst:
+            from_ip, from_port, data_length = self._chip.udp_header(
+                data[offset : offset + 8]
+            )
+            if offset + 8 + data_length > burst:
+                # The rest of the message is still in the chip.
+                break
+            buffer = buffers[len(messages)]
+            length = min(data_length, len(buffer))
+            buffer[:length] = data[offset + 8 : offset + 8 + length]
+            messages.append((length, from_ip, from_port))
+            offset += 8 + data_length
+        if not messages:
+            # The first message is too long for one burst.
+            length = self.read_udp_into(socket_num, buffers[0])
+            return [
+                (length, self.udp_from_ip[socket_num], self.udp_from_port[socket_num])
+            ]
+        if offset == bytes_on_socket:
+            # The RX buffer will be empty, any new data raises a new event.
+            self._sock_events[socket_num] &= ~SNIR_RECV
+        self._write_snrx_rd(socket_num, (pointer + offset) & 0xFFFF)
+        self._write_sncr(socket_num, _CMD_SOCK_RECV)
+        self.udp_from_ip[socket_num] = messages[-1][1]
+        self.udp_from_port[socket_num] = messages[-1][2]
+        return messages
+
     def socket_write(
-        self, socket_num: int, buffer: bytearray, timeout: float = 0.0
+        self,
+        socket_num: int,
+        buffer: bytearray,
+        timeout: float = 0.0,
+        flush: bool = True,
     ) -> int:
         """
         Write data to a socket.
 
+        The data is copied to the socket's TX buffer while the chip is still sending
+        earlier data, so consecutive writes with flush=False keep the buffer full and
+        only wait when it has no free space.
+
         :param int socket_num: The socket to write to.
         :param bytearray buffer: The data to write to the socket.
         :param float timeout: Write data timeout in seconds, defaults to 0.0 which waits
             indefinitely.
+        :param bool flush: Wait until the data has been sent, defaults to True. If
+            False, return once the data has been copied to the TX buffer.
 
-        :return int: The number of bytes written to the socket.
+        :return int: The number of bytes written to the socket, at most the size of the
+            TX buffer. 0 if a UDP datagram could not be sent.
 
         :raises ConnectionError: If the Ethernet link is down.
         :raises ValueError: If the socket number is out of range.
@@ -885,33 +1823,54 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         """
         self._sock_num_in_range(socket_num)
         self._check_link_status()
-        if len(buffer) > _SOCK_SIZE:
-            bytes_to_write = _SOCK_SIZE
-        else:
-            bytes_to_write = len(buffer)
+        bytes_to_write = min(len(buffer), self._chip.tx_sizes[socket_num])
+        view = memoryview(buffer)[:bytes_to_write]
         stop_time = time.monotonic() + timeout
 
-        # If buffer is available, start the transfer
-        free_size = self._get_tx_free_size(socket_num)
-        while free_size < bytes_to_write:
-            free_size = self._get_tx_free_size(socket_num)
-            status = self.socket_status(socket_num)
-            if status not in (SNSR_SOCK_ESTABLISHED, SNSR_SOCK_CLOSE_WAIT) or (
-                timeout and time.monotonic() > stop_time
-            ):
+        bytes_written = self.socket_send(socket_num, view)
+        while bytes_written < bytes_to_write:
+            if timeout and time.monotonic() > stop_time:
                 raise RuntimeError("Unable to write data to the socket.")
+            if self._send_pending[socket_num]:
+                self.socket_wait_event(
+                    socket_num,
+                    _SNIR_SEND_OK | SNIR_TIMEOUT,
+                    0.001,
+                    stop_time if timeout else None,
+                )
+            else:
+                # Waiting for the peer to acknowledge data, which raises no interrupt.
+                time.sleep(0.001)
+            bytes_written += self.socket_send(socket_num, view[bytes_written:])
+        if flush and not self.socket_flush(socket_num, timeout):
+            return 0
+        return bytes_to_write
 
-        # Read the starting address for saving the transmitting data.
-        pointer = self._read_sntx_wr(socket_num)
-        offset = pointer & _SOCK_MASK
-        self._chip_socket_write(socket_num, offset, bytes_to_write, buffer)
-        # update sn_tx_wr to the value + data size
-        pointer = (pointer + bytes_to_write) & 0xFFFF
-        self._write_sntx_wr(socket_num, pointer)
-        self._write_sncr(socket_num, _CMD_SOCK_SEND)
+    def socket_flush(self, socket_num: int, timeout: float = 0.0) -> bool:
+        """
+        Wait until all the data written to a socket has been sent.
+
+        :param int socket_num: The socket to flush.
+        :param float timeout: Timeout in seconds, defaults to 0.0 which waits
+            indefinitely.
+
+        :return bool: True if the data was sent, False if a UDP datagram timed out.
 
-        # check data was  transferred correctly
-        while not self.read_snir(socket_num) & _SNIR_SEND_OK:
+        :raises ValueError: If the socket number is out of range.
+        :raises RuntimeError: If the TCP connection closed or the timeout expired
+            before the data was sent.
+        """
+        self._sock_num_in_range(socket_num)
+        stop_time = time.monotonic() + timeout
+        while self._send_pending[socket_num]:
+            if self._check_send(socket_num) & SNIR_TIMEOUT:
+                # TCP sockets are closed by the hardware timeout. UDP sockets are
+                # 1:many so not closed, and the datagram is lost.
+                if self._read_snmr(socket_num) == SNMR_UDP:
+                    return False
+                raise RuntimeError("No data was sent, socket was closed.")
+            if not self._send_pending[socket_num]:
+                break
             if self.socket_status(socket_num) in (
                 SNSR_SOCK_CLOSED,
                 SNSR_SOCK_TIME_WAIT,
@@ -922,17 +1881,93 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
                 raise RuntimeError("No data was sent, socket was closed.")
             if timeout and time.monotonic() > stop_time:
                 raise RuntimeError("Operation timed out. No data sent.")
-            if self.read_snir(socket_num) & SNIR_TIMEOUT:
-                self.write_snir(socket_num, SNIR_TIMEOUT)
-                # TCP sockets are closed by the hardware timeout
-                # so that will be caught at the while statement.
-                # UDP sockets are 1:many so not closed thus return 0.
-                if self._read_snmr(socket_num) == SNMR_UDP:
-                    return 0
-            time.sleep(0.001)
-        self.write_snir(socket_num, _SNIR_SEND_OK)
+            self.socket_wait_event(
+                socket_num,
+                _SNIR_SEND_OK | SNIR_TIMEOUT | SNIR_DISCON,
+                0.001,
+                stop_time if timeout else None,
+            )
+        return True
+
+    def socket_send(self, socket_num: int, buffer: ReadableBuffer) -> int:
+        """
+        Queue data on a socket without waiting for it to be sent.
+
+        As much of the buffer as fits in the free TX buffer space is copied to the
+        chip. A SEND command is issued at once if the chip is idle, otherwise the data
+        is sent as soon as the SEND in progress completes, together with any other data
+        queued by then. A UDP datagram is only queued when it fits completely and no
+        other datagram is being sent.
+
+        :param int socket_num: The socket to write to.
+        :param ReadableBuffer buffer: The data to send.
+
+        :return int: The number of bytes queued, 0 if the socket is busy.
+
+        :raises ConnectionError: If the Ethernet link is down.
+        :raises ValueError: If the socket number is out of range.
+        :raises RuntimeError: If the socket is not connected.
+        """
+        self._sock_num_in_range(socket_num)
+        self._check_link_status()
+        status = self._read_snsr(socket_num)
+        if status not in (SNSR_SOCK_ESTABLISHED, SNSR_SOCK_CLOSE_WAIT, _SNSR_SOCK_UDP):
+            raise RuntimeError("Unable to write data to the socket.")
+        busy = self.socket_send_busy(socket_num)
+        if busy and status == _SNSR_SOCK_UDP:
+            # Each SEND command is one datagram.
+            return 0
+        free_size, pointer = self._get_tx_free_size_and_pointer(socket_num)
+        # Sn_TX_FSR may not include data written since the last SEND command.
+        free_size -= self._tx_unsent[socket_num]
+        bytes_to_write = min(len(buffer), self._chip.tx_sizes[socket_num])
+        if free_size < bytes_to_write:
+            bytes_to_write = 0 if status == _SNSR_SOCK_UDP else max(free_size, 0)
+        if bytes_to_write:
+            self._chip.socket_write(socket_num, pointer, buffer, bytes_to_write)
+            self._write_sntx_wr(socket_num, (pointer + bytes_to_write) & 0xFFFF)
+            self._tx_unsent[socket_num] += bytes_to_write
+            if not busy:
+                self._send_queued(socket_num)
         return bytes_to_write
 
+    def socket_send_busy(self, socket_num: int) -> bool:
+        """
+        Whether the chip is still sending data written to the socket. When a SEND
+        command completes, any data queued behind it is sent.
+
+        :param int socket_num: The socket to check.
+
+        :return bool: True if a SEND command is in progress.
+        """
+        if self._send_pending[socket_num]:
+            self._check_send(socket_num)
+        return self._send_pending[socket_num]
+
+    def _check_send(self, socket_num: int) -> int:
+        """
+        Check whether the SEND command in progress has completed, and if so send the
+        data queued behind it.
+
+        A SEND that times out is treated as complete. A TCP socket is closed by the
+        chip when that happens, a UDP datagram is lost.
+
+        :return int: _SNIR_SEND_OK or SNIR_TIMEOUT if the SEND completed, else 0.
+        """
+        snir = self.read_snir(socket_num) & (_SNIR_SEND_OK | SNIR_TIMEOUT)
+        if snir:
+            self.write_snir(socket_num, snir)
+            self._send_pending[socket_num] = False
+            if self._tx_unsent[socket_num] and not snir & SNIR_TIMEOUT:
+                self._send_queued(socket_num)
+        return snir
+
+    def _send_queued(self, socket_num: int) -> None:
+        """Send the data written to the TX buffer since the last SEND command."""
+        self._write_sncr(socket_num, _CMD_SOCK_SEND)
+        self._tx_unsent[socket_num] = 0
+        self._send_pending[socket_num] = True
+
     def sw_reset(self) -> None:
         """
         Soft reset and reinitialize the WIZnet chip.
@@ -940,6 +1975,8 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :raises RuntimeError: If reset fails.
         """
         self._wiznet_chip_init()
+        if self._irq is not None:
+            self._setup_interrupts()
 
     def _sw_reset_5x00(self) -> bool:
         """
@@ -956,17 +1993,26 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         Detect and initialize a WIZnet 5k Ethernet module.
 
         :raises RuntimeError: If no WIZnet chip is detected.
+        :raises ValueError: If the buffer sizes are invalid for the chip.
         """
+        # Resetting the chip restores the configuration registers to their defaults,
+        # and restarts link negotiation.
+        self._config.clear()
+        self._link_next_check = 0.0
 
         def _setup_sockets() -> None:
-            """Initialise sockets for w5500 and w6100 chips."""
-            for sock_num in range(_MAX_SOCK_NUM[self._chip_type]):
-                ctrl_byte = 0x0C + (sock_num << 5)
-                self._write(0x1E, ctrl_byte, 2)
-                self._write(0x1F, ctrl_byte, 2)
-            self._ch_base_msb = 0x00
-            WIZNET5K._sockets_reserved = [False] * (_MAX_SOCK_NUM[self._chip_type] - 1)
-            self._src_ports_in_use = [0] * _MAX_SOCK_NUM[self._chip_type]
+            """Initialise the socket buffers and the socket allocator."""
+            self._setup_buffers()
+            max_sockets = self._chip.max_sockets
+            self._sockets_reserved = [False] * (max_sockets - 1)
+            self._free_sockets = [
+                sock for sock in range(1, max_sockets) if self._socket_has_buffers(sock)
+            ]
+            self._src_ports_in_use = [0] * max_sockets
+            # Sn_KPALVTR of each socket, which is 0 after a reset.
+            self._keepalive = [0] * max_sockets
+            # Sn_RTR and Sn_RCR of each socket, None where RTR or RCR applies.
+            self._sock_retries = [None] * max_sockets
 
         def _detect_and_reset_w6100() -> bool:
             """
@@ -975,7 +2021,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
             :return bool: True if a W6100 chip is detected, False if not.
             """
-            self._chip_type = "w6100"
+            self._set_chip(_W6100)
 
             # Reset w6100
             self._write(0x41F4, 0x04, 0xCE)  # Unlock chip settings.
@@ -983,7 +2029,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             self._write(0x2004, 0x04, 0x00)  # Reset chip.
             time.sleep(0.05)  # Wait for reset.
 
-            if self._read(_REG_VERSIONR[self._chip_type], 0x00)[0] != 0x61:
+            if self._read(self._chip.versionr, 0x00)[0] != 0x61:
                 return False
             # Initialize w6100.
             self._write(0x41F5, 0x04, 0x3A)  # Unlock network settings.
@@ -997,7 +2043,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
             :return bool: True if a W5500 chip is detected, False if not.
             """
-            self._chip_type = "w5500"
+            self._set_chip(_W5500)
             if not self._sw_reset_5x00():
                 return False
 
@@ -1013,7 +2059,7 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
             if self._read_mr() != 0x00:
                 return False
 
-            if self._read(_REG_VERSIONR[self._chip_type], 0x00)[0] != 0x04:
+            if self._read(self._chip.versionr, 0x00)[0] != 0x04:
                 return False
             # Initialize w5500
             _setup_sockets()
@@ -1026,17 +2072,15 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
             :return bool: True if a W5100 chip is detected, False if not.
             """
-            self._chip_type = "w5100s"
+            self._set_chip(_W5100S)
             if not self._sw_reset_5x00():
                 return False
 
-            if self._read(_REG_VERSIONR[self._chip_type], 0x00)[0] != 0x51:
+            if self._read(self._chip.versionr, 0x00)[0] != 0x51:
                 return False
 
             # Initialise w5100s
-            self._ch_base_msb = 0x0400
-            WIZNET5K._sockets_reserved = [False] * (_MAX_SOCK_NUM[self._chip_type] - 1)
-            self._src_ports_in_use = [0] * _MAX_SOCK_NUM[self._chip_type]
+            _setup_sockets()
             return True
 
         for func in [
@@ -1049,31 +2093,117 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         self._chip_type = None
         raise RuntimeError("Failed to initialize WIZnet module.")
 
+    def _set_chip(self, chip: type) -> None:
+        """Bind the register addresses and access methods of a chip type."""
+        self._chip = chip(self._readinto, self._write)
+        self._chip_type = self._chip.name
+
+    def _setup_buffers(self) -> None:
+        """
+        Divide the chip's TX and RX memory between the sockets.
+
+        :raises ValueError: If the buffer sizes are invalid for the chip.
+        """
+        max_sockets = self._chip.max_sockets
+        memory = self._chip.memory
+        sizes = []
+        for requested, register in (
+            (self._tx_buffer_sizes, self._chip.sntxbuf_size),
+            (self._rx_buffer_sizes, self._chip.snrxbuf_size),
+        ):
+            if requested is None:
+                requested = (_DEFAULT_BUFFER_SIZE,) * max_sockets
+            if (
+                len(requested) != max_sockets
+                or sum(requested) > memory
+                or any(size not in _BUFFER_SIZES for size in requested)
+            ):
+                raise ValueError(
+                    "Buffer sizes must be {} values of 0, 1, 2, 4, 8 or 16 KB "
+                    "with a total of at most {} KB.".format(max_sockets, memory)
+                )
+            for sock, size in enumerate(requested):
+                self._write_socket_register(sock, register, size)
+            sizes.append([size * 1024 for size in requested])
+        self._chip.set_buffer_sizes(*sizes)
+
+    def _socket_has_buffers(self, socket_num: int) -> bool:
+        """Whether the socket has been allocated TX and RX memory."""
+        chip = self._chip
+        return bool(chip.tx_sizes[socket_num] and chip.rx_sizes[socket_num])
+
     def _sock_num_in_range(self, sock: int) -> None:
         """Check that the socket number is in the range 0 - maximum sockets."""
         if not 0 <= sock < self.max_sockets:
             raise ValueError("Socket number out of range.")
 
     def _check_link_status(self):
-        """Raise an exception if the link is down."""
+        """
+        Raise an exception if the link is down.
+
+        The PHY is read at most once every link_check_interval seconds while the link
+        is up, and on every call while it is down.
+        """
+        if self._link_up and time.monotonic() < self._link_next_check:
+            return
         if not self.link_status:
             raise ConnectionError("The Ethernet connection is down.")
 
-    @staticmethod
-    def _read_socket_reservations() -> list[int]:
+    def _read_socket_reservations(self) -> list[int]:
         """Return the list of reserved sockets."""
-        return WIZNET5K._sockets_reserved
+        return self._sockets_reserved
+
+    def _find_free_socket(self) -> int:
+        """
+        Find an unreserved socket which the chip reports closed.
+
+        Unreserved sockets can be in use without a reservation, e.g. for DNS or DHCP,
+        so the status of each candidate is read until a closed one is found. This is
+        normally the first one.
+
+        :return int: The index of the socket in _free_sockets, -1 if there is none.
+        """
+        free_sockets = self._free_sockets
+        for index, socket_number in enumerate(free_sockets):
+            if self.socket_status(socket_number) == SNSR_SOCK_CLOSED:
+                return index
+        return -1
 
     def _read_mr(self) -> int:
         """Read from the Mode Register (MR)."""
-        return int.from_bytes(self._read(_REG_MR[self._chip_type], 0x00), "big")
+        return self._read_register(self._chip.mr, 0x00)
 
     def _write_mr(self, data: int) -> None:
         """Write to the mode register (MR)."""
-        self._write(_REG_MR[self._chip_type], 0x04, data)
+        self._write(self._chip.mr, 0x04, data)
 
     # *** Low Level Methods ***
 
+    def _read_config(self, address: int, length: int) -> bytes:
+        """
+        Read a network configuration register, using the shadow copy if there is one.
+
+        :param int address: Register address.
+        :param int length: Register length in bytes.
+
+        :return bytes: The register value.
+        """
+        value = self._config.get(address)
+        if value is None:
+            value = self._read(address, 0x00, length)
+            self._config[address] = value
+        return value
+
+    def _write_config(self, address: int, data: bytes) -> None:
+        """
+        Write a network configuration register and its shadow copy.
+
+        :param int address: Register address.
+        :param bytes data: The register value.
+        """
+        self._write(address, 0x04, data)
+        self._config[address] = data
+
     def _read(
         self,
         addr: int,
@@ -1089,13 +2219,59 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         :return bytes: Data read from the chip.
         """
-        with self._device as bus_device:
-            self._chip_read(bus_device, addr, callback)
+        if length > len(self._rxbuf):
             self._rxbuf = bytearray(length)
-            bus_device.readinto(self._rxbuf)
-            return bytes(self._rxbuf)
+        self._readinto(addr, callback, self._rxbuf, length)
+        return bytes(memoryview(self._rxbuf)[:length])
+
+    def _readinto(
+        self,
+        addr: int,
+        callback: int,
+        buffer: WriteableBuffer,
+        length: Optional[int] = None,
+    ) -> None:
+        """
+        Read data from a register address into a buffer without allocating memory.
 
-    def _write(self, addr: int, callback: int, data: Union[int, bytes]) -> None:
+        :param int addr: Register address to read.
+        :param int callback: Callback reference.
+        :param WriteableBuffer buffer: Buffer (or memoryview) to read the data into.
+        :param Optional[int] length: Number of bytes to read, defaults to the length
+            of the buffer.
+        """
+        if length is None:
+            length = len(buffer)
+        with self._device as bus_device:
+            self._chip.read_header(self._header, addr, callback)
+            bus_device.write(self._header)
+            bus_device.readinto(buffer, end=length)
+
+    def _read_register(self, addr: int, callback: int, length: int = 1) -> int:
+        """
+        Read a 1 to 4 byte big endian register as an integer without allocating
+        memory.
+
+        :param int addr: Register address to read.
+        :param int callback: Callback reference.
+        :param int length: Number of bytes in the register, defaults to 1.
+
+        :return int: The register value.
+        """
+        regbuf = self._regbuf
+        self._readinto(addr, callback, regbuf, length)
+        value = regbuf[0]
+        for index in range(1, length):
+            value = (value << 8) | regbuf[index]
+        return value
+
+    def _write(
+        self,
+        addr: int,
+        callback: int,
+        data: Union[int, bytes],
+        length: Optional[int] = None,
+    ) -> None:
         """
         Write data to a register address.
 
@@ -1103,111 +2279,175 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
         :param int callback: Callback reference.
         :param Union[int, bytes] data: Data to write to the register address, if data
             is an integer, it must be 1 or 2 bytes.
+        :param Optional[int] length: Number of bytes of a buffer to write, defaults to
+            the length of the buffer. Ignored for integer data.
 
         :raises OverflowError: if integer data is more than 2 bytes.
         """
+        if isinstance(data, int):
+            if data > 0xFFFF:
+                raise OverflowError("Integer register data must be 1 or 2 bytes.")
+            if data > 0xFF:
+                self._regbuf[0] = data >> 8
+                self._regbuf[1] = data & 0xFF
+                length = 2
+            else:
+                self._regbuf[0] = data
+                length = 1
+            data = self._regbuf
+        elif length is None:
+            length = len(data)
         with self._device as bus_device:
-            self._chip_write(bus_device, addr, callback)
-            try:
-                data = data.to_bytes(1, "big")
-            except OverflowError:
-                data = data.to_bytes(2, "big")
-            except AttributeError:
-                pass
-            bus_device.write(data)
+            self._chip.write_header(self._header, addr, callback)
+            bus_device.write(self._header)
+            bus_device.write(data, end=length)
 
     def _read_two_byte_sock_reg(self, sock: int, reg_address: int) -> int:
         """Read a two byte socket register."""
-        register = self._read_socket_register(sock, reg_address) << 8
-        register += self._read_socket_register(sock, reg_address + 1)
-        return register
+        return self._read_socket_register(sock, reg_address, 2)
 
     def _write_two_byte_sock_reg(self, sock: int, reg_address: int, data: int) -> None:
         """Write to a two byte socket register."""
-        self._write_socket_register(sock, reg_address, data >> 8 & 0xFF)
-        self._write_socket_register(sock, reg_address + 1, data & 0xFF)
+        self._regbuf[0] = data >> 8 & 0xFF
+        self._regbuf[1] = data & 0xFF
+        self._write_socket_block(sock, reg_address, self._regbuf, 2)
 
     # *** Socket Register Methods ***
 
+    def _read_stable_pair(
+        self, sock: int, size_reg: int, pointer_reg: int
+    ) -> Tuple[int, int]:
+        """
+        Read a two byte size register and a two byte pointer register in one burst.
+
+        The size registers change while the chip is sending and receiving data, so
+        the burst is repeated until two consecutive reads of the size agree.
+
+        :param int sock: Socket number.
+        :param int size_reg: Address of the size register, Sn_RX_RSR or Sn_TX_FSR.
+        :param int pointer_reg: Address of the pointer register, Sn_RX_RD or Sn_TX_WR,
+            which must follow the size register.
+
+        :return Tuple[int, int]: The size and the pointer.
+        """
+        length = pointer_reg - size_reg + 2
+        block = self._regbuf
+        self._readinto_socket_block(sock, size_reg, block, length)
+        val = block[0] << 8 | block[1]
+        if val:
+            val_1 = None
+            while val != val_1:
+                val_1 = val
+                self._readinto_socket_block(sock, size_reg, block, length)
+                val = block[0] << 8 | block[1]
+        return val, block[length - 2] << 8 | block[length - 1]
+
+    def _get_rx_rcv_size_and_pointer(self, sock: int) -> Tuple[int, int]:
+        """Size of received data saved in socket buffer and the RX read pointer."""
+        return self._read_stable_pair(sock, self._chip.snrx_rsr, self._chip.snrx_rd)
+
+    def _get_tx_free_size_and_pointer(self, sock: int) -> Tuple[int, int]:
+        """Free size of socket's tx buffer block and the TX write pointer."""
+        return self._read_stable_pair(sock, self._chip.sntx_fsr, self._chip.sntx_wr)
+
     def _get_rx_rcv_size(self, sock: int) -> int:
         """Size of received and saved in socket buffer."""
-        val = 0
-        val_1 = self._read_snrx_rsr(sock)
-        while val != val_1:
-            val_1 = self._read_snrx_rsr(sock)
-            if val_1 != 0:
-                val = self._read_snrx_rsr(sock)
-        return val
+        return self._get_rx_rcv_size_and_pointer(sock)[0]
 
     def _get_tx_free_size(self, sock: int) -> int:
         """Free size of socket's tx buffer block."""
-        val = 0
-        val_1 = self._read_sntx_fsr(sock)
-        while val != val_1:
-            val_1 = self._read_sntx_fsr(sock)
-            if val_1 != 0:
-                val = self._read_sntx_fsr(sock)
-        return val
+        return self._get_tx_free_size_and_pointer(sock)[0]
 
     def _read_snrx_rd(self, sock: int) -> int:
         """Read socket n RX Read Data Pointer Register."""
-        return self._read_two_byte_sock_reg(sock, _REG_SNRX_RD[self._chip_type])
+        return self._read_two_byte_sock_reg(sock, self._chip.snrx_rd)
 
     def _write_snrx_rd(self, sock: int, data: int) -> None:
         """Write socket n RX Read Data Pointer Register."""
-        self._write_two_byte_sock_reg(sock, _REG_SNRX_RD[self._chip_type], data)
+        self._write_two_byte_sock_reg(sock, self._chip.snrx_rd, data)
 
     def _read_sntx_wr(self, sock: int) -> int:
         """Read the socket write buffer pointer for socket `sock`."""
-        return self._read_two_byte_sock_reg(sock, _REG_SNTX_WR[self._chip_type])
+        return self._read_two_byte_sock_reg(sock, self._chip.sntx_wr)
 
     def _write_sntx_wr(self, sock: int, data: int) -> None:
         """Write the socket write buffer pointer for socket `sock`."""
-        self._write_two_byte_sock_reg(sock, _REG_SNTX_WR[self._chip_type], data)
+        self._write_two_byte_sock_reg(sock, self._chip.sntx_wr, data)
 
     def _read_sntx_fsr(self, sock: int) -> int:
         """Read socket n TX Free Size Register"""
-        return self._read_two_byte_sock_reg(sock, _REG_SNTX_FSR[self._chip_type])
+        return self._read_two_byte_sock_reg(sock, self._chip.sntx_fsr)
 
     def _read_snrx_rsr(self, sock: int) -> int:
         """Read socket n Received Size Register"""
-        return self._read_two_byte_sock_reg(sock, _REG_SNRX_RSR[self._chip_type])
+        return self._read_two_byte_sock_reg(sock, self._chip.snrx_rsr)
 
     def _read_sndipr(self, sock) -> bytes:
         """Read socket destination IP address."""
-        data = []
-        for offset in range(4):
-            data.append(
-                self._read_socket_register(sock, _REG_SNDIPR[self._chip_type] + offset)
-            )
-        return bytes(data)
+        return self._read_socket_block(sock, self._chip.sndipr, 4)
 
     def _write_sndipr(self, sock: int, ip_addr: bytes) -> None:
         """Write to socket destination IP Address."""
-        for offset, value in enumerate(ip_addr):
-            self._write_socket_register(
-                sock, _REG_SNDIPR[self._chip_type] + offset, value
-            )
+        self._write_socket_block(sock, self._chip.sndipr, bytes(ip_addr))
 
     def _read_sndport(self, sock: int) -> int:
         """Read socket destination port."""
-        return self._read_two_byte_sock_reg(sock, _REG_SNDPORT[self._chip_type])
+        return self._read_two_byte_sock_reg(sock, self._chip.sndport)
 
     def _write_sndport(self, sock: int, port: int) -> None:
         """Write to socket destination port."""
-        self._write_two_byte_sock_reg(sock, _REG_SNDPORT[self._chip_type], port)
+        self._write_two_byte_sock_reg(sock, self._chip.sndport, port)
 
     def _read_snsr(self, sock: int) -> int:
         """Read Socket n Status Register."""
-        return self._read_socket_register(sock, _REG_SNSR[self._chip_type])
+        return self._read_socket_register(sock, self._chip.snsr)
 
     def read_snir(self, sock: int) -> int:
-        """Read Socket n Interrupt Register."""
-        return self._read_socket_register(sock, _REG_SNIR[self._chip_type])
+        """
+        Read Socket n Interrupt Register. In interrupt mode the events latched by
+        _service_interrupt() are returned without reading the register.
+        """
+        if self._irq is not None:
+            self._service_interrupt()
+            return self._sock_events[sock]
+        return self._read_socket_register(sock, self._chip.snir)
 
     def write_snir(self, sock: int, data: int) -> None:
-        """Write to Socket n Interrupt Register."""
-        self._write_socket_register(sock, _REG_SNIR[self._chip_type], data)
+        """Clear flags in Socket n Interrupt Register, or the latched events."""
+        if self._irq is not None:
+            self._service_interrupt()
+            self._sock_events[sock] &= ~data
+            return
+        self._write_socket_register(sock, self._chip.snirclr, data)
+
+    def _setup_interrupts(self) -> None:
+        """Enable the socket interrupts and discard any latched events."""
+        for sock in range(self.max_sockets):
+            self._write_socket_register(sock, self._chip.snimr, _SNIMR_ALL)
+            self._write_socket_register(sock, self._chip.snirclr, 0xFF)
+            self._sock_events[sock] = 0
+        self._write(self._chip.simr, 0x04, (1 << self.max_sockets) - 1)
+
+    def _service_interrupt(self) -> None:
+        """
+        Latch the socket events if the INTn pin is asserted.
+
+        SIR is read once to find the sockets with events, then only the Sn_IR
+        registers of those sockets are read and cleared, which releases INTn.
+        """
+        if self._irq.value:
+            return
+        pending = self._read_register(self._chip.sir, 0x00)
+        pending &= (1 << self.max_sockets) - 1
+        self._interrupt_count += 1
+        sock = 0
+        while pending:
+            if pending & 0x01:
+                events = self._read_socket_register(sock, self._chip.snir)
+                self._write_socket_register(sock, self._chip.snirclr, events)
+                self._sock_events[sock] |= events
+            pending >>= 1
+            sock += 1
 
     def _read_snmr(self, sock: int) -> int:
         """Read the socket MR register."""
@@ -1219,101 +2459,49 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
     def _write_sock_port(self, sock: int, port: int) -> None:
         """Write to the socket port number."""
-        self._write_two_byte_sock_reg(sock, _REG_SNPORT[self._chip_type], port)
+        self._write_two_byte_sock_reg(sock, self._chip.snport, port)
 
     def _write_sncr(self, sock: int, data: int) -> None:
         """Write to socket command register."""
-        self._write_socket_register(sock, _REG_SNCR[self._chip_type], data)
+        self._write_socket_register(sock, self._chip.sncr, data)
         # Wait for command to complete before continuing.
-        while self._read_socket_register(sock, _REG_SNCR[self._chip_type]):
+        while self._read_socket_register(sock, self._chip.sncr):
             pass
 
     @property
     def rcr(self) -> int:
         """Retry count register."""
-        return int.from_bytes(self._read(_REG_RCR[self._chip_type], 0x00), "big")
+        return self._read_register(self._chip.rcr, 0x00)
 
     @rcr.setter
     def rcr(self, retry_count: int) -> None:
         """Retry count register."""
         if 0 > retry_count > 255:
             raise ValueError("Retries must be from 0 to 255.")
-        self._write(_REG_RCR[self._chip_type], 0x04, retry_count)
+        self._write(self._chip.rcr, 0x04, retry_count)
 
     @property
     def rtr(self) -> int:
         """Retry time register."""
-        return int.from_bytes(self._read(_REG_RTR[self._chip_type], 0x00, 2), "big")
+        return self._read_register(self._chip.rtr, 0x00, 2)
 
     @rtr.setter
     def rtr(self, retry_time: int) -> None:
         """Retry time register."""
         if 0 > retry_time >= 2**16:
             raise ValueError("Retry time must be from 0 to 65535")
-        self._write(_REG_RTR[self._chip_type], 0x04, retry_time)
+        self._write(self._chip.rtr, 0x04, retry_time)
 
     # *** Chip Specific Methods ***
 
-    def _chip_read(self, device: "busio.SPI", address: int, call_back: int) -> None:
-        """Chip specific calls for _read method."""
-        if self._chip_type in ("w5500", "w6100"):
-            device.write((address >> 8).to_bytes(1, "big"))
-            device.write((address & 0xFF).to_bytes(1, "big"))
-            device.write(call_back.to_bytes(1, "big"))
-        elif self._chip_type == "w5100s":
-            device.write((0x0F).to_bytes(1, "big"))
-            device.write((address >> 8).to_bytes(1, "big"))
-            device.write((address & 0xFF).to_bytes(1, "big"))
-
-    def _chip_write(self, device: "busio.SPI", address: int, call_back: int) -> None:
-        """Chip specific calls for _write."""
-        if self._chip_type in ("w5500", "w6100"):
-            device.write((address >> 8).to_bytes(1, "big"))
-            device.write((address & 0xFF).to_bytes(1, "big"))
-            device.write(call_back.to_bytes(1, "big"))
-        elif self._chip_type == "w5100s":
-            device.write((0xF0).to_bytes(1, "big"))
-            device.write((address >> 8).to_bytes(1, "big"))
-            device.write((address & 0xFF).to_bytes(1, "big"))
-
-    def _chip_socket_read(self, socket_number, pointer, bytes_to_read):
-        """Chip specific calls for socket_read."""
-        if self._chip_type in ("w5500", "w6100"):
-            # Read data from the starting address of snrx_rd
-            ctrl_byte = 0x18 + (socket_number << 5)
-            bytes_read = self._read(pointer, ctrl_byte, bytes_to_read)
-        elif self._chip_type == "w5100s":
-            offset = pointer & _SOCK_MASK
-            src_addr = offset + (socket_number * _SOCK_SIZE + 0x6000)
-            if offset + bytes_to_read > _SOCK_SIZE:
-                split_point = _SOCK_SIZE - offset
-                bytes_read = self._read(src_addr, 0x00, split_point)
-                split_point = bytes_to_read - split_point
-                src_addr = socket_number * _SOCK_SIZE + 0x6000
-                bytes_read += self._read(src_addr, 0x00, split_point)
-            else:
-                bytes_read = self._read(src_addr, 0x00, bytes_to_read)
-        return bytes_read
-
-    def _chip_socket_write(
-        self, socket_number: int, offset: int, bytes_to_write: int, buffer: bytes
-    ):
-        """Chip specific calls for socket_write."""
-        if self._chip_type in ("w5500", "w6100"):
-            dst_addr = offset + (socket_number * _SOCK_SIZE + 0x8000)
-            cntl_byte = 0x14 + (socket_number << 5)
-            self._write(dst_addr, cntl_byte, buffer[:bytes_to_write])
-
-        elif self._chip_type == "w5100s":
-            dst_addr = offset + (socket_number * _SOCK_SIZE + 0x4000)
-
-            if offset + bytes_to_write > _SOCK_SIZE:
-                split_point = _SOCK_SIZE - offset
-                self._write(dst_addr, 0x00, buffer[:split_point])
-                dst_addr = socket_number * _SOCK_SIZE + 0x4000
-                self._write(dst_addr, 0x00, buffer[split_point:bytes_to_write])
-            else:
-                self._write(dst_addr, 0x00, buffer[:bytes_to_write])
+    def _chip_socket_read(
+        self, socket_number: int, pointer: int, bytes_to_read: int
+    ) -> bytes:
+        """Read from a socket's RX buffer, for socket_read."""
+        if bytes_to_read > len(self._rxbuf):
+            self._rxbuf = bytearray(bytes_to_read)
+        self._chip.socket_readinto(socket_number, pointer, self._rxbuf, bytes_to_read)
+        return bytes(memoryview(self._rxbuf)[:bytes_to_read])
 
     def _chip_parse_udp_header(self, socket_num) -> int:
         """
@@ -1323,33 +2511,70 @@ class WIZNET5K:  # pylint: disable=too-many-public-methods, too-many-instance-at
 
         :return int: The UDP data length.
         """
-        if self._chip_type in ("w5100s", "w5500"):
-            self.udp_from_ip[socket_num] = self._pbuff[:4]
-            self.udp_from_port[socket_num] = int.from_bytes(self._pbuff[4:6], "big")
-            return int.from_bytes(self._pbuff[6:], "big")
-        if self._chip_type == "w6100":
-            self.udp_from_ip[socket_num] = self._pbuff[3:7]
-            self.udp_from_port[socket_num] = int.from_bytes(self._pbuff[6:], "big")
-            return int.from_bytes(self._pbuff[:2], "big") & 0x07FF
-        raise ValueError("Unsupported chip type.")
+        (
+            self.udp_from_ip[socket_num],
+            self.udp_from_port[socket_num],
+            data_length,
+        ) = self._chip.udp_header(self._pbuff)
+        return data_length
 
     def _write_socket_register(self, sock: int, address: int, data: int) -> None:
         """Write to a WIZnet 5k socket register."""
-        if self._chip_type in ("w5500", "w6100"):
-            cntl_byte = (sock << 5) + 0x0C
-            self._write(address, cntl_byte, data)
-        elif self._chip_type == "w5100s":
-            cntl_byte = 0
-            self._write(self._ch_base_msb + sock * _CH_SIZE + address, cntl_byte, data)
-
-    def _read_socket_register(self, sock: int, address: int) -> int:
+        chip = self._chip
+        self._write(chip.sock_base[sock] + address, chip.sock_write[sock], data)
+
+    def _read_socket_register(self, sock: int, address: int, length: int = 1) -> int:
         """Read a WIZnet 5k socket register."""
-        if self._chip_type in ("w5500", "w6100"):
-            cntl_byte = (sock << 5) + 0x08
-            register = self._read(address, cntl_byte)
-        elif self._chip_type == "w5100s":
-            cntl_byte = 0
-            register = self._read(
-                self._ch_base_msb + sock * _CH_SIZE + address, cntl_byte
-            )
-        return int.from_bytes(register, "big")
+        chip = self._chip
+        return self._read_register(
+            chip.sock_base[sock] + address, chip.sock_read[sock], length
+        )
+
+    def _read_socket_block(self, sock: int, address: int, length: int) -> bytes:
+        """
+        Read a contiguous range of WIZnet 5k socket registers in one SPI transaction.
+
+        All three chips auto-increment the register address during a burst, so
+        multi-byte registers (pointers, IPv4 addresses) or a whole range of the
+        socket register block can be read with a single chip select cycle.
+
+        :param int sock: Socket number.
+        :param int address: Address of the first register.
+        :param int length: Number of bytes to read.
+
+        :return bytes: The register values.
+        """
+        chip = self._chip
+        return self._read(chip.sock_base[sock] + address, chip.sock_read[sock], length)
+
+    def _readinto_socket_block(
+        self, sock: int, address: int, buffer: WriteableBuffer, length: int
+    ) -> None:
+        """
+        Read a contiguous range of WIZnet 5k socket registers into a buffer in one SPI
+        transaction.
+
+        :param int sock: Socket number.
+        :param int address: Address of the first register.
+        :param WriteableBuffer buffer: Buffer to read the register values into.
+        :param int length: Number of bytes to read.
+        """
+        chip = self._chip
+        self._readinto(
+            chip.sock_base[sock] + address, chip.sock_read[sock], buffer, length
+        )
+
+    def _write_socket_block(
+        self, sock: int, address: int, data: bytes, length: Optional[int] = None
+    ) -> None:
+        """
+        Write a contiguous range of WIZnet 5k socket registers in one SPI transaction.
+
+        :param int sock: Socket number.
+        :param int address: Address of the first register.
+        :param bytes data: The register values to write.
+        :param Optional[int] length: Number of bytes of data to write, defaults to the
+            length of data.
+        """
+        chip = self._chip
+        self._write(chip.sock_base[sock] + address, chip.sock_write[sock], data, length)
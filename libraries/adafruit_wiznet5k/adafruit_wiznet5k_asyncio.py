@@ -0,0 +1,404 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+#
+# CPython uses type as an argument in socket.socket, so disable checking in Pylint
+# pylint: disable=redefined-builtin
+"""
+`adafruit_wiznet5k_asyncio`
+================================================================================
+
+Non-blocking sockets for the Wiznet5k module, for use with asyncio.
+
+Awaiting a socket operation never sleeps inside the driver. The waiting tasks are
+woken by a single task which checks the hardware sockets they are waiting on,
+reading the socket registers each pass, or in interrupt mode only when the INTn pin
+has signalled an event. Other tasks (MQTT keep alive, HTTP serving, DHCP renewal)
+keep running while a socket waits.
+
+Example::
+
+    import asyncio
+    from adafruit_wiznet5k.adafruit_wiznet5k_asyncio import AsyncSocket
+
+    async def fetch():
+        sock = AsyncSocket()
+        await sock.connect(("192.168.1.1", 80))
+        await sock.sendall(b"GET / HTTP/1.0\\r\\n\\r\\n")
+        buffer = bytearray(512)
+        size = await sock.recv_into(buffer)
+        sock.close()
+        return buffer[:size]
+"""
+
+from __future__ import annotations
+
+try:
+    from typing import TYPE_CHECKING, Callable, Optional, Tuple, List
+
+    if TYPE_CHECKING:
+        from circuitpython_typing import ReadableBuffer, WriteableBuffer
+except ImportError:
+    pass
+
+import asyncio
+import time
+
+import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
+from adafruit_wiznet5k.adafruit_wiznet5k import SNSR_SOCK_CLOSED
+from adafruit_wiznet5k.adafruit_wiznet5k_socket import (
+    AF_INET,
+    SOCK_STREAM,
+    POLLIN,
+    POLLOUT,
+    POLLERR,
+    POLLHUP,
+    POLLNVAL,
+)
+
+# Polling interval in seconds while tasks are waiting on sockets.
+_POLL_INTERVAL = 0.01
+# Shortest interval between reads of INTn in interrupt mode. The interval doubles
+# while no interrupt is pending, up to _POLL_INTERVAL.
+_IRQ_POLL_INTERVAL = 0.001
+
+
+class _Poller:
+    """Wake tasks that are waiting on sockets, from a single polling task."""
+
+    def __init__(self) -> None:
+        # Waiters are [check, interrupt driven, asyncio.Event, result] lists. A waiter
+        # is woken when check() returns a true result. In interrupt mode, the check of
+        # an interrupt driven waiter is only repeated after events are latched.
+        self._waiters: List[list] = []
+        self._task = None
+        self._rescan = False
+
+    async def wait(self, sock: socket.socket, eventmask: int) -> int:
+        """
+        Wait until the socket has one of the events in eventmask.
+
+        :param socket.socket sock: The socket to wait on.
+        :param int eventmask: POLLIN and/or POLLOUT. POLLERR, POLLHUP and POLLNVAL are
+            always reported.
+
+        :return int: The events.
+        """
+        eventmask |= POLLERR | POLLHUP | POLLNVAL
+        # pylint: disable=protected-access
+        # Space freed in a TX buffer does not raise an interrupt.
+        return await self._wait(
+            lambda: sock._poll() & eventmask, not eventmask & POLLOUT
+        )
+
+    async def wait_connected(self, sock: socket.socket) -> int:
+        """
+        Wait until a TCP connection is established or fails. In interrupt mode, the
+        socket is only checked after a CON, DISCON or TIMEOUT interrupt.
+
+        :param socket.socket sock: The connecting socket.
+
+        :return int: POLLOUT if the connection is established, otherwise POLLERR,
+            POLLHUP or POLLNVAL.
+        """
+        eventmask = POLLOUT | POLLERR | POLLHUP | POLLNVAL
+        # pylint: disable=protected-access
+        return await self._wait(lambda: sock._poll() & eventmask, True)
+
+    async def wait_sent(self, sock: socket.socket) -> None:
+        """
+        Wait until the chip has sent the data written to the socket. In interrupt mode,
+        the socket is only checked after a SEND_OK or TIMEOUT interrupt.
+
+        :param socket.socket sock: The sending socket.
+        """
+        interface = socket._the_interface  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        await self._wait(
+            lambda: sock._socket_closed
+            or not interface.socket_send_busy(sock._socknum),
+            True,
+        )
+
+    async def _wait(self, check: Callable[[], int], interrupt: bool) -> int:
+        """
+        Wait until check() returns a true result.
+
+        :param Callable[[], int] check: Checks the socket.
+        :param bool interrupt: True if an interrupt is raised when the result changes.
+
+        :return int: The result of check().
+        """
+        waiter = [check, interrupt, asyncio.Event(), 0]
+        self._waiters.append(waiter)
+        # The socket may already be ready, check it without waiting for an interrupt.
+        self._rescan = True
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            await waiter[2].wait()
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        return waiter[3]
+
+    async def _run(self) -> None:
+        """Check the sockets with waiting tasks until no task is waiting."""
+        interface = socket._the_interface  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        interrupts = interface._interrupt_count
+        idle_sleep = _IRQ_POLL_INTERVAL
+        try:
+            while self._waiters:
+                interrupt_mode = interface.interrupt_mode
+                if interrupt_mode:
+                    # Latch the events if INTn is asserted, without waiting.
+                    interface.wait_for_interrupt(0, 0)
+                # Events may also have been latched by the socket calls of other tasks.
+                rescan = (
+                    self._rescan
+                    or not interrupt_mode
+                    or interface._interrupt_count != interrupts
+                )
+                interrupts = interface._interrupt_count
+                self._rescan = False
+                for waiter in tuple(self._waiters):
+                    if rescan or not waiter[1]:
+                        result = waiter[0]()
+                        if result:
+                            waiter[3] = result
+                            self._waiters.remove(waiter)
+                            waiter[2].set()
+                # Polling the sockets is throttled to _POLL_INTERVAL, as
+                # socket.poll.poll() does. While only waiting for INTn, back off
+                # from _IRQ_POLL_INTERVAL until an interrupt is latched.
+                if interrupt_mode and all(waiter[1] for waiter in self._waiters):
+                    idle_sleep = (
+                        _IRQ_POLL_INTERVAL
+                        if rescan
+                        else min(idle_sleep * 2, _POLL_INTERVAL)
+                    )
+                    await asyncio.sleep(idle_sleep)
+                else:
+                    await asyncio.sleep(_POLL_INTERVAL)
+        finally:
+            self._task = None
+
+
+_poller = _Poller()
+
+
+async def gethostbyname(hostname: str) -> str:
+    """
+    Translate a host name to IPv4 address format, as socket.gethostbyname() does.
+    Other tasks keep running while waiting for the DNS response, and several lookups
+    can be in flight at the same time.
+
+    :param str hostname: Hostname to lookup.
+
+    :return str: IPv4 address (a string of the form '0.0.0.0').
+
+    :raises RuntimeError: If the DNS lookup fails.
+    """
+    # pylint: disable=protected-access
+    if socket._is_ipv4_string(hostname):
+        return hostname
+    addresses = await _get_host_addresses(hostname)
+    return socket._the_interface.pretty_ip(addresses[0])
+
+
+async def _get_host_addresses(hostname: str) -> List[bytes]:
+    """
+    Look up all the IPv4 addresses of a host name without blocking other tasks.
+
+    :param str hostname: Hostname to lookup.
+
+    :return List[bytes]: The IPv4 addresses as 4 byte arrays.
+
+    :raises RuntimeError: If the DNS lookup fails.
+    """
+    # pylint: disable=protected-access
+    interface = socket._the_interface
+    if socket._is_ipv4_string(hostname):
+        return [interface.unpretty_ip(hostname)]
+    name = bytes(hostname, "utf-8")
+    addresses = interface._cached_hosts(name)
+    if addresses is None:
+        client = interface.dns_client
+        query_id = client.start_query(name)
+        try:
+            result = client.result(query_id)
+            while result is None:
+                await asyncio.sleep(_POLL_INTERVAL)
+                client.poll()
+                result = client.result(query_id)
+        finally:
+            # Forget the query if the task was cancelled.
+            client.cancel(query_id)
+        addresses = interface._resolved_hosts(name, *result)
+    return addresses
+
+
+class AsyncSocket:
+    """
+    A socket with awaitable connect, accept, recv_into and sendall methods, for use
+    with asyncio.
+    """
+
+    def __init__(
+        self,
+        family: int = AF_INET,
+        type: int = SOCK_STREAM,
+        *,
+        sock: Optional[socket.socket] = None,
+    ) -> None:
+        """
+        :param int family: Socket address (and protocol) family, defaults to AF_INET.
+        :param int type: Socket type, use SOCK_STREAM for TCP and SOCK_DGRAM for UDP,
+            defaults to SOCK_STREAM.
+        :param Optional[socket.socket] sock: An existing socket to wrap instead of
+            creating a new one, defaults to None.
+        """
+        self._sock = socket.socket(family, type) if sock is None else sock
+
+    @property
+    def socket(self) -> socket.socket:
+        """The wrapped socket."""
+        return self._sock
+
+    def bind(self, address: Tuple[Optional[str], int]) -> None:
+        """
+        Bind the socket to address.
+
+        :param Tuple[Optional[str], int] address: Address as a (host, port) tuple.
+        """
+        self._sock.bind(address)
+
+    def listen(self, backlog: int = 0) -> None:
+        """
+        Enable a server to accept connections.
+
+        :param int backlog: Included for compatibility but ignored.
+        """
+        self._sock.listen(backlog)
+
+    def close(self) -> None:
+        """Close the socket."""
+        self._sock.close()
+
+    def setsockopt(self, level: int, optname: int, value: int) -> None:
+        """
+        Set a socket option, see socket.setsockopt().
+
+        :param int level: SOL_SOCKET or IPPROTO_TCP.
+        :param int optname: The option.
+        :param int value: The option value.
+        """
+        self._sock.setsockopt(level, optname, value)
+
+    def getpeername(self) -> Tuple[str, int]:
+        """
+        Return the remote address to which the socket is connected.
+
+        :return Tuple[str, int]: IPv4 address and port the socket is connected to.
+        """
+        return self._sock.getpeername()
+
+    async def connect(self, address: Tuple[str, int]) -> None:
+        """
+        Connect to a remote socket at address. A host name is resolved without
+        blocking other tasks. If it has several addresses, a TCP connection is tried
+        to each in turn until one succeeds.
+
+        :param Tuple[str, int] address: Remote socket as a (host, port) tuple.
+
+        :raises ConnectionError: If the TCP connection cannot be established.
+        """
+        # pylint: disable=protected-access
+        interface = socket._the_interface
+        sock = self._sock
+        hosts = await _get_host_addresses(address[0])
+        if sock._sock_type != SOCK_STREAM:
+            hosts = hosts[:1]
+        for host in hosts:
+            if sock._listen_port is not None:
+                interface.src_port = sock._listen_port
+            start = time.monotonic()
+            try:
+                interface.socket_connect(
+                    sock._socknum, host, address[1], sock._sock_type, wait=False
+                )
+            finally:
+                interface.src_port = 0
+            sock._buffer = b""
+            if sock._sock_type != SOCK_STREAM:
+                sock._udp_open = True
+                sock._destination = address
+                return
+            if await _poller.wait_connected(sock) & POLLOUT:
+                break
+        else:
+            raise ConnectionError("Failed to establish connection.")
+        if sock._retry_adaptive:
+            sock._adapt_retry_time(time.monotonic() - start)
+        sock._set_keepalive_timer()
+
+    async def accept(self) -> Tuple[AsyncSocket, Tuple[str, int]]:
+        """
+        Accept a connection. The socket must be bound to an address and listening for
+        connections.
+
+        :return Tuple[AsyncSocket, Tuple[str, int]]: The new socket for the connection
+            and the address of the other end of the connection.
+        """
+        while not await _poller.wait(self._sock, POLLIN) & POLLIN:
+            # The listening hardware socket has closed, listen again.
+            self._sock.listen()
+        conn, address = self._sock.accept()
+        return AsyncSocket(sock=conn), address
+
+    async def recv_into(self, buffer: WriteableBuffer, nbytes: int = 0) -> int:
+        """
+        Receive data into a buffer, waiting until some data is available.
+
+        :param WriteableBuffer buffer: The buffer to read into.
+        :param int nbytes: Maximum number of bytes to receive, defaults to 0 which
+            reads up to the length of the buffer.
+
+        :return int: The number of bytes received, 0 if the connection was closed.
+
+        :raises RuntimeError: If the socket has been closed.
+        """
+        events = await _poller.wait(self._sock, POLLIN)
+        if events & POLLIN:
+            return self._sock.recv_into(buffer, nbytes)
+        if events & POLLNVAL:
+            raise RuntimeError("The socket has been closed.")
+        return 0
+
+    async def sendall(self, data: ReadableBuffer) -> None:
+        """
+        Send all the data, waiting for space in the socket's TX buffer as needed.
+        Returns once the chip has sent all the data.
+
+        :param ReadableBuffer data: The data to send.
+
+        :raises RuntimeError: If the connection is closed before all the data is sent.
+        """
+        # pylint: disable=protected-access
+        interface = socket._the_interface
+        socknum = self._sock._socknum
+        view = memoryview(data)
+        sent = 0
+        while sent < len(view):
+            if not await _poller.wait(self._sock, POLLOUT) & POLLOUT:
+                raise RuntimeError("Unable to write data to the socket.")
+            sent += interface.socket_send(socknum, view[sent:])
+        # Data queued behind a SEND in progress is sent when the SEND completes.
+        await _poller.wait_sent(self._sock)
+        # A TCP connection is closed by the chip if the SEND times out.
+        if (
+            self._sock._socket_closed
+            or interface.socket_status(socknum) == SNSR_SOCK_CLOSED
+        ):
+            raise RuntimeError("Unable to write data to the socket.")
@@ -2,16 +2,38 @@
 #
 # SPDX-License-Identifier: MIT
 
-"""Makes a debug message function available to all modules."""
+"""
+Makes a debug message function available to all modules, and provides opt-in
+instrumentation of the SPI traffic generated by a WIZNET5K instance.
+"""
+
+from __future__ import annotations
+
 try:
-    from typing import TYPE_CHECKING, Union
+    from typing import TYPE_CHECKING, Union, Sequence, Callable, Dict, Optional
 
     if TYPE_CHECKING:
+        from circuitpython_typing import ReadableBuffer, WriteableBuffer
+        from adafruit_bus_device.spi_device import SPIDevice
         from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
 except ImportError:
     pass
 
 import gc
+import time
+
+# Methods instrumented by default.
+INSTRUMENTED_METHODS = (
+    "get_socket",
+    "socket_available",
+    "socket_connect",
+    "socket_read",
+    "socket_read_into",
+    "socket_write",
+    "socket_send",
+    "read_udp",
+    "read_udp_into",
+)
 
 
 def debug_msg(
@@ -47,3 +69,134 @@ def _hexdump(src: bytes):
         text = "".join((chr(x) if 0x20 <= x < 0x7F else "." for x in chunk))
         result.append("{:04x}   {:<48}   {}".format(i, hexa, text))
     return "\n".join(result)
+
+
+class _CountingSPIDevice:
+    """
+    Wrap an SPIDevice to count the SPI transactions and the bytes moved. Counts are
+    accumulated in a list of [transactions, bytes written, bytes read].
+    """
+
+    def __init__(self, device: SPIDevice, totals: list) -> None:
+        self.device = device
+        self._totals = totals
+        self._bus = None
+
+    def __enter__(self) -> _CountingSPIDevice:
+        self._totals[0] += 1
+        self._bus = self.device.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return self.device.__exit__(exc_type, exc_value, traceback)
+
+    def write(
+        self, buffer: ReadableBuffer, *, start: int = 0, end: Optional[int] = None
+    ):
+        """Write bytes to the bus, counting them."""
+        if end is None:
+            end = len(buffer)
+        self._totals[1] += end - start
+        self._bus.write(buffer, start=start, end=end)
+
+    def readinto(
+        self,
+        buffer: WriteableBuffer,
+        *,
+        start: int = 0,
+        end: Optional[int] = None,
+        write_value: int = 0,
+    ):
+        """Read bytes from the bus, counting them."""
+        if end is None:
+            end = len(buffer)
+        self._totals[2] += end - start
+        self._bus.readinto(buffer, start=start, end=end, write_value=write_value)
+
+
+class Instrumentation:
+    """
+    Count the SPI transactions, bytes moved and time spent by a WIZNET5K instance, in
+    total and for each instrumented method. Create an instance with
+    WIZNET5K.enable_instrumentation().
+
+    Counts for a method include the methods it calls, so the time spent in
+    socket_write includes the time spent in socket_send.
+    """
+
+    def __init__(
+        self, interface: WIZNET5K, methods: Sequence[str] = INSTRUMENTED_METHODS
+    ) -> None:
+        """
+        :param WIZNET5K interface: The interface to instrument.
+        :param Sequence[str] methods: Names of the interface methods to instrument,
+            defaults to INSTRUMENTED_METHODS.
+        """
+        self._interface = interface
+        # SPI transactions, bytes written and bytes read.
+        self._totals = [0, 0, 0]
+        # Calls, SPI transactions, bytes written, bytes read and seconds, per method.
+        self._methods = {}
+        # pylint: disable=protected-access
+        interface._device = _CountingSPIDevice(interface._device, self._totals)
+        for name in methods:
+            self._methods[name] = [0, 0, 0, 0, 0.0]
+            setattr(interface, name, self._wrap(getattr(interface, name), name))
+
+    def _wrap(self, method: Callable, name: str) -> Callable:
+        """Return a function that calls method and records its statistics."""
+        stats = self._methods[name]
+        totals = self._totals
+
+        def instrumented(*args, **kwargs):
+            transactions, written, read = totals
+            start = time.monotonic()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats[4] += time.monotonic() - start
+                stats[0] += 1
+                stats[1] += totals[0] - transactions
+                stats[2] += totals[1] - written
+                stats[3] += totals[2] - read
+
+        return instrumented
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        The statistics collected since instrumentation was enabled or last reset.
+
+        :return Dict[str, object]: Total "transactions", "bytes_written" and
+            "bytes_read", and a "methods" dictionary with "calls", "transactions",
+            "bytes_written", "bytes_read" and "seconds" for each instrumented method.
+        """
+        methods = {}
+        for name, stats in self._methods.items():
+            methods[name] = {
+                "calls": stats[0],
+                "transactions": stats[1],
+                "bytes_written": stats[2],
+                "bytes_read": stats[3],
+                "seconds": stats[4],
+            }
+        return {
+            "transactions": self._totals[0],
+            "bytes_written": self._totals[1],
+            "bytes_read": self._totals[2],
+            "methods": methods,
+        }
+
+    def reset(self) -> None:
+        """Zero all the statistics."""
+        for index in range(3):
+            self._totals[index] = 0
+        for stats in self._methods.values():
+            stats[:] = [0, 0, 0, 0, 0.0]
+
+    def remove(self) -> None:
+        """Restore the interface's SPI device and uninstrumented methods."""
+        interface = self._interface
+        # pylint: disable=protected-access
+        interface._device = interface._device.device
+        for name in self._methods:
+            delattr(interface, name)
@@ -14,12 +14,14 @@ Pure-Python implementation of Jordan Terrell's DHCP library v0.3
 * Author(s): Jordan Terrell, Brent Rubell, Martin Stephens
 
 """
+
 from __future__ import annotations
 
 try:
     from typing import TYPE_CHECKING, Optional, Union, Tuple
 
     if TYPE_CHECKING:
+        from circuitpython_typing import WriteableBuffer
         from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
 except ImportError:
     pass
@@ -40,6 +42,8 @@ _STATE_REQUESTING = const(0x03)
 _STATE_BOUND = const(0x04)
 _STATE_RENEWING = const(0x05)
 _STATE_REBINDING = const(0x06)
+_STATE_INIT_REBOOT = const(0x07)
+_STATE_REBOOTING = const(0x08)
 
 # DHCP Message Types
 _DHCP_DISCOVER = const(1)
@@ -66,8 +70,9 @@ _MAX_DHCP_OPT = const(0x10)
 
 _SNMR_UDP = const(0x02)
 
-# Default DHCP Server port
+# Default DHCP Server and client ports
 _DHCP_SERVER_PORT = const(67)
+_DHCP_CLIENT_PORT = const(68)
 # DHCP Lease Time, in seconds
 _BROADCAST_SERVER_ADDR = b"\xff\xff\xff\xff"  # (255.255.255.255)
 _UNASSIGNED_IP_ADDR = b"\x00\x00\x00\x00"  # (0.0.0.0)
@@ -83,6 +88,14 @@ _T2_VAL = const(59)
 _LEASE_TIME = const(51)
 _OPT_END = const(255)
 
+# Saved lease: magic number, IP address, DHCP server and lease expiry in time.time()
+# seconds.
+_LEASE_MAGIC = b"WZL\x01"
+_LEASE_RECORD_LENGTH = const(16)
+# time.time() before 2020-01-01 means the clock has not been set, e.g. a board without
+# a battery backed RTC, and an expiry cannot be saved.
+_CLOCK_SET = const(1577836800)
+
 # Packet buffer
 _BUFF_LENGTH = 512
 _BUFF = bytearray(_BUFF_LENGTH)
@@ -94,13 +107,12 @@ class DHCP:
     Implements a DHCP client using a finite state machine (FSM). This allows the DHCP client
     to run in a non-blocking mode suitable for CircuitPython.
 
-    The DHCP client obtains a lease and maintains it. The process of obtaining the initial
-    lease is run in a blocking mode, as several messages must be exchanged with the DHCP
-    server. Once the lease has been allocated, lease maintenance can be performed in
-    non-blocking mode as nothing needs to be done until it is time to reallocate the
-    lease. Renewing or rebinding is a simpler process which may be repeated periodically
-    until successful. If the lease expires, the client attempts to obtain a new lease in
-    blocking mode when the maintenance routine is run.
+    The DHCP client obtains a lease and maintains it. In non-blocking mode each call to
+    maintain_dhcp_lease() does at most one unit of work, sending a message or checking
+    for one response, and returns. The UDP socket stays open between calls until the
+    lease is bound. In blocking mode the same steps are repeated until the lease is
+    bound. Renewing or rebinding is a simpler process which is repeated periodically
+    until successful. If the lease expires, the client starts obtaining a new lease.
 
     These class methods are not designed to be called directly. They should be called via
     methods in the WIZNET5K class.
@@ -118,6 +130,15 @@ class DHCP:
     The DHCPRELEASE message is not implemented. The DHCP protocol does not require it and
     DHCP servers can handle disappearing clients and clients that ask for 'replacement'
     IP addresses.
+
+    If a lease store is given, each lease is saved to it. After a restart, a saved lease
+    that has not expired is requested again (INIT-REBOOT) in a single exchange. Only if
+    the server refuses it, or does not respond, is a new lease obtained. To limit wear on
+    non-volatile memory, the record is only rewritten when the address or server
+    changes, or when less than a quarter of the lease is left on the saved expiry, so
+    renewals write it at most every other time. The expiry is in time.time() seconds,
+    so leases are only saved once the clock has been set, e.g. by NTP. With the clock
+    unset, a saved lease is still requested and the server decides if it is valid.
     """
 
     # pylint: disable=too-many-arguments, too-many-instance-attributes, invalid-name
@@ -127,6 +148,8 @@ class DHCP:
         mac_address: bytes,
         hostname: Optional[str] = None,
         debug: bool = False,
+        lease_store: Optional[WriteableBuffer] = None,
+        lease_offset: int = 0,
     ) -> None:
         """
         :param adafruit_wiznet5k.WIZNET5K eth: Wiznet 5k object
@@ -134,6 +157,11 @@ class DHCP:
         :param Optional[str] hostname: The desired hostname, with optional {} to fill
             in the MAC address, defaults to None.
         :param bool debug: Enable debugging output.
+        :param Optional[WriteableBuffer] lease_store: Non-volatile memory to save the
+            lease in, such as microcontroller.nvm, defaults to None. Leases are only
+            saved once time.time() has been set.
+        :param int lease_offset: Offset of the 16 byte lease record in lease_store,
+            defaults to 0.
         """
         self._debug = debug
         debug_msg("Initialising DHCP client instance.", self._debug)
@@ -154,6 +182,11 @@ class DHCP:
         self._start_time = 0.0
         self._blocking = False
         self._renew = None
+        # The UDP socket used for an exchange, the number of times the current message
+        # has been resent (None before it is first sent) and when it is next resent.
+        self._sock = None
+        self._attempt = None
+        self._next_resend = 0.0
 
         # DHCP binding configuration
         self.dhcp_server_ip = _BROADCAST_SERVER_ADDR
@@ -161,12 +194,19 @@ class DHCP:
         self.gateway_ip = _UNASSIGNED_IP_ADDR
         self.subnet_mask = _UNASSIGNED_IP_ADDR
         self.dns_server_ip = _UNASSIGNED_IP_ADDR
+        self.secondary_dns_ip = None
 
         # Lease expiry times
         self._t1 = 0
         self._t2 = 0
         self._lease = 0
 
+        # Saved lease
+        self._lease_store = lease_store
+        self._lease_offset = lease_offset
+        self._reboot_ip = None
+        self._load_lease()
+
         # Host name
         mac_string = "".join("{:02X}".format(o) for o in mac_address)
         self._hostname = bytes(
@@ -186,7 +226,12 @@ class DHCP:
     def maintain_dhcp_lease(self, blocking: bool = False) -> None:
         """
         Maintain a DHCP lease.
-        :param bool blocking: Run the DHCP FSM in non-blocking mode.
+
+        In non-blocking mode each call sends a message or checks for one response, so
+        the lease is obtained or renewed over several calls.
+
+        :param bool blocking: Run the DHCP FSM until the lease is bound or renewing it
+            has failed, defaults to False.
         """
         debug_msg("Maintaining lease with blocking = {}".format(blocking), self._debug)
         self._dhcp_state_machine(blocking=blocking)
@@ -206,10 +251,52 @@ class DHCP:
         self.local_ip = _UNASSIGNED_IP_ADDR
         self.subnet_mask = _UNASSIGNED_IP_ADDR
         self.dns_server_ip = _UNASSIGNED_IP_ADDR
+        self.secondary_dns_ip = None
         self._renew = None
+        self._attempt = None
         self._increment_transaction_id()
         self._start_time = time.monotonic()
 
+    def _load_lease(self) -> None:
+        """Start in INIT-REBOOT state if a saved lease has not expired."""
+        if self._lease_store is None:
+            return
+        offset = self._lease_offset
+        record = bytes(self._lease_store[offset : offset + _LEASE_RECORD_LENGTH])
+        if record[:4] != _LEASE_MAGIC:
+            return
+        if int.from_bytes(record[12:16], "big") <= time.time():
+            debug_msg("Saved DHCP lease has expired.", self._debug)
+            return
+        debug_msg("Found saved DHCP lease.", self._debug)
+        self._reboot_ip = record[4:8]
+        self._dhcp_state = _STATE_INIT_REBOOT
+
+    def _save_lease(self) -> None:
+        """
+        Save the lease that has just been bound, unless the saved record is for the
+        same address and server and has at least a quarter of the lease left.
+        """
+        if self._lease_store is None:
+            return
+        now = time.time()
+        if now < _CLOCK_SET:
+            debug_msg("Clock not set, DHCP lease not saved.", self._debug)
+            return
+        expiry = int(now + self._lease - time.monotonic())
+        offset = self._lease_offset
+        record = _LEASE_MAGIC + bytes(self.local_ip) + bytes(self.dhcp_server_ip)
+        saved = bytes(self._lease_store[offset : offset + _LEASE_RECORD_LENGTH])
+        if (
+            saved[:12] == record
+            and int.from_bytes(saved[12:16], "big") - now >= (expiry - now) // 4
+        ):
+            return
+        debug_msg("Saving DHCP lease.", self._debug)
+        self._lease_store[offset : offset + _LEASE_RECORD_LENGTH] = record + max(
+            expiry, 0
+        ).to_bytes(4, "big")
+
     def _increment_transaction_id(self) -> None:
         """Increment the transaction ID and roll over from 0x7fffffff to 0."""
         debug_msg("Incrementing transaction ID", self._debug)
@@ -238,31 +325,25 @@ class DHCP:
         delay = 2**attempt * interval + randint(-1, 1) + time.monotonic()
         return delay
 
-    def _receive_dhcp_response(self, socket_num: int, timeout: float) -> int:
+    def _receive_dhcp_response(self) -> int:
         """
-        Receive data from the socket in response to a DHCP query.
+        Receive a response to a DHCP query, if one is waiting.
 
-        Reads data from the buffer until a viable minimum packet size has been
-        received or the operation times out. If a viable packet is received, it is
-        stored in the global buffer and the number of bytes received is returned.
-        If the packet is too short, it is discarded and zero is returned. The
-        maximum packet size is limited by the size of the global buffer.
+        If a viable packet has been received, it is stored in the global buffer and the
+        number of bytes received is returned. The maximum packet size is limited by the
+        size of the global buffer.
 
-        :param int socket_num: Socket to read from.
-        :param float timeout: time.monotonic at which attempt should time out.
-
-        :returns int: The number of bytes stored in the global buffer.
+        :returns int: The number of bytes stored in the global buffer, 0 if no packet
+            was waiting.
         """
-        debug_msg("Receiving a DHCP response.", self._debug)
-        while time.monotonic() < timeout:
-            # DHCP returns the query plus additional data. The query length is 236 bytes.
-            if self._eth.socket_available(socket_num, _SNMR_UDP) > 236:
-                bytes_count, bytes_read = self._eth.read_udp(socket_num, _BUFF_LENGTH)
-                _BUFF[:bytes_count] = bytes_read
-                debug_msg("Received {} bytes".format(bytes_count), self._debug)
-                del bytes_read
-                gc.collect()
-                return bytes_count
+        # DHCP returns the query plus additional data. The query length is 236 bytes.
+        if self._eth.socket_available(self._sock, _SNMR_UDP) > 236:
+            bytes_count, bytes_read = self._eth.read_udp(self._sock, _BUFF_LENGTH)
+            _BUFF[:bytes_count] = bytes_read
+            debug_msg("Received {} bytes".format(bytes_count), self._debug)
+            del bytes_read
+            gc.collect()
+            return bytes_count
         return 0  # No bytes received.
 
     def _process_messaging_states(self, *, message_type: int):
@@ -278,8 +359,8 @@ class DHCP:
         if self._dhcp_state == _STATE_SELECTING and message_type == _DHCP_OFFER:
             debug_msg("FSM state is SELECTING with valid OFFER.", self._debug)
             self._dhcp_state = _STATE_REQUESTING
-        elif self._dhcp_state == _STATE_REQUESTING:
-            debug_msg("FSM state is REQUESTING.", self._debug)
+        elif self._dhcp_state in (_STATE_REQUESTING, _STATE_REBOOTING):
+            debug_msg("FSM state is REQUESTING or REBOOTING.", self._debug)
             if message_type == _DHCP_NAK:
                 debug_msg("Message is NAK, setting FSM state to INIT.", self._debug)
                 self._dhcp_state = _STATE_INIT
@@ -296,147 +377,165 @@ class DHCP:
                         self.gateway_ip,
                         self.dns_server_ip,
                     )
+                    self._eth.secondary_dns = self.secondary_dns_ip
                 self._renew = None
                 self._dhcp_state = _STATE_BOUND
+                self._save_lease()
 
-    def _handle_dhcp_message(self) -> int:
-        """Send, receive and process DHCP message. Update the finite state machine (FSM).
-
-        Send a message and wait for a response from the DHCP server, resending on an
-        exponential fallback schedule matching the DHCP standard if no response is received.
-        Only called when the FSM is in SELECTING or REQUESTING states.
-
-        :returns int: The DHCP message type, or 0 if no message received in non-blocking
-            or renewing states.
-
-        :raises ValueError: If the function is not called from SELECTING or BLOCKING FSM
-            states.
-        :raises TimeoutError: If the FSM is in blocking mode and no valid response has
-            been received before the timeout expires.
+    def _send_dhcp_message(self) -> None:
+        """
+        Send the message for the SELECTING or REQUESTING state, opening the UDP socket
+        for the exchange if it is not open, and set the time to resend it.
         """
-        # pylint: disable=too-many-branches
-        debug_msg("Processing SELECTING or REQUESTING state.", self._debug)
         if self._dhcp_state == _STATE_SELECTING:
             msg_type_out = _DHCP_DISCOVER
-        elif self._dhcp_state == _STATE_REQUESTING:
-            msg_type_out = _DHCP_REQUEST
         else:
-            raise ValueError(
-                "FSM can only send messages while in SELECTING or REQUESTING states."
-            )
-        debug_msg("Setting up connection for DHCP.", self._debug)
+            msg_type_out = _DHCP_REQUEST
         if self._renew:
             dhcp_server = self.dhcp_server_ip
         else:
             dhcp_server = _BROADCAST_SERVER_ADDR
-        sock_num = None
-        deadline = time.monotonic() + 5.0
-        try:
-            while sock_num is None:
-                sock_num = self._eth.get_socket()
-                if sock_num == 0xFF:
-                    sock_num = None
-                if time.monotonic() > deadline:
-                    raise RuntimeError("Unable to initialize UDP socket.")
-
-            self._eth.src_port = 68
-            self._eth.socket_connect(
-                sock_num, dhcp_server, _DHCP_SERVER_PORT, conn_mode=0x02
-            )
-            self._eth.src_port = 0
-
-            message_length = self._generate_dhcp_message(message_type=msg_type_out)
-            for attempt in range(4):  # Initial attempt plus 3 retries.
-                self._eth.socket_write(sock_num, _BUFF[:message_length])
-                next_resend = self._next_retry_time(attempt=attempt)
-                while time.monotonic() < next_resend:
-                    if self._receive_dhcp_response(sock_num, next_resend):
-                        try:
-                            msg_type_in = self._parse_dhcp_response()
-                            debug_msg(
-                                "Received message type {}".format(msg_type_in),
-                                self._debug,
-                            )
-                            return msg_type_in
-                        except ValueError as error:
-                            debug_msg(error, self._debug)
-                    if not self._blocking or self._renew:
-                        debug_msg(
-                            "No message, FSM is nonblocking or renewing, exiting loop.",
-                            self._debug,
-                        )
-                        return 0  # Did not receive a response in a single attempt.
-            raise TimeoutError(
-                "No response from DHCP server after {} retries.".format(attempt)
+        if self._sock is None:
+            debug_msg("Setting up connection for DHCP.", self._debug)
+            self._sock = self._eth.get_socket()
+            self._eth.src_port = _DHCP_CLIENT_PORT
+            try:
+                self._eth.socket_connect(
+                    self._sock, dhcp_server, _DHCP_SERVER_PORT, conn_mode=0x02
+                )
+            finally:
+                self._eth.src_port = 0
+        else:
+            self._eth.socket_set_destination(self._sock, dhcp_server, _DHCP_SERVER_PORT)
+        message_length = self._generate_dhcp_message(message_type=msg_type_out)
+        self._eth.socket_write(self._sock, _BUFF[:message_length])
+        self._next_resend = self._next_retry_time(attempt=self._attempt)
+
+    def _close_socket(self) -> None:
+        """Close the UDP socket at the end of an exchange."""
+        if self._sock is not None:
+            self._eth.socket_close(self._sock)
+            self._sock = None
+
+    def _handle_dhcp_message(self) -> None:
+        """Send, or receive and process, one DHCP message. Update the finite state
+        machine (FSM).
+
+        The message for the state is sent on the first call, then each call checks
+        for a response and resends the message on an exponential fallback schedule
+        matching the DHCP standard. Only called when the FSM is in SELECTING,
+        REQUESTING or REBOOTING states.
+
+        :raises TimeoutError: If the FSM is in blocking mode and no valid response has
+            been received to the initial message and 3 retries.
+        """
+        if self._attempt is None:
+            self._attempt = 0
+            self._send_dhcp_message()
+            return
+        if self._receive_dhcp_response():
+            try:
+                msg_type_in = self._parse_dhcp_response()
+            except ValueError as error:
+                debug_msg(error, self._debug)
+                return
+            debug_msg("Received message type {}".format(msg_type_in), self._debug)
+            state = self._dhcp_state
+            self._process_messaging_states(message_type=msg_type_in)
+            if self._dhcp_state != state:
+                # The next state starts with a new message.
+                self._attempt = None
+                if self._dhcp_state == _STATE_BOUND:
+                    self._close_socket()
+            return
+        if time.monotonic() < self._next_resend:
+            return
+        if self._attempt < 3:  # Initial attempt plus 3 retries.
+            self._attempt += 1
+            self._send_dhcp_message()
+            return
+        self._attempt = None
+        if self._renew:
+            debug_msg(
+                "Lease has not expired, resetting state to BOUND.",
+                self._debug,
             )
-        finally:
-            self._eth.socket_close(sock_num)  # Close the socket whatever happens.
+            self._close_socket()
+            self._dhcp_state = _STATE_BOUND
+        elif self._dhcp_state == _STATE_REBOOTING:
+            debug_msg("No response to INIT-REBOOT, switching to INIT.", self._debug)
+            self._dhcp_state = _STATE_INIT
+        elif self._blocking:
+            self._close_socket()
+            raise TimeoutError("No response from DHCP server after 3 retries.")
+        else:
+            debug_msg("No response from DHCP server, restarting.", self._debug)
+            self._dhcp_state = _STATE_INIT
 
     def _dhcp_state_machine(self, *, blocking: bool = False) -> None:
         """
         A finite state machine to allow the DHCP lease to be managed without blocking
-        the main program. The initial lease...
+        the main program. Each step makes the state changes due and then sends a
+        message or checks for one response. In blocking mode, steps are repeated until
+        the FSM is in BOUND state.
+
+        :param bool blocking: Repeat steps until the FSM is in BOUND state.
+
+        :raises TimeoutError: If the FSM is in blocking mode and the DHCP server does
+            not respond.
         """
         debug_msg("DHCP FSM called with blocking = {}".format(blocking), self._debug)
         debug_msg("FSM initial state is {}".format(self._dhcp_state), self._debug)
         self._blocking = blocking
         while True:
-            if self._dhcp_state == _STATE_BOUND:
-                now = time.monotonic()
-                if now < self._t1:
-                    debug_msg("No timers have expired. Exiting FSM.", self._debug)
-                    return
-                if now > self._lease:
-                    debug_msg(
-                        "Lease has expired, switching state to INIT.", self._debug
-                    )
-                    self._blocking = True
-                    self._dhcp_state = _STATE_INIT
-                elif now > self._t2:
-                    debug_msg(
-                        "T2 has expired, switching state to REBINDING.", self._debug
-                    )
-                    self._dhcp_state = _STATE_REBINDING
-                else:
-                    debug_msg(
-                        "T1 has expired, switching state to RENEWING.", self._debug
-                    )
-                    self._dhcp_state = _STATE_RENEWING
-
-            if self._dhcp_state == _STATE_RENEWING:
-                debug_msg("FSM state is RENEWING.", self._debug)
-                self._renew = "renew"
-                self._start_time = time.monotonic()
-                self._dhcp_state = _STATE_REQUESTING
-
-            if self._dhcp_state == _STATE_REBINDING:
-                debug_msg("FSM state is REBINDING.", self._debug)
-                self._renew = "rebind"
-                self.dhcp_server_ip = _BROADCAST_SERVER_ADDR
-                self._start_time = time.monotonic()
-                self._dhcp_state = _STATE_REQUESTING
-
-            if self._dhcp_state == _STATE_INIT:
-                debug_msg("FSM state is INIT.", self._debug)
-                self._dsm_reset()
-                self._dhcp_state = _STATE_SELECTING
-
-            if self._dhcp_state == _STATE_SELECTING:
-                debug_msg("FSM state is SELECTING.", self._debug)
-                self._process_messaging_states(message_type=self._handle_dhcp_message())
-
-            if self._dhcp_state == _STATE_REQUESTING:
-                debug_msg("FSM state is REQUESTING.", self._debug)
-                self._process_messaging_states(message_type=self._handle_dhcp_message())
-
-            if self._renew:
-                debug_msg(
-                    "Lease has not expired, resetting state to BOUND and exiting FSM.",
-                    self._debug,
-                )
-                self._dhcp_state = _STATE_BOUND
+            self._dhcp_step()
+            if not blocking or self._dhcp_state == _STATE_BOUND:
                 return
-            gc.collect()
+
+    def _dhcp_step(self) -> None:
+        """Make one step of the FSM."""
+        if self._dhcp_state == _STATE_BOUND:
+            now = time.monotonic()
+            if now < self._t1:
+                return
+            if now > self._lease:
+                debug_msg("Lease has expired, switching state to INIT.", self._debug)
+                self._dhcp_state = _STATE_INIT
+            elif now > self._t2:
+                debug_msg("T2 has expired, switching state to REBINDING.", self._debug)
+                self._dhcp_state = _STATE_REBINDING
+            else:
+                debug_msg("T1 has expired, switching state to RENEWING.", self._debug)
+                self._dhcp_state = _STATE_RENEWING
+
+        if self._dhcp_state == _STATE_RENEWING:
+            debug_msg("FSM state is RENEWING.", self._debug)
+            self._renew = "renew"
+            self._start_time = time.monotonic()
+            self._attempt = None
+            self._dhcp_state = _STATE_REQUESTING
+
+        if self._dhcp_state == _STATE_REBINDING:
+            debug_msg("FSM state is REBINDING.", self._debug)
+            self._renew = "rebind"
+            self.dhcp_server_ip = _BROADCAST_SERVER_ADDR
+            self._start_time = time.monotonic()
+            self._attempt = None
+            self._dhcp_state = _STATE_REQUESTING
+
+        if self._dhcp_state == _STATE_INIT_REBOOT:
+            debug_msg("FSM state is INIT-REBOOT.", self._debug)
+            self._dsm_reset()
+            self.local_ip = self._reboot_ip
+            self._dhcp_state = _STATE_REBOOTING
+
+        if self._dhcp_state == _STATE_INIT:
+            debug_msg("FSM state is INIT.", self._debug)
+            self._dsm_reset()
+            self._dhcp_state = _STATE_SELECTING
+
+        if self._dhcp_state in (_STATE_SELECTING, _STATE_REQUESTING, _STATE_REBOOTING):
+            self._handle_dhcp_message()
 
     def _generate_dhcp_message(
         self,
@@ -531,8 +630,9 @@ class DHCP:
             pointer = option_writer(
                 offset=pointer, option_code=50, option_data=self.local_ip
             )
-            # Set Server ID to chosen DHCP server IP address.
-            if self._renew != "rebind":
+            # Set Server ID to chosen DHCP server IP address. It is not set when
+            # rebinding or requesting a saved lease.
+            if self._renew != "rebind" and self._dhcp_state != _STATE_REBOOTING:
                 pointer = option_writer(
                     offset=pointer, option_code=54, option_data=self.dhcp_server_ip
                 )
@@ -618,6 +718,7 @@ class DHCP:
                 self.gateway_ip = data[:4]
             elif data_type == _DNS_SERVERS:
                 self.dns_server_ip = data[:4]
+                self.secondary_dns_ip = data[4:8] if len(data) >= 8 else None
             elif data_type == _T1_VAL:
                 self._t1 = int.from_bytes(data, "big")
             elif data_type == _T2_VAL:
@@ -13,10 +13,11 @@ ethernet modules.
 * Author(s): MCQN Ltd, Brent Rubell, Martin Stephens
 
 """
+
 from __future__ import annotations
 
 try:
-    from typing import TYPE_CHECKING, Union, Tuple
+    from typing import TYPE_CHECKING, Union, Tuple, Optional, List, Dict
 
     if TYPE_CHECKING:
         from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
@@ -32,8 +33,11 @@ _OPCODE_STANDARD_QUERY = const(0x00)
 _RECURSION_DESIRED_FLAG = 1 << 8
 
 _TYPE_A = const(0x0001)
+_TYPE_CNAME = const(0x0005)
 _CLASS_IN = const(0x0001)
 _DATA_LEN = const(0x0004)
+# Longest chain of CNAME answers followed to the type A answers.
+_MAX_CNAME_CHAIN = const(8)
 
 # Return codes for gethostbyname
 _SUCCESS = const(1)
@@ -43,6 +47,19 @@ _TRUNCATED = const(-3)
 _INVALID_RESPONSE = const(-4)
 
 _DNS_PORT = const(0x35)  # port used for DNS request
+_SNMR_UDP = const(0x02)
+
+# Seconds to wait for a response before sending the query to the next DNS server.
+_QUERY_TIMEOUT = 2.0
+# Number of times the query is sent to each DNS server.
+_QUERY_ATTEMPTS = const(2)
+# Polling interval in seconds while waiting for a response.
+_POLL_INTERVAL = 0.01
+
+# DNS cache defaults.
+_CACHE_SIZE = const(8)
+_CACHE_MAX_TTL = const(3600)  # Seconds.
+_CACHE_NEGATIVE_TTL = const(10)  # Seconds.
 
 
 def _debug_print(*, debug: bool, message: str) -> None:
@@ -92,20 +109,59 @@ def _build_dns_query(domain: bytes) -> Tuple[int, int, bytearray]:
     return query_id, len(query), query
 
 
+def _read_name(response: bytearray, pointer: int) -> Tuple[bytes, int]:
+    """
+    Read a domain name from a DNS response, following compression pointers.
+
+    :param bytearray response: Data returned as a DNS query response.
+    :param int pointer: Start of the name.
+
+    :returns Tuple[bytes, int]: The name in lower case with its labels separated by
+        dots, and the pointer to the byte after the name.
+
+    :raises IndexError: If the name runs past the end of the response.
+    :raises ValueError: If a compression pointer is invalid.
+    """
+    labels = []
+    end = None
+    label_length = response[pointer]
+    while label_length:
+        if label_length >= 0xC0:
+            # Pointer to the rest of the name.
+            if end is None:
+                end = pointer + 2
+            target = (label_length & 0x3F) << 8 | response[pointer + 1]
+            # A pointer always refers to an earlier name, so it cannot loop.
+            if target >= pointer:
+                raise ValueError("Invalid compressed name.")
+            pointer = target
+        else:
+            labels.append(bytes(response[pointer + 1 : pointer + 1 + label_length]))
+            pointer += 1 + label_length
+        label_length = response[pointer]
+    if end is None:
+        end = pointer + 1
+    return b".".join(labels).lower(), end
+
+
 def _parse_dns_response(
     *, response: bytearray, query_id: int, query_length: int, debug: bool
-) -> bytearray:
-    # pylint: disable=too-many-branches
+) -> Tuple[List[bytes], int]:
+    # pylint: disable=too-many-branches, too-many-locals
     """
     Parses a DNS query response.
 
+    All the type A answers for the host name are returned, following any CNAME
+    answers from the host name to its canonical name.
+
     :param bytearray response: Data returned as a DNS query response.
     :param int query_id: The ID of the query that generated the response, used to validate
         the response.
     :param int query_length: The number of bytes in the DNS query that generated the response.
     :param bool debug: Whether to output debugging messsages.
 
-    :returns bytearray: Four byte IPv4 address.
+    :returns Tuple[List[bytes], int]: Four byte IPv4 addresses, and the shortest time
+        to live in seconds of the answers they were found through.
 
     :raises ValueError: If the response does not yield a valid IPv4 address from a type A,
         class IN answer.
@@ -140,101 +196,123 @@ def _parse_dns_response(
     if answer_count < 1:
         raise ValueError("Answer count should be > 0, is {}.".format(answer_count))
 
-    # Parse answers
+    # Parse answers into (name, type, time to live, data pointer, data length) records.
+    records = []
     pointer = query_length  # Response header is the same length as the query header.
-    # pylint: disable=too-many-nested-blocks
     try:
-        for answer in range(answer_count):
-            # Move the pointer past the name.
-            label_length = response[pointer]
-            while True:
-                if label_length >= 0xC0:
-                    # Pointer to a section of domain name, skip over it.
-                    pointer += 2
-                    label_length = response[pointer]
-                    if label_length == 0:
-                        # One byte past the end of the name.
-                        break
-                else:
-                    # Section of the domain name, skip through it.
-                    pointer += label_length
-                    label_length = response[pointer]
-                    if label_length == 0:
-                        # On the null byte at the end of the name. Increment the pointer.
-                        pointer += 1
-                        break
-            # Check for a type A answer.
-            if int.from_bytes(response[pointer : pointer + 2], "big") == _TYPE_A:
-                # Check for an IN class answer.
-                if (
-                    int.from_bytes(response[pointer + 2 : pointer + 4], "big")
-                    == _CLASS_IN
-                ):
-                    _debug_print(
-                        debug=debug,
-                        message="Type A, class IN found in answer {x} of {y}.".format(
-                            x=answer + 1, y=answer_count
-                        ),
+        name = _read_name(response, 12)[0]
+    except (IndexError, ValueError) as error:
+        raise ValueError("Invalid question in the DNS response.") from error
+    try:
+        for _ in range(answer_count):
+            owner, pointer = _read_name(response, pointer)
+            data_length = int.from_bytes(response[pointer + 8 : pointer + 10], "big")
+            if pointer + 10 + data_length > len(response):
+                raise IndexError()
+            if int.from_bytes(response[pointer + 2 : pointer + 4], "big") == _CLASS_IN:
+                records.append(
+                    (
+                        owner,
+                        int.from_bytes(response[pointer : pointer + 2], "big"),
+                        int.from_bytes(response[pointer + 4 : pointer + 8], "big"),
+                        pointer + 10,
+                        data_length,
                     )
-                    # Set pointer to start of resource record.
-                    pointer += 8
-                    # Confirm that the resource record is 4 bytes (an IPv4 address).
-                    if (
-                        int.from_bytes(response[pointer : pointer + 2], "big")
-                        == _DATA_LEN
-                    ):
-                        ipv4 = response[pointer + 2 : pointer + 6]
-                        # Low probability that the response was truncated inside the 4 byte address.
-                        if len(ipv4) != _DATA_LEN:
-                            raise ValueError("IPv4 address is not 4 bytes.")
-                        _debug_print(
-                            debug=debug,
-                            message="IPv4 address found : 0x{:x}.".format(
-                                int.from_bytes(ipv4, "big")
-                            ),
-                        )
-                        return ipv4
-            # Set pointer to start of next answer
-            pointer += 10 + int.from_bytes(response[pointer + 8 : pointer + 10], "big")
+                )
+            pointer += 10 + data_length
+    except IndexError:
+        # Ran out of data in an answer, maybe truncated. Use the complete answers.
+        _debug_print(debug=debug, message="* DNS response is truncated.")
+    except ValueError as error:
+        raise ValueError("Invalid name in the DNS response.") from error
+
+    # Follow the CNAME answers from the host name to the type A answers.
+    ttl = None
+    for _ in range(_MAX_CNAME_CHAIN):
+        addresses = []
+        cname = None
+        for owner, record_type, record_ttl, data, data_length in records:
+            if owner != name:
+                continue
+            if record_type == _TYPE_A and data_length == _DATA_LEN:
+                addresses.append(bytes(response[data : data + _DATA_LEN]))
+                ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+            elif record_type == _TYPE_CNAME and cname is None:
+                try:
+                    cname = (_read_name(response, data)[0], record_ttl)
+                except (IndexError, ValueError) as error:
+                    raise ValueError("Invalid name in the DNS response.") from error
+        if addresses:
             _debug_print(
                 debug=debug,
-                message="Answer {x} of {y} was not type A, class IN.".format(
-                    x=answer + 1, y=answer_count
+                message="IPv4 addresses found : {}.".format(
+                    ", ".join(
+                        "0x{:x}".format(int.from_bytes(ipv4, "big"))
+                        for ipv4 in addresses
+                    )
                 ),
             )
-        # No IPv4 address in any answer.
-        raise ValueError()
-    except (IndexError, ValueError) as error:
-        # IndexError means we ran out of data in an answer, maybe truncated.
-        # ValueError means we ran out of answers.
-        raise ValueError(
-            "No type A, class IN answers found in the DNS response."
-        ) from error
+            return addresses, ttl
+        if cname is None:
+            break
+        name = cname[0]
+        ttl = cname[1] if ttl is None else min(ttl, cname[1])
+        _debug_print(debug=debug, message="CNAME found : {}.".format(name))
+    raise ValueError("No type A, class IN answers found in the DNS response.")
 
 
 class DNS:
-    """W5K DNS implementation."""
+    """
+    W5K DNS implementation.
+
+    Several queries can be in flight at once on a single UDP socket, matched to their
+    responses by query ID. A query with no valid response after two seconds is sent to
+    the next DNS server, and each server is tried twice. The socket is only open while
+    queries are in flight.
+
+    gethostbyname() and query() wait for the response. Without blocking, start_query()
+    sends a query, poll() reads the responses and resends queries that have timed
+    out, and result() returns the result of a query once it is known.
+    """
 
     def __init__(
         self,
         iface: WIZNET5K,
-        dns_address: Union[str, Tuple[int, int, int, int]],
+        dns_address: Union[
+            str,
+            Tuple[int, int, int, int],
+            List[Union[str, Tuple[int, int, int, int]]],
+        ],
         debug: bool = False,
     ) -> None:
         """
         :param adafruit_wiznet5k.WIZNET5K: Ethernet network connection.
-        :param Union[str, Tuple[int, int, int, int]]: IP address of the DNS server.
+        :param Union[str, Tuple[int, int, int, int], List]: IP address of the DNS
+            server, or a list of DNS servers to try in turn.
         :param bool debug: Enable debugging messages, defaults to False.
         """
         self._debug = debug
         self._iface = iface
-        self._dns_server = (
-            self._iface.unpretty_ip(dns_address)
-            if isinstance(dns_address, str)
-            else dns_address
-        )
-        self._query_id = 0  # Request ID.
-        self._query_length = 0  # Length of last query.
+        self._servers = []
+        self.servers = dns_address if isinstance(dns_address, list) else [dns_address]
+        self._sock = None
+        # Queries are ID: [query, query length, times sent, resend time, result, TTL].
+        self._queries: Dict[int, list] = {}
+
+    @property
+    def servers(self) -> List[bytes]:
+        """The DNS servers, tried in turn."""
+        return self._servers
+
+    @servers.setter
+    def servers(
+        self, addresses: List[Union[str, Tuple[int, int, int, int], None]]
+    ) -> None:
+        self._servers = [
+            self._iface.unpretty_ip(address) if isinstance(address, str) else address
+            for address in addresses
+            if address is not None
+        ]
 
     def gethostbyname(self, hostname: bytes) -> Union[int, bytes]:
         """
@@ -244,52 +322,316 @@ class DNS:
 
         :return Union[int, bytes] The IPv4 address if successful, -1 otherwise.
         """
-        if self._dns_server is None:
-            return _INVALID_SERVER
-        # build DNS request packet
-        self._query_id, self._query_length, buffer = _build_dns_query(hostname)
-
-        # Send DNS request packet
-        dns_socket = self._iface.get_socket()
-        self._iface.socket_connect(
-            dns_socket, bytes(self._dns_server), _DNS_PORT, conn_mode=0x02
-        )
-        _debug_print(debug=self._debug, message="* DNS: Sending request packet...")
-        self._iface.socket_write(dns_socket, buffer)
-
-        # Read and parse the DNS response
-        ipaddress = -1
-        for _ in range(5):
-            #  wait for a response
-            socket_timeout = time.monotonic() + 5.0
-            while not self._iface.socket_available(dns_socket, 0x02):
-                if time.monotonic() > socket_timeout:
-                    _debug_print(
-                        debug=self._debug,
-                        message="* DNS ERROR: Did not receive DNS response (socket timeout).",
-                    )
-                    self._iface.socket_close(dns_socket)
-                    raise RuntimeError("Failed to resolve hostname!")
-                time.sleep(0.05)
-            # recv packet into buf
-            _, buffer = self._iface.read_udp(dns_socket, 512)
+        return self.query(hostname)[0]
+
+    def query(self, hostname: bytes) -> Tuple[Union[int, bytes], int]:
+        """
+        DNS look up of a host name, returning the time to live of the answer.
+
+        :param bytes hostname: Host name to connect to.
+
+        :return Tuple[Union[int, bytes], int]: The IPv4 address if successful, -1
+            otherwise, and the number of seconds the address may be cached for.
+
+        :raises RuntimeError: If no response is received from the DNS servers.
+        """
+        addresses, ttl = self.query_all(hostname)
+        if isinstance(addresses, int):
+            return addresses, ttl
+        return addresses[0], ttl
+
+    def query_all(self, hostname: bytes) -> Tuple[Union[int, List[bytes]], int]:
+        """
+        DNS look up of all the IPv4 addresses of a host name, returning the time to
+        live of the answers.
+
+        :param bytes hostname: Host name to connect to.
+
+        :return Tuple[Union[int, List[bytes]], int]: The IPv4 addresses if successful,
+            -1 otherwise, and the number of seconds they may be cached for.
+
+        :raises RuntimeError: If no response is received from the DNS servers.
+        :raises ConnectionError: If the Ethernet link is down.
+        """
+        query_id = self.start_query(hostname)
+        result = self.result(query_id)
+        try:
+            while result is None:
+                time.sleep(_POLL_INTERVAL)
+                self.poll()
+                result = self.result(query_id)
+        except Exception:
+            self.cancel(query_id)
+            raise
+        addresses, ttl = result
+        if addresses == _TIMED_OUT:
+            raise RuntimeError("Failed to resolve hostname!")
+        if isinstance(addresses, int):
+            return -1, 0
+        return addresses, ttl
+
+    def start_query(self, hostname: bytes) -> int:
+        """
+        Send a DNS query for a host name without waiting for the response.
+
+        :param bytes hostname: Host name to look up.
+
+        :return int: The query ID, to get the result with.
+
+        :raises ConnectionError: If the Ethernet link is down.
+        """
+        query_id, query_length, query = _build_dns_query(hostname)
+        while query_id in self._queries:
+            query_id, query_length, query = _build_dns_query(hostname)
+        entry = [query, query_length, 0, 0.0, None, 0]
+        self._queries[query_id] = entry
+        if self._servers:
+            try:
+                self._send_query(entry)
+            except Exception:
+                self.cancel(query_id)
+                raise
+        else:
+            entry[4] = _INVALID_SERVER
+        return query_id
+
+    def poll(self) -> None:
+        """
+        Read any responses to the queries in flight, send queries that were waiting
+        for the chip to send an earlier one, and send queries that have not had a
+        valid response in time to the next DNS server.
+        """
+        if self._sock is None:
+            return
+        while self._iface.socket_available(self._sock, _SNMR_UDP):
+            _, buffer = self._iface.read_udp(self._sock, 512)
             _debug_print(
                 debug=self._debug,
                 message="DNS Packet Received: {}".format(buffer),
             )
-            try:
-                ipaddress = _parse_dns_response(
-                    response=buffer,
-                    query_id=self._query_id,
-                    query_length=self._query_length,
-                    debug=self._debug,
-                )
-                break
-            except ValueError as error:
+            self._process_response(buffer)
+        now = time.monotonic()
+        for entry in self._queries.values():
+            if entry[4] is not None:
+                continue
+            if not entry[3]:
+                # Not sent yet, the chip was sending an earlier query.
+                self._send_query(entry)
+            elif now >= entry[3]:
                 _debug_print(
                     debug=self._debug,
-                    message="* DNS ERROR: Failed to resolve DNS response, retrying…\n"
-                    "    ({}).".format(error.args[0]),
+                    message="* DNS ERROR: Did not receive DNS response (socket timeout).",
                 )
-        self._iface.socket_close(dns_socket)
-        return ipaddress
+                self._next_server(entry, _TIMED_OUT)
+        self._close_if_idle()
+
+    def result(self, query_id: int) -> Optional[Tuple[Union[int, List[bytes]], int]]:
+        """
+        The result of a query, once the response has been received or all the DNS
+        servers have been tried.
+
+        :param int query_id: The ID returned by start_query().
+
+        :return Optional[Tuple[Union[int, List[bytes]], int]]: None while waiting for
+            the response. Otherwise the IPv4 addresses, or a negative error code, and
+            the number of seconds the addresses may be cached for. The query is then
+            forgotten.
+
+        :raises ValueError: If the query ID is not known.
+        """
+        try:
+            entry = self._queries[query_id]
+        except KeyError as error:
+            raise ValueError("Unknown DNS query ID.") from error
+        if entry[4] is None:
+            return None
+        del self._queries[query_id]
+        return entry[4], entry[5]
+
+    def cancel(self, query_id: int) -> None:
+        """
+        Forget a query, ignoring any response to it.
+
+        :param int query_id: The ID returned by start_query().
+        """
+        self._queries.pop(query_id, None)
+        self._close_if_idle()
+
+    def _send_query(self, entry: list) -> None:
+        """
+        Send a query to its current DNS server, opening the socket if needed. While
+        the chip is still sending an earlier query, which must go to its own server,
+        the query is left for poll() to send.
+        """
+        server = bytes(self._servers[entry[2] % len(self._servers)])
+        if self._sock is None:
+            sock = self._iface.get_socket()
+            try:
+                self._iface.socket_connect(sock, server, _DNS_PORT, conn_mode=0x02)
+            except Exception:
+                self._iface.socket_close(sock)
+                raise
+            self._sock = sock
+        elif self._iface.socket_send_busy(self._sock):
+            entry[3] = 0.0
+            return
+        else:
+            self._iface.socket_set_destination(self._sock, server, _DNS_PORT)
+        _debug_print(debug=self._debug, message="* DNS: Sending request packet...")
+        # Do not wait for the chip to send the query, e.g. while it resolves the
+        # server's MAC address, the response is waited for anyway.
+        self._iface.socket_write(self._sock, entry[0], flush=False)
+        entry[2] += 1
+        entry[3] = time.monotonic() + _QUERY_TIMEOUT
+
+    def _next_server(self, entry: list, error: int) -> None:
+        """Send a query to the next DNS server, or fail it if all have been tried."""
+        if entry[2] >= len(self._servers) * _QUERY_ATTEMPTS:
+            entry[4] = error
+        else:
+            self._send_query(entry)
+
+    def _process_response(self, response: bytes) -> None:
+        """Store the result of the query that a response answers."""
+        if len(response) < 12:
+            return
+        query_id = int.from_bytes(response[0:2], "big")
+        entry = self._queries.get(query_id)
+        if entry is None or entry[4] is not None:
+            _debug_print(
+                debug=self._debug,
+                message="* DNS: Ignoring response with ID {:#x}.".format(query_id),
+            )
+            return
+        if response[3] & 0x0F == 0x03:
+            # The name does not exist, other DNS servers will give the same answer.
+            _debug_print(debug=self._debug, message="* DNS ERROR: No such name.")
+            entry[4] = _INVALID_RESPONSE
+            return
+        try:
+            entry[4], entry[5] = _parse_dns_response(
+                response=response,
+                query_id=query_id,
+                query_length=entry[1],
+                debug=self._debug,
+            )
+        except ValueError as error:
+            _debug_print(
+                debug=self._debug,
+                message="* DNS ERROR: Failed to resolve DNS response, retrying…\n"
+                "    ({}).".format(error.args[0]),
+            )
+            self._next_server(entry, _INVALID_RESPONSE)
+
+    def _close_if_idle(self) -> None:
+        """Close the socket when no query is waiting for a response."""
+        if self._sock is not None and all(
+            entry[4] is not None for entry in self._queries.values()
+        ):
+            self._iface.socket_close(self._sock)
+            self._sock = None
+
+
+class DNSCache:
+    """
+    A bounded cache of DNS lookups. Addresses are kept for the time to live given by
+    the DNS server, failed lookups for a short time. When the cache is full the
+    least recently used entry is replaced.
+    """
+
+    def __init__(
+        self,
+        size: int = _CACHE_SIZE,
+        max_ttl: int = _CACHE_MAX_TTL,
+        negative_ttl: int = _CACHE_NEGATIVE_TTL,
+    ) -> None:
+        """
+        :param int size: Maximum number of host names to cache, defaults to 8.
+        :param int max_ttl: Maximum time in seconds to cache an address for, whatever
+            its time to live, defaults to 3600.
+        :param int negative_ttl: Time in seconds to cache a failed lookup for, 0 to
+            not cache failures, defaults to 10.
+        """
+        if size < 1:
+            raise ValueError("The DNS cache must hold at least one entry.")
+        self._size = size
+        self._max_ttl = max_ttl
+        self._negative_ttl = negative_ttl
+        # Entries are [host name, IPv4 addresses or None, expiry time, last use].
+        self._entries: List[list] = []
+        self._uses = 0
+
+    def _find(self, hostname: bytes) -> Optional[list]:
+        """Return the unexpired entry for a host name, removing it if expired."""
+        for entry in self._entries:
+            if entry[0] == hostname:
+                if time.monotonic() < entry[2]:
+                    return entry
+                self._entries.remove(entry)
+                return None
+        return None
+
+    def lookup(self, hostname: bytes) -> Tuple[bool, Optional[bytes]]:
+        """
+        Look up a host name in the cache.
+
+        :param bytes hostname: The host name.
+
+        :return Tuple[bool, Optional[bytes]]: True and the IPv4 address if the host
+            name is cached, the address is None if the lookup failed. False and None if
+            the host name is not cached.
+        """
+        cached, addresses = self.lookup_all(hostname)
+        return cached, addresses[0] if addresses else None
+
+    def lookup_all(self, hostname: bytes) -> Tuple[bool, Optional[List[bytes]]]:
+        """
+        Look up all the cached addresses of a host name.
+
+        :param bytes hostname: The host name.
+
+        :return Tuple[bool, Optional[List[bytes]]]: True and the IPv4 addresses if the
+            host name is cached, the addresses are None if the lookup failed. False and
+            None if the host name is not cached.
+        """
+        entry = self._find(hostname)
+        if entry is None:
+            return False, None
+        self._uses += 1
+        entry[3] = self._uses
+        return True, entry[1]
+
+    def add(
+        self,
+        hostname: bytes,
+        address: Optional[Union[bytes, List[bytes]]],
+        ttl: int = 0,
+    ) -> None:
+        """
+        Cache the result of a lookup.
+
+        :param bytes hostname: The host name.
+        :param Optional[Union[bytes, List[bytes]]] address: The IPv4 address or
+            addresses, None if the lookup failed.
+        :param int ttl: The time to live of the address in seconds, ignored for failed
+            lookups, defaults to 0 which does not cache the address.
+        """
+        ttl = min(ttl, self._max_ttl) if address is not None else self._negative_ttl
+        entry = self._find(hostname)
+        if entry is not None:
+            self._entries.remove(entry)
+        if ttl <= 0:
+            return
+        if len(self._entries) >= self._size:
+            # Replace the least recently used entry.
+            self._entries.remove(min(self._entries, key=lambda entry: entry[3]))
+        if isinstance(address, list):
+            address = [bytes(ipv4) for ipv4 in address]
+        elif address is not None:
+            address = [bytes(address)]
+        self._uses += 1
+        self._entries.append([hostname, address, time.monotonic() + ttl, self._uses])
+
+    def clear(self) -> None:
+        """Remove all the cached lookups."""
+        self._entries = []
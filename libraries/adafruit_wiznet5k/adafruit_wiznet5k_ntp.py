@@ -1,62 +1,383 @@
-# SPDX-FileCopyrightText: 2019 Brent Rubell for Adafruit Industries
-#
-# SPDX-License-Identifier: MIT
-
-"""
-`wiznet5k_ntp`
-================================================================================
-
-Network Time Protocol (NTP) helper for CircuitPython
-
- * Author(s): irinakim
-
-Implementation Notes
---------------------
-**Hardware:**
-**Software and Dependencies:**
-
- 
-"""
-import time
-
-import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
-from adafruit_wiznet5k.adafruit_wiznet5k_socket import htons
-
-
-##__version__ = "0.0.0-auto.0"
-##__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_NTP.git"
-
-
-class NTP:
-    def __init__(self, iface, ntp_address,utc,debug=False):
-        self._debug = debug
-        self._iface = iface
-        socket.set_interface(self._iface)
-        self._sock = socket.socket(type=socket.SOCK_DGRAM)
-        self._sock.settimeout(1)
-        self._utc = utc
-
-        self._ntp_server = ntp_address
-        self._host = 0
-        self._request_id = 0  # request identifier
-        
-        self._pkt_buf_ = bytearray()
-
-    def _build_ntp_header(self,ip):
-        self._pkt_buf_.append(0x23)
-
-        for i in range(55):
-            self._pkt_buf_.append(0x00)
-
-    def get_time(self):
-        self._build_ntp_header(self._ntp_server)     
-        self._sock.bind((None,50001))
-        self._sock.sendto(self._pkt_buf_,(self._ntp_server, 123))
-        while True:
-            data = self._sock.recv()
-            if data: 
-                sec = data[40:44]
-                int_cal = int.from_bytes(sec,"big")
-                cal =int_cal - 2208988800 + self._utc *3600
-                cal = time.localtime(cal) 
-                return cal
+# SPDX-FileCopyrightText: 2019 Brent Rubell for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_wiznet5k_ntp`
+================================================================================
+
+Simple Network Time Protocol (SNTP) client for WIZnet 5k-based ethernet modules.
+
+Each synchronisation sends one request to each NTP server and computes the clock
+offset and round trip delay of each response from its four timestamps. The response
+with the shortest delay sets a mapping from time.monotonic_ns() to the wall clock.
+The drift of the local clock is estimated across synchronisations, and allowed for
+between them.
+
+Call poll() from the main loop to synchronise periodically without blocking. Host
+names are looked up and the requests sent over several calls, so poll() never waits
+for the DNS server or for the chip to send a request. The accuracy depends on how
+often poll() is called while a synchronisation is in flight, as a response is only
+timestamped when poll() finds it.
+
+* Author(s): irinakim, Martin Stephens
+
+"""
+
+from __future__ import annotations
+
+try:
+    from typing import TYPE_CHECKING, Optional, Union, List
+
+    if TYPE_CHECKING:
+        from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
+except ImportError:
+    pass
+
+import time
+from random import getrandbits
+from micropython import const
+
+import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
+from adafruit_wiznet5k.adafruit_wiznet5k_debug import (  # pylint: disable=ungrouped-imports
+    debug_msg,
+)
+
+_NTP_PORT = const(123)
+_NTP_PACKET_LENGTH = const(48)
+# Longest packet read, with an extension field or message authentication code.
+_NTP_BUFFER_LENGTH = const(68)
+_SNMR_UDP = const(0x02)
+
+# Packet fields.
+_LI_VN_MODE = const(0x23)  # No leap second warning, version 4, client mode.
+_MODE_SERVER = const(0x04)
+_MODE_BROADCAST = const(0x05)
+_LI_UNSYNCHRONIZED = const(0x03)
+_RECEIVE_TIMESTAMP = const(32)
+_ORIGINATE_TIMESTAMP = const(24)
+_TRANSMIT_TIMESTAMP = const(40)
+
+# Seconds from the NTP epoch (1900) to the Unix epoch (1970).
+_NTP_TO_UNIX = 2208988800
+_NS_PER_SECOND = const(1000000000)
+
+# Default seconds between synchronisations.
+_SYNC_INTERVAL = const(600)
+# Seconds before retrying a synchronisation with no valid response.
+_RETRY_INTERVAL = const(15)
+# Default seconds to wait for the responses.
+_RESPONSE_TIMEOUT = 1.0
+# Shortest time between synchronisations to estimate the drift from, in seconds.
+_MIN_DRIFT_SPAN = const(60)
+# Largest drift of the local clock, in parts per billion.
+_MAX_DRIFT = const(500000)
+
+
+def _timestamp_ns(packet: bytearray, field: int) -> int:
+    """
+    Convert an NTP timestamp to nanoseconds since the Unix epoch.
+
+    :param bytearray packet: NTP packet.
+    :param int field: Offset of the timestamp in the packet.
+
+    :return int: Nanoseconds since 1 January 1970 UTC.
+    """
+    seconds = int.from_bytes(packet[field : field + 4], "big")
+    fraction = int.from_bytes(packet[field + 4 : field + 8], "big")
+    if seconds < 0x80000000:
+        # NTP era 1 starts in 2036.
+        seconds += 0x100000000
+    return (seconds - _NTP_TO_UNIX) * _NS_PER_SECOND + (fraction * _NS_PER_SECOND >> 32)
+
+
+class NTP:
+    """
+    W5K SNTP client.
+
+    get_time() synchronises with the NTP servers, blocking until the responses arrive
+    or time out, when it has not synchronised or the interval has elapsed. poll() does
+    the same without blocking. time_ns() converts a time.monotonic_ns() reading to the
+    wall clock.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        iface: WIZNET5K,
+        ntp_address: Union[str, List[str]],
+        utc: float,
+        debug: bool = False,
+        *,
+        interval: int = _SYNC_INTERVAL,
+        timeout: float = _RESPONSE_TIMEOUT,
+    ) -> None:
+        """
+        :param adafruit_wiznet5k.WIZNET5K iface: Ethernet network connection.
+        :param Union[str, List[str]] ntp_address: Host name or IPv4 address of the NTP
+            server, or a list of them. Host names are looked up at each
+            synchronisation, from the DNS cache when possible.
+        :param float utc: Offset of local time from UTC in hours, used by get_time().
+        :param bool debug: Enable debugging messages, defaults to False.
+        :param int interval: Seconds between synchronisations, defaults to 600.
+        :param float timeout: Seconds to wait for the responses, defaults to 1.0.
+        """
+        self._debug = debug
+        self._iface = iface
+        self._utc = utc
+        self._servers = ntp_address if isinstance(ntp_address, list) else [ntp_address]
+        self.interval = interval
+        self.timeout = timeout
+        # Request and response buffers, reused for every packet.
+        self._request = bytearray(_NTP_PACKET_LENGTH)
+        self._request[0] = _LI_VN_MODE
+        self._response = bytearray(_NTP_BUFFER_LENGTH)
+        self._sock = None
+        self._syncing = False
+        # Servers not yet sent a request, and the DNS query for the first of them.
+        self._unsent = []
+        self._query = None
+        # Requests in flight are transmit timestamp: time.monotonic_ns() when sent.
+        self._pending = {}
+        self._deadline = 0
+        # Best sample of the synchronisation in flight, (delay, offset, time).
+        self._best = None
+        self._next_sync = None
+        # Wall clock in Unix nanoseconds = monotonic_ns() + offset, corrected for drift
+        # in parts per billion since the synchronisation.
+        self._sync_ns = None
+        self._offset_ns = 0
+        self._drift = 0
+        self._drift_known = False
+        # Round trip delay of the last synchronisation in nanoseconds.
+        self.delay = None
+
+    @property
+    def synchronized(self) -> bool:
+        """True once the clock has been synchronised with an NTP server."""
+        return self._sync_ns is not None
+
+    def time_ns(self, monotonic_ns: Optional[int] = None) -> int:
+        """
+        Wall clock time.
+
+        :param Optional[int] monotonic_ns: A time.monotonic_ns() reading to convert,
+            defaults to None for the current time.
+
+        :return int: Nanoseconds since 1 January 1970 UTC.
+
+        :raises RuntimeError: If the clock has not been synchronised.
+        """
+        if self._sync_ns is None:
+            raise RuntimeError("The clock has not been synchronised.")
+        if monotonic_ns is None:
+            monotonic_ns = time.monotonic_ns()
+        elapsed = monotonic_ns - self._sync_ns
+        return monotonic_ns + self._offset_ns + elapsed * self._drift // _NS_PER_SECOND
+
+    def get_time(self) -> time.struct_time:
+        """
+        Local time, synchronising with the NTP servers first if the interval has
+        elapsed.
+
+        :return time.struct_time: The local time.
+
+        :raises TimeoutError: If no NTP server responds.
+        """
+        if (
+            not self.synchronized
+            or self._syncing
+            or time.monotonic() >= self._next_sync
+        ):
+            try:
+                self.synchronize()
+            except TimeoutError:
+                # Keep to the clock from the last synchronisation.
+                if not self.synchronized:
+                    raise
+        return time.localtime(self.time_ns() // _NS_PER_SECOND + int(self._utc * 3600))
+
+    def synchronize(self) -> None:
+        """
+        Synchronise with the NTP servers, waiting for their responses.
+
+        :raises TimeoutError: If no NTP server responds.
+        :raises ConnectionError: If the Ethernet link is down.
+        """
+        if not self._syncing:
+            self._start_sync()
+        while self._syncing:
+            self._advance()
+        if self._best is None:
+            raise TimeoutError("No response from the NTP servers.")
+
+    def poll(self) -> None:
+        """
+        Synchronise with the NTP servers when the interval has elapsed, without
+        blocking. Call this regularly, and often while a synchronisation is in flight.
+
+        :raises ConnectionError: If the Ethernet link is down. The synchronisation
+            carries on at the next call.
+        """
+        if not self._syncing:
+            if self._next_sync is not None and time.monotonic() < self._next_sync:
+                return
+            self._start_sync()
+        self._advance()
+
+    def _start_sync(self) -> None:
+        """Start a synchronisation, the requests are sent by _advance()."""
+        debug_msg("* NTP: Starting synchronisation.", self._debug)
+        self._syncing = True
+        self._unsent = list(self._servers)
+        self._pending = {}
+        self._best = None
+        self._next_sync = time.monotonic() + _RETRY_INTERVAL
+        self._deadline = time.monotonic() + self.timeout
+
+    def _advance(self) -> None:
+        """
+        Send the next requests and check for responses, without blocking. Finish the
+        synchronisation when every request has a response or the timeout has expired.
+        """
+        self._send_requests()
+        self._receive()
+        if not self._unsent and (
+            not self._pending or time.monotonic() >= self._deadline
+        ):
+            self._finish_sync()
+
+    def _send_requests(self) -> None:
+        """
+        Send a request to each NTP server that has not been sent one. Stop while waiting
+        for a DNS response, or for the chip to send the previous request, which must
+        be sent before the destination changes.
+        """
+        while self._unsent:
+            if self._sock is not None and self._iface.socket_send_busy(self._sock):
+                return
+            try:
+                address = self._resolve(self._unsent[0])
+            except RuntimeError:
+                debug_msg(
+                    "* NTP: Failed to resolve {}.".format(self._unsent.pop(0)),
+                    self._debug,
+                )
+                continue
+            if address is None:
+                return
+            if self._sock is None:
+                sock = self._iface.get_socket()
+                try:
+                    self._iface.socket_connect(
+                        sock, address, _NTP_PORT, conn_mode=_SNMR_UDP
+                    )
+                except Exception:
+                    self._iface.socket_close(sock)
+                    raise
+                self._sock = sock
+            else:
+                self._iface.socket_set_destination(self._sock, address, _NTP_PORT)
+            # A random transmit timestamp identifies the response to the request.
+            cookie = getrandbits(32) << 32 | getrandbits(32)
+            self._request[_TRANSMIT_TIMESTAMP:] = cookie.to_bytes(8, "big")
+            sent = time.monotonic_ns()
+            if self._iface.socket_write(self._sock, self._request, flush=False):
+                self._pending[cookie] = sent
+            # Only now, so a server whose request raised is tried on the next call.
+            self._unsent.pop(0)
+            self._deadline = time.monotonic() + self.timeout
+
+    def _resolve(self, server: str) -> Optional[bytes]:
+        """
+        Look up the address of an NTP server, from the DNS cache when possible,
+        without waiting for the DNS server.
+
+        :param str server: Host name or IPv4 address of the NTP server.
+
+        :return Optional[bytes]: The IPv4 address, None while waiting for the DNS
+            response.
+
+        :raises RuntimeError: If the host name cannot be resolved.
+        """
+        # pylint: disable=protected-access
+        if socket._is_ipv4_string(server):
+            return self._iface.unpretty_ip(server)
+        name = bytes(server, "utf-8")
+        dns_client = self._iface.dns_client
+        if self._query is None:
+            addresses = self._iface._cached_hosts(name)
+            if addresses is not None:
+                return addresses[0]
+            self._query = dns_client.start_query(name)
+        else:
+            dns_client.poll()
+        result = dns_client.result(self._query)
+        if result is None:
+            return None
+        self._query = None
+        return self._iface._resolved_hosts(name, *result)[0]
+
+    def _receive(self) -> None:
+        """Timestamp and check the responses that have arrived."""
+        response = self._response
+        if self._sock is None:
+            return
+        while self._iface.socket_available(self._sock, _SNMR_UDP):
+            received = time.monotonic_ns()
+            length = self._iface.read_udp_into(self._sock, response)
+            if length < _NTP_PACKET_LENGTH:
+                continue
+            cookie = int.from_bytes(
+                response[_ORIGINATE_TIMESTAMP : _ORIGINATE_TIMESTAMP + 8], "big"
+            )
+            sent = self._pending.pop(cookie, None)
+            if (
+                sent is None
+                or response[0] >> 6 == _LI_UNSYNCHRONIZED
+                or response[0] & 0x07 not in (_MODE_SERVER, _MODE_BROADCAST)
+                or response[1] == 0  # Kiss-o'-death, or unsynchronised server.
+            ):
+                debug_msg("* NTP: Ignoring invalid response.", self._debug)
+                continue
+            server_received = _timestamp_ns(response, _RECEIVE_TIMESTAMP)
+            server_sent = _timestamp_ns(response, _TRANSMIT_TIMESTAMP)
+            delay = (received - sent) - (server_sent - server_received)
+            offset = ((server_received - sent) + (server_sent - received)) // 2
+            debug_msg(
+                "* NTP: Delay {} ns, offset {} ns.".format(delay, offset), self._debug
+            )
+            if self._best is None or delay < self._best[0]:
+                self._best = (delay, offset, received)
+
+    def _finish_sync(self) -> None:
+        """
+        Close the socket and set the clock from the sample with the shortest delay, if
+        a valid response was received.
+        """
+        self._syncing = False
+        if self._query is not None:
+            self._iface.dns_client.cancel(self._query)
+            self._query = None
+        if self._sock is not None:
+            self._iface.socket_close(self._sock)
+            self._sock = None
+        self._unsent = []
+        self._pending = {}
+        if self._best is None:
+            debug_msg("* NTP: No valid response.", self._debug)
+            self._next_sync = time.monotonic() + _RETRY_INTERVAL
+            return
+        delay, offset, received = self._best
+        if self._sync_ns is not None:
+            elapsed = received - self._sync_ns
+            if elapsed >= _MIN_DRIFT_SPAN * _NS_PER_SECOND:
+                drift = (offset - self._offset_ns) * _NS_PER_SECOND // elapsed
+                drift = max(-_MAX_DRIFT, min(_MAX_DRIFT, drift))
+                # Average the estimates to smooth out the sample errors.
+                self._drift = (self._drift + drift) // 2 if self._drift_known else drift
+                self._drift_known = True
+        self._sync_ns = received
+        self._offset_ns = offset
+        self.delay = delay
+        self._next_sync = time.monotonic() + self.interval
@@ -0,0 +1,886 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_wiznet5k_simulator`
+================================================================================
+
+Register level emulation of the W5500, W6100 and W5100S Ethernet chips for
+running the WIZNET5K driver on a host computer.
+
+The simulator stands in for the SPI bus and chip select pin passed to
+:class:`~adafruit_wiznet5k.adafruit_wiznet5k.WIZNET5K`. It decodes the SPI
+frames of each chip, keeps the common and socket registers plus the TX and RX
+ring buffers in memory and carries out socket commands (OPEN, LISTEN, CONNECT,
+SEND, RECV, DISCON and CLOSE) using sockets on the host, so the complete stack
+(sockets, DHCP, DNS, MQTT, HTTP) can be regression tested and benchmarked on a
+Linux machine. The UDP receive header is prefixed to each datagram exactly as
+the chip does. This module needs CPython and is not intended to run on a
+microcontroller.
+
+.. code-block:: python
+
+    from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
+    from adafruit_wiznet5k.adafruit_wiznet5k_simulator import WIZNETSimulator
+
+    sim = WIZNETSimulator("w5500")
+    eth = WIZNET5K(sim.spi, sim.cs, is_dhcp=False)
+    eth.ifconfig = ((127, 0, 0, 1), (255, 0, 0, 0), (127, 0, 0, 1), (127, 0, 0, 1))
+"""
+
+from __future__ import annotations
+
+try:
+    from typing import Optional, Tuple, Dict, List, Union
+except ImportError:
+    pass
+
+import errno
+import select
+import socket as _host_socket
+
+# Socket commands.
+_CMD_OPEN = 0x01
+_CMD_LISTEN = 0x02
+_CMD_CONNECT = 0x04
+_CMD_DISCON = 0x08
+_CMD_CLOSE = 0x10
+_CMD_SEND = 0x20
+_CMD_SEND_MAC = 0x21
+_CMD_SEND_KEEP = 0x22
+_CMD_RECV = 0x40
+
+# Socket status values.
+_SR_CLOSED = 0x00
+_SR_INIT = 0x13
+_SR_LISTEN = 0x14
+_SR_SYNSENT = 0x15
+_SR_ESTABLISHED = 0x17
+_SR_CLOSE_WAIT = 0x1C
+_SR_UDP = 0x22
+
+# Socket interrupt flags.
+_IR_CON = 0x01
+_IR_DISCON = 0x02
+_IR_RECV = 0x04
+_IR_TIMEOUT = 0x08
+_IR_SEND_OK = 0x10
+
+# Socket modes (protocol bits of Sn_MR).
+_MR_TCP = 0x01
+_MR_UDP = 0x02
+
+# Register layout of each chip. Common register addresses, then socket register
+# offsets. Multi-byte registers are big endian.
+_CHIPS = {
+    "w5500": {
+        "sockets": 8,
+        "memory": 16,
+        "common_size": 0x40,
+        "socket_size": 0x30,
+        "MR": 0x0000,
+        "MR_RESET": 0x00,
+        "GAR": 0x0001,
+        "SUBR": 0x0005,
+        "SHAR": 0x0009,
+        "SIPR": 0x000F,
+        "SIR": 0x0017,
+        "SIMR": 0x0018,
+        "RTR": 0x0019,
+        "RCR": 0x001B,
+        "LINK": 0x002E,
+        "VERSION": (0x0039, b"\x04"),
+        "Sn_MR": 0x0000,
+        "Sn_CR": 0x0001,
+        "Sn_IR": 0x0002,
+        "Sn_IRCLR": None,
+        "Sn_SR": 0x0003,
+        "Sn_PORT": 0x0004,
+        "Sn_DIPR": 0x000C,
+        "Sn_DPORT": 0x0010,
+        "Sn_RXBUF_SIZE": 0x001E,
+        "Sn_TXBUF_SIZE": 0x001F,
+        "Sn_TX_FSR": 0x0020,
+        "Sn_TX_RD": 0x0022,
+        "Sn_TX_WR": 0x0024,
+        "Sn_RX_RSR": 0x0026,
+        "Sn_RX_RD": 0x0028,
+        "Sn_RX_WR": 0x002A,
+        "Sn_IMR": 0x002C,
+        "Sn_KPALVTR": 0x002F,
+        "Sn_RTR": None,
+        "Sn_RCR": None,
+    },
+    "w6100": {
+        "sockets": 8,
+        "memory": 16,
+        "common_size": 0x4300,
+        "socket_size": 0x0230,
+        "MR": None,
+        "MR_RESET": None,
+        "GAR": 0x4130,
+        "SUBR": 0x4134,
+        "SHAR": 0x4120,
+        "SIPR": 0x4138,
+        "SIR": 0x2101,
+        "SIMR": 0x2114,
+        "RTR": 0x4200,
+        "RCR": 0x4204,
+        "LINK": 0x3000,
+        "VERSION": (0x0000, b"\x61\x00\x46\x61"),
+        "Sn_MR": 0x0000,
+        "Sn_CR": 0x0010,
+        "Sn_IR": 0x0020,
+        "Sn_IRCLR": 0x0028,
+        "Sn_SR": 0x0030,
+        "Sn_PORT": 0x0114,
+        "Sn_DIPR": 0x0120,
+        "Sn_DPORT": 0x0140,
+        "Sn_RXBUF_SIZE": 0x0220,
+        "Sn_TXBUF_SIZE": 0x0200,
+        "Sn_TX_FSR": 0x0204,
+        "Sn_TX_RD": 0x0208,
+        "Sn_TX_WR": 0x020C,
+        "Sn_RX_RSR": 0x0224,
+        "Sn_RX_RD": 0x0228,
+        "Sn_RX_WR": 0x022C,
+        "Sn_IMR": 0x0024,
+        "Sn_KPALVTR": 0x0188,
+        "Sn_RTR": 0x0180,
+        "Sn_RCR": 0x0184,
+    },
+    "w5100s": {
+        "sockets": 4,
+        "memory": 8,
+        "common_size": 0x0400,
+        "socket_size": 0x0100,
+        "MR": 0x0000,
+        "MR_RESET": 0x03,
+        "GAR": 0x0001,
+        "SUBR": 0x0005,
+        "SHAR": 0x0009,
+        "SIPR": 0x000F,
+        "SIR": 0x0015,
+        "SIMR": 0x0016,
+        "RTR": 0x0017,
+        "RCR": 0x0019,
+        "LINK": 0x003C,
+        "VERSION": (0x0080, b"\x51"),
+        "Sn_MR": 0x0000,
+        "Sn_CR": 0x0001,
+        "Sn_IR": 0x0002,
+        "Sn_IRCLR": None,
+        "Sn_SR": 0x0003,
+        "Sn_PORT": 0x0004,
+        "Sn_DIPR": 0x000C,
+        "Sn_DPORT": 0x0010,
+        "Sn_RXBUF_SIZE": 0x001E,
+        "Sn_TXBUF_SIZE": 0x001F,
+        "Sn_TX_FSR": 0x0020,
+        "Sn_TX_RD": 0x0022,
+        "Sn_TX_WR": 0x0024,
+        "Sn_RX_RSR": 0x0026,
+        "Sn_RX_RD": 0x0028,
+        "Sn_RX_WR": 0x002A,
+        "Sn_IMR": 0x002C,
+        "Sn_KPALVTR": 0x002F,
+        "Sn_RTR": 0x0032,
+        "Sn_RCR": 0x0034,
+    },
+}
+
+# Socket registers with a reset value other than zero, as (name, size, value).
+_SOCKET_RESET_VALUES = (("Sn_IMR", 1, 0xFF),)
+
+# W5100S memory map.
+_W5100S_SOCKET_BASE = 0x0400
+_W5100S_TX_BASE = 0x4000
+_W5100S_RX_BASE = 0x6000
+
+# Length of the address and control phase of an SPI frame.
+_HEADER_LENGTH = 3
+
+
+class _SimulatedPin:
+    """A stand in for `digitalio.DigitalInOut` which reports changes of value."""
+
+    def __init__(
+        self,
+        value: bool = True,
+        on_change: Optional[callable] = None,
+        on_read: Optional[callable] = None,
+    ):
+        self._value = value
+        self._on_change = on_change
+        self._on_read = on_read
+        self.direction = None
+        self.pull = None
+
+    def switch_to_output(self, value: bool = False, drive_mode=None) -> None:
+        """Set the pin as an output."""
+        self.direction = "output"
+        self.value = value
+
+    def switch_to_input(self, pull=None) -> None:
+        """Set the pin as an input."""
+        self.direction = "input"
+        self.pull = pull
+
+    @property
+    def value(self) -> bool:
+        """The logic level of the pin."""
+        if self._on_read:
+            self._on_read()
+        return self._value
+
+    @value.setter
+    def value(self, level: bool) -> None:
+        level = bool(level)
+        if level != self._value and self._on_change:
+            self._on_change(level)
+        self._value = level
+
+    def deinit(self) -> None:
+        """Release the pin."""
+
+
+class _SimulatedSocket:
+    """State of one hardware socket and its host side counterpart."""
+
+    # pylint: disable=too-few-public-methods
+    def __init__(self, number: int) -> None:
+        self.number = number
+        self.host = None  # Connected TCP or bound UDP host socket.
+        self.listen_port = None  # Port of the shared listening host socket.
+        self.tx_rd = 0
+        self.rx_wr = 0
+        self.rx_rd = 0
+        self.peer_closed = False
+
+
+class WIZNETSimulator:
+    """Emulate a WIZnet Ethernet chip connected over SPI.
+
+    Pass :attr:`spi` and :attr:`cs` to the WIZNET5K constructor in place of a
+    `busio.SPI` bus and chip select pin. :attr:`irq` emulates the active low
+    INTn pin for the driver's interrupt mode.
+
+    Remote addresses are connected on the host. By default every destination IP
+    address is mapped to the loopback interface (``remote_host``) and listening
+    sockets are bound to ``bind_host``, so a test can talk to the emulated chip
+    through ordinary host sockets.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        chip: str = "w5500",
+        *,
+        remote_host: Optional[str] = "127.0.0.1",
+        bind_host: str = "127.0.0.1",
+        link: bool = True,
+    ) -> None:
+        """
+        :param str chip: Chip to emulate, "w5500", "w6100" or "w5100s", defaults to
+            "w5500".
+        :param Optional[str] remote_host: Host address that all destination IP addresses
+            are mapped to, or None to use the destination address written to the chip,
+            defaults to "127.0.0.1".
+        :param str bind_host: Host address to bind listening and UDP sockets to, defaults
+            to "127.0.0.1".
+        :param bool link: Initial Ethernet link state, defaults to True.
+        """
+        if chip not in _CHIPS:
+            raise ValueError("Unsupported chip type {}.".format(chip))
+        self.chip = chip
+        self._map = _CHIPS[chip]
+        self.remote_host = remote_host
+        self.bind_host = bind_host
+        self.link = link
+        self.spi = _SimulatedSPI(self)
+        self.cs = _SimulatedPin(True, self._chip_select)
+        # Reading INTn moves host data, as the real pin changes asynchronously.
+        self.irq = _SimulatedPin(True, on_read=self._irq_poll)
+        # Transaction statistics.
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        # Shared host listening sockets, keyed by port.
+        self._listeners: Dict[int, _host_socket.socket] = {}
+        self._sockets: List[_SimulatedSocket] = []
+        self._frame = bytearray()
+        self._address = 0
+        self._block = 0
+        self._selected = False
+        self._writing = False
+        self._w6100_unlocked = False
+        self.reset()
+
+    # *** Public helpers ***
+
+    def reset(self) -> None:
+        """Reset the emulated chip to its power on state."""
+        for sock in self._sockets:
+            self._close_host(sock)
+        self.common = bytearray(self._map["common_size"])
+        self.socket_regs = [
+            bytearray(self._map["socket_size"]) for _ in range(self._map["sockets"])
+        ]
+        memory = self._map["memory"] * 1024
+        self.tx_memory = bytearray(memory)
+        self.rx_memory = bytearray(memory)
+        self._sockets = [_SimulatedSocket(n) for n in range(self._map["sockets"])]
+        address, version = self._map["VERSION"]
+        self.common[address : address + len(version)] = version
+        if self._map["MR"] is not None:
+            self.common[self._map["MR"]] = self._map["MR_RESET"]
+        self._write_common(self._map["RTR"], 2000, 2)
+        self._write_common(self._map["RCR"], 8, 1)
+        for sock in range(self._map["sockets"]):
+            self._set_socket(sock, "Sn_RXBUF_SIZE", 2, 1)
+            self._set_socket(sock, "Sn_TXBUF_SIZE", 2, 1)
+            for name, size, value in _SOCKET_RESET_VALUES:
+                self._set_socket(sock, name, value, size)
+            if self._map["Sn_RTR"] is not None:
+                self._set_socket(sock, "Sn_RTR", 2000, 2)
+                self._set_socket(sock, "Sn_RCR", 8, 1)
+        self._refresh()
+
+    def close(self) -> None:
+        """Close all host sockets opened by the simulator."""
+        for sock in self._sockets:
+            self._close_host(sock)
+        for listener in self._listeners.values():
+            listener.close()
+        self._listeners.clear()
+
+    def reset_statistics(self) -> None:
+        """Zero the SPI transaction and byte counters."""
+        self.transactions = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def socket_register(self, sock: int, name: str, size: int = 1) -> int:
+        """Read an emulated socket register by name, e.g. "Sn_SR"."""
+        return self._get_socket(sock, name, size)
+
+    def common_register(self, name: str, size: int = 1) -> int:
+        """Read an emulated common register by name, e.g. "SIPR"."""
+        address = self._map[name]
+        return int.from_bytes(self.common[address : address + size], "big")
+
+    def buffer_sizes(self, sock: int) -> Tuple[int, int]:
+        """The TX and RX buffer sizes in bytes of a socket."""
+        return (
+            self._get_socket(sock, "Sn_TXBUF_SIZE") * 1024,
+            self._get_socket(sock, "Sn_RXBUF_SIZE") * 1024,
+        )
+
+    def poll(self) -> None:
+        """Move data between the host sockets and the chip. Called automatically at
+        the start of every SPI transaction."""
+        for sock in self._sockets:
+            status = self._get_socket(sock.number, "Sn_SR")
+            if status == _SR_LISTEN:
+                self._poll_listen(sock)
+            elif status == _SR_SYNSENT:
+                self._poll_connect(sock)
+            elif status in (_SR_ESTABLISHED, _SR_UDP):
+                self._poll_receive(sock)
+        self._refresh()
+
+    def _irq_poll(self) -> None:
+        if not self._selected:
+            self.poll()
+
+    # *** SPI bus decoding ***
+
+    def _chip_select(self, level: bool) -> None:
+        """Start or finish an SPI transaction."""
+        if not level:
+            self._selected = True
+            self._frame = bytearray()
+            self.transactions += 1
+            self.poll()
+        else:
+            self._selected = False
+            self._refresh()
+
+    def _decode_header(self) -> bool:
+        """Decode the address phase. Return True if the frame writes data."""
+        if self.chip == "w5100s":
+            opcode, high, low = self._frame[:3]
+            self._address = (high << 8) | low
+            self._block = None
+            return opcode == 0xF0
+        high, low, control = self._frame[:3]
+        self._address = (high << 8) | low
+        self._block = control >> 3
+        return bool(control & 0x04)
+
+    def _transfer_out(self, data: Union[bytes, bytearray, memoryview]) -> None:
+        """Bytes from the controller to the chip."""
+        if not self._selected:
+            return
+        self.bytes_written += len(data)
+        for byte in data:
+            if len(self._frame) < _HEADER_LENGTH:
+                self._frame.append(byte)
+                if len(self._frame) == _HEADER_LENGTH:
+                    self._writing = self._decode_header()
+                continue
+            if self._writing:
+                self._write_byte(self._address, byte)
+            self._address = (self._address + 1) & 0xFFFF
+
+    def _transfer_in(self, length: int) -> bytearray:
+        """Bytes from the chip to the controller."""
+        self.bytes_read += length
+        result = bytearray(length)
+        if not self._selected or len(self._frame) < _HEADER_LENGTH:
+            return result
+        if self._writing:
+            return result
+        for index in range(length):
+            result[index] = self._read_byte(self._address)
+            self._address = (self._address + 1) & 0xFFFF
+        return result
+
+    # *** Memory map ***
+
+    def _locate(self, address: int) -> Tuple[Optional[str], int, int]:
+        """Translate a bus address into a (region, socket, offset) tuple."""
+        if self.chip == "w5100s":
+            if address < _W5100S_SOCKET_BASE:
+                return "common", 0, address
+            if address < _W5100S_SOCKET_BASE + 4 * 0x100:
+                sock, offset = divmod(address - _W5100S_SOCKET_BASE, 0x100)
+                return "socket", sock, offset
+            if _W5100S_TX_BASE <= address < _W5100S_RX_BASE:
+                return "tx", 0, address - _W5100S_TX_BASE
+            if _W5100S_RX_BASE <= address < _W5100S_RX_BASE + 0x2000:
+                return "rx", 0, address - _W5100S_RX_BASE
+            return None, 0, 0
+        block = self._block
+        if block == 0:
+            return "common", 0, address
+        sock, kind = divmod(block, 4)
+        if sock >= self._map["sockets"] or kind == 0:
+            return None, 0, 0
+        if kind == 1:
+            return "socket", sock, address
+        tx_size, rx_size = self.buffer_sizes(sock)
+        if kind == 2:
+            if not tx_size:
+                return None, 0, 0
+            return (
+                "tx",
+                0,
+                self._buffer_base(sock, "Sn_TXBUF_SIZE") + (address & (tx_size - 1)),
+            )
+        if not rx_size:
+            return None, 0, 0
+        return (
+            "rx",
+            0,
+            self._buffer_base(sock, "Sn_RXBUF_SIZE") + (address & (rx_size - 1)),
+        )
+
+    def _buffer_base(self, sock: int, size_register: str) -> int:
+        """Offset of a socket's ring buffer in TX or RX memory."""
+        return sum(
+            self._get_socket(n, size_register) * 1024 for n in range(sock)
+        ) % len(self.tx_memory)
+
+    def _read_byte(self, address: int) -> int:
+        region, sock, offset = self._locate(address)
+        if region == "common":
+            return self.common[offset] if offset < len(self.common) else 0
+        if region == "socket":
+            regs = self.socket_regs[sock]
+            return regs[offset] if offset < len(regs) else 0
+        if region == "tx":
+            return self.tx_memory[offset]
+        if region == "rx":
+            return self.rx_memory[offset]
+        return 0
+
+    def _write_byte(self, address: int, value: int) -> None:
+        region, sock, offset = self._locate(address)
+        if region == "common":
+            self._write_common_byte(offset, value)
+        elif region == "socket":
+            self._write_socket_byte(sock, offset, value)
+        elif region == "tx":
+            self.tx_memory[offset] = value
+        elif region == "rx":
+            self.rx_memory[offset] = value
+
+    def _write_common_byte(self, offset: int, value: int) -> None:
+        if offset >= len(self.common):
+            return
+        if self.chip == "w6100":
+            if offset == 0x41F4:
+                self._w6100_unlocked = value == 0xCE
+                return
+            if offset == 0x2004:
+                if self._w6100_unlocked and not value & 0x80:
+                    self.reset()
+                return
+            if offset < 0x0004 or offset in (0x3000, self._map["SIR"]):
+                return  # Read only registers.
+        else:
+            if offset == self._map["MR"] and value & 0x80:
+                self.reset()
+                return
+            if offset in (self._map["LINK"], self._map["SIR"]):
+                return
+            if offset == self._map["VERSION"][0]:
+                return
+        self.common[offset] = value
+
+    def _write_socket_byte(self, sock: int, offset: int, value: int) -> None:
+        regs = self.socket_regs[sock]
+        if offset >= len(regs):
+            return
+        if offset == self._map["Sn_CR"]:
+            self._command(sock, value)
+            return
+        if offset == self._map["Sn_IR"]:
+            if self.chip != "w6100":
+                regs[offset] &= ~value & 0xFF
+            return
+        if offset == self._map["Sn_IRCLR"]:
+            regs[self._map["Sn_IR"]] &= ~value & 0xFF
+            return
+        read_only = [self._map["Sn_SR"]]
+        for name in ("Sn_TX_FSR", "Sn_TX_RD", "Sn_RX_RSR", "Sn_RX_WR"):
+            read_only.extend((self._map[name], self._map[name] + 1))
+        if offset in read_only:
+            return
+        regs[offset] = value
+
+    # *** Register access helpers ***
+
+    def _get_socket(self, sock: int, name: str, size: int = 1) -> int:
+        offset = self._map[name]
+        return int.from_bytes(self.socket_regs[sock][offset : offset + size], "big")
+
+    def _set_socket(self, sock: int, name: str, value: int, size: int = 1) -> None:
+        offset = self._map[name]
+        self.socket_regs[sock][offset : offset + size] = (value & 0xFFFFFFFF).to_bytes(
+            4, "big"
+        )[4 - size :]
+
+    def _write_common(self, address: int, value: int, size: int) -> None:
+        self.common[address : address + size] = value.to_bytes(size, "big")
+
+    def _set_status(self, sock: int, status: int) -> None:
+        self._set_socket(sock, "Sn_SR", status)
+
+    def _interrupt(self, sock: int, flags: int) -> None:
+        offset = self._map["Sn_IR"]
+        self.socket_regs[sock][offset] |= flags
+
+    def _refresh(self) -> None:
+        """Update the derived registers and the INTn pin."""
+        link = self._map["LINK"]
+        if self.link:
+            self.common[link] |= 0x01
+        else:
+            self.common[link] &= 0xFE
+        pending = 0
+        for sock in self._sockets:
+            number = sock.number
+            tx_size, rx_size = self.buffer_sizes(number)
+            tx_wr = self._get_socket(number, "Sn_TX_WR", 2)
+            used = (tx_wr - sock.tx_rd) & 0xFFFF
+            self._set_socket(number, "Sn_TX_FSR", max(tx_size - used, 0), 2)
+            self._set_socket(number, "Sn_TX_RD", sock.tx_rd, 2)
+            sock.rx_rd = self._get_socket(number, "Sn_RX_RD", 2)
+            self._set_socket(
+                number, "Sn_RX_RSR", min((sock.rx_wr - sock.rx_rd) & 0xFFFF, rx_size), 2
+            )
+            self._set_socket(number, "Sn_RX_WR", sock.rx_wr, 2)
+            if self._get_socket(number, "Sn_IR") & self._get_socket(number, "Sn_IMR"):
+                pending |= 1 << number
+        sir = self._map["SIR"]
+        if self.chip == "w5100s":
+            self.common[sir] = (self.common[sir] & 0xF0) | pending
+            enabled = self.common[self._map["SIMR"]] & 0x0F
+        else:
+            self.common[sir] = pending
+            enabled = self.common[self._map["SIMR"]]
+        self.irq._value = not pending & enabled  # pylint: disable=protected-access
+
+    # *** Socket commands ***
+
+    def _command(self, sock: int, command: int) -> None:
+        # pylint: disable=too-many-branches
+        state = self._sockets[sock]
+        status = self._get_socket(sock, "Sn_SR")
+        mode = self._get_socket(sock, "Sn_MR") & 0x0F
+        if command == _CMD_OPEN:
+            self._close_host(state)
+            state.tx_rd = 0
+            state.rx_wr = state.rx_rd = 0
+            state.peer_closed = False
+            self._set_socket(sock, "Sn_TX_WR", 0, 2)
+            self._set_socket(sock, "Sn_RX_RD", 0, 2)
+            if mode == _MR_TCP:
+                self._set_status(sock, _SR_INIT)
+            elif mode == _MR_UDP:
+                host = _host_socket.socket(
+                    _host_socket.AF_INET, _host_socket.SOCK_DGRAM
+                )
+                host.setsockopt(_host_socket.SOL_SOCKET, _host_socket.SO_REUSEADDR, 1)
+                host.bind((self.bind_host, self._get_socket(sock, "Sn_PORT", 2)))
+                host.setblocking(False)
+                state.host = host
+                self._set_status(sock, _SR_UDP)
+        elif command == _CMD_LISTEN and status == _SR_INIT:
+            port = self._get_socket(sock, "Sn_PORT", 2)
+            if port not in self._listeners:
+                listener = _host_socket.socket(
+                    _host_socket.AF_INET, _host_socket.SOCK_STREAM
+                )
+                listener.setsockopt(
+                    _host_socket.SOL_SOCKET, _host_socket.SO_REUSEADDR, 1
+                )
+                listener.bind((self.bind_host, port))
+                listener.listen(8)
+                listener.setblocking(False)
+                self._listeners[port] = listener
+            state.listen_port = port
+            self._set_status(sock, _SR_LISTEN)
+        elif command == _CMD_CONNECT and status == _SR_INIT:
+            host = _host_socket.socket(_host_socket.AF_INET, _host_socket.SOCK_STREAM)
+            host.setblocking(False)
+            error = host.connect_ex(self._destination(sock))
+            state.host = host
+            if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                self._close_host(state)
+                self._set_status(sock, _SR_CLOSED)
+                self._interrupt(sock, _IR_TIMEOUT)
+            else:
+                self._set_status(sock, _SR_SYNSENT)
+        elif command in (_CMD_SEND, _CMD_SEND_MAC):
+            self._send(state, status)
+        elif command == _CMD_SEND_KEEP:
+            if status != _SR_ESTABLISHED:
+                return
+        elif command == _CMD_RECV:
+            self._refresh()
+            self._poll_receive(state)
+        elif command == _CMD_DISCON:
+            if status in (_SR_ESTABLISHED, _SR_CLOSE_WAIT):
+                self._close_host(state)
+                self._set_status(sock, _SR_CLOSED)
+                self._interrupt(sock, _IR_DISCON)
+        elif command == _CMD_CLOSE:
+            self._close_host(state)
+            self._set_status(sock, _SR_CLOSED)
+        self._refresh()
+
+    def _destination(self, sock: int) -> Tuple[str, int]:
+        offset = self._map["Sn_DIPR"]
+        address = ".".join(str(b) for b in self.socket_regs[sock][offset : offset + 4])
+        return (
+            self.remote_host or address,
+            self._get_socket(sock, "Sn_DPORT", 2),
+        )
+
+    def _tx_ring(self, sock: int) -> Tuple[int, int]:
+        """Base and size of a socket's TX ring buffer."""
+        return (
+            self._buffer_base(sock, "Sn_TXBUF_SIZE"),
+            self._get_socket(sock, "Sn_TXBUF_SIZE") * 1024,
+        )
+
+    def _rx_ring(self, sock: int) -> Tuple[int, int]:
+        """Base and size of a socket's RX ring buffer."""
+        return (
+            self._buffer_base(sock, "Sn_RXBUF_SIZE"),
+            self._get_socket(sock, "Sn_RXBUF_SIZE") * 1024,
+        )
+
+    def _send(self, state: _SimulatedSocket, status: int) -> None:
+        sock = state.number
+        if status not in (_SR_ESTABLISHED, _SR_CLOSE_WAIT, _SR_UDP):
+            return
+        base, size = self._tx_ring(sock)
+        tx_wr = self._get_socket(sock, "Sn_TX_WR", 2)
+        length = (tx_wr - state.tx_rd) & 0xFFFF
+        data = bytearray(length)
+        for index in range(length):
+            data[index] = self.tx_memory[base + ((state.tx_rd + index) & (size - 1))]
+        state.tx_rd = tx_wr
+        try:
+            if status == _SR_UDP:
+                state.host.sendto(data, self._destination(sock))
+            else:
+                state.host.setblocking(True)
+                state.host.sendall(data)
+                state.host.setblocking(False)
+        except OSError:
+            self._interrupt(sock, _IR_TIMEOUT)
+            if status != _SR_UDP:
+                self._close_host(state)
+                self._set_status(sock, _SR_CLOSED)
+            return
+        self._interrupt(sock, _IR_SEND_OK)
+
+    def _close_host(self, state: _SimulatedSocket) -> None:
+        if state.host is not None:
+            try:
+                state.host.close()
+            except OSError:
+                pass
+            state.host = None
+        if state.listen_port is not None:
+            port = state.listen_port
+            state.listen_port = None
+            if not any(s.listen_port == port for s in self._sockets):
+                listener = self._listeners.pop(port, None)
+                if listener:
+                    listener.close()
+
+    # *** Host socket polling ***
+
+    def _poll_listen(self, state: _SimulatedSocket) -> None:
+        listener = self._listeners.get(state.listen_port)
+        if listener is None:
+            return
+        try:
+            host, (address, port) = listener.accept()
+        except (BlockingIOError, OSError):
+            return
+        host.setblocking(False)
+        self._close_host(state)
+        state.host = host
+        sock = state.number
+        offset = self._map["Sn_DIPR"]
+        self.socket_regs[sock][offset : offset + 4] = bytes(
+            int(octet) for octet in address.split(".")
+        )
+        self._set_socket(sock, "Sn_DPORT", port, 2)
+        self._set_status(sock, _SR_ESTABLISHED)
+        self._interrupt(sock, _IR_CON)
+
+    def _poll_connect(self, state: _SimulatedSocket) -> None:
+        _, writable, _ = select.select([], [state.host], [], 0)
+        if not writable:
+            return
+        sock = state.number
+        error = state.host.getsockopt(_host_socket.SOL_SOCKET, _host_socket.SO_ERROR)
+        if error:
+            self._close_host(state)
+            self._set_status(sock, _SR_CLOSED)
+            self._interrupt(sock, _IR_TIMEOUT)
+            return
+        self._set_status(sock, _SR_ESTABLISHED)
+        self._interrupt(sock, _IR_CON)
+
+    def _poll_receive(self, state: _SimulatedSocket) -> None:
+        if state.host is None or state.peer_closed:
+            return
+        sock = state.number
+        base, size = self._rx_ring(sock)
+        state.rx_rd = self._get_socket(sock, "Sn_RX_RD", 2)
+        free = size - ((state.rx_wr - state.rx_rd) & 0xFFFF)
+        udp = self._get_socket(sock, "Sn_SR") == _SR_UDP
+        while free > (8 if udp else 0):
+            try:
+                if udp:
+                    data, (address, port) = state.host.recvfrom(65535)
+                    data = self._udp_header(address, port, len(data)) + data
+                    if len(data) > free:
+                        return  # Dropped, as the chip does when the ring is full.
+                else:
+                    data = state.host.recv(free)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                data = b""
+            if not data:
+                if not udp:
+                    state.peer_closed = True
+                    self._set_status(sock, _SR_CLOSE_WAIT)
+                    self._interrupt(sock, _IR_DISCON)
+                return
+            for index, byte in enumerate(data):
+                self.rx_memory[base + ((state.rx_wr + index) & (size - 1))] = byte
+            state.rx_wr = (state.rx_wr + len(data)) & 0xFFFF
+            free -= len(data)
+            self._interrupt(sock, _IR_RECV)
+
+    def _udp_header(self, address: str, port: int, length: int) -> bytes:
+        """The header the chip prefixes to each UDP datagram in the RX buffer."""
+        ip = bytes(int(octet) for octet in address.split("."))
+        if self.chip == "w6100":
+            return length.to_bytes(2, "big") + ip + port.to_bytes(2, "big")
+        return ip + port.to_bytes(2, "big") + length.to_bytes(2, "big")
+
+
+class _SimulatedSPI:
+    """A stand in for `busio.SPI` connected to a simulated chip."""
+
+    def __init__(self, chip: WIZNETSimulator) -> None:
+        self._chip = chip
+        self._locked = False
+
+    def try_lock(self) -> bool:
+        """Lock the bus."""
+        if self._locked:
+            return False
+        self._locked = True
+        return True
+
+    def unlock(self) -> None:
+        """Unlock the bus."""
+        self._locked = False
+
+    def configure(
+        self,
+        *,
+        baudrate: int = 100000,
+        polarity: int = 0,
+        phase: int = 0,
+        bits: int = 8,
+    ) -> None:
+        """Accept and ignore the bus configuration."""
+
+    def write(self, buffer, *, start: int = 0, end: Optional[int] = None) -> None:
+        """Write bytes to the chip."""
+        if end is None:
+            end = len(buffer)
+        # pylint: disable=protected-access
+        self._chip._transfer_out(memoryview(buffer)[start:end])
+
+    def readinto(
+        self, buffer, *, start: int = 0, end: Optional[int] = None, write_value: int = 0
+    ) -> None:
+        """Read bytes from the chip."""
+        if end is None:
+            end = len(buffer)
+        data = self._chip._transfer_in(end - start)  # pylint: disable=protected-access
+        memoryview(buffer)[start:end] = data
+
+    def write_readinto(
+        self,
+        out_buffer,
+        in_buffer,
+        *,
+        out_start: int = 0,
+        out_end: Optional[int] = None,
+        in_start: int = 0,
+        in_end: Optional[int] = None,
+    ) -> None:
+        """Write and read at the same time, the chip ignores data clocked in while
+        reading so this writes then reads."""
+        self.write(out_buffer, start=out_start, end=out_end)
+        self.readinto(in_buffer, start=in_start, end=in_end)
+
+    def deinit(self) -> None:
+        """Release the bus."""
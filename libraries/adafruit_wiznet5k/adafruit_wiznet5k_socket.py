@@ -14,12 +14,14 @@ A socket compatible interface with the Wiznet5k module.
 * Author(s): ladyada, Brent Rubell, Patrick Van Oosterwijck, Adam Cummick, Martin Stephens
 
 """
+
 from __future__ import annotations
 
 try:
-    from typing import TYPE_CHECKING, Optional, Tuple, List, Union
+    from typing import TYPE_CHECKING, Optional, Tuple, List, Union, Sequence
 
     if TYPE_CHECKING:
+        from circuitpython_typing import ReadableBuffer, WriteableBuffer
         from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
 except ImportError:
     pass
@@ -151,6 +153,35 @@ SOCK_DGRAM = const(0x02)  # UDP
 AF_INET = const(3)
 _SOCKET_INVALID = const(255)
 
+# poll() event flags, same values as the select module.
+POLLIN = const(0x01)
+POLLOUT = const(0x04)
+POLLERR = const(0x08)
+POLLHUP = const(0x10)
+POLLNVAL = const(0x20)
+# Polling interval in seconds while waiting on several sockets.
+_POLL_INTERVAL = 0.01
+
+# Socket options, same values as CircuitPython's socketpool.
+SOL_SOCKET = const(0xFFF)
+SO_REUSEADDR = const(0x0004)
+SO_KEEPALIVE = const(0x0008)
+IPPROTO_TCP = const(6)
+TCP_KEEPIDLE = const(0x03)
+# WIZnet specific TCP options, for the W6100 and W5100S: the retransmission timeout in
+# milliseconds, the number of retransmissions, and setting the timeout once from the
+# time taken to connect.
+TCP_RETRY_TIME = const(0x1001)
+TCP_RETRY_COUNT = const(0x1002)
+TCP_RETRY_ADAPTIVE = const(0x1003)
+# Default keep-alive interval in seconds.
+_KEEPALIVE_IDLE = const(60)
+# Limits of the adaptive retransmission timeout in milliseconds, which is the time
+# taken to connect multiplied by _RETRY_RTT_FACTOR.
+_RETRY_TIME_MIN = const(50)
+_RETRY_TIME_MAX = const(6553)
+_RETRY_RTT_FACTOR = const(4)
+
 
 # pylint: disable=too-many-arguments, unused-argument
 def getaddrinfo(
@@ -175,16 +206,21 @@ def getaddrinfo(
     :param int flags: Unused in this implementation of socket.
 
     :return List[Tuple[int, int, int, str, Tuple[str, int]]]: Address info entries in the form
-        (family, type, proto, canonname, sockaddr). In these tuples, family, type, proto are meant
-        to be passed to the socket() function. canonname will always be an empty string, sockaddr
-        is a tuple describing a socket address, whose format is (address, port), and is meant to be
-        passed to the socket.connect() method.
+        (family, type, proto, canonname, sockaddr), one for each address of the host. In these
+        tuples, family, type, proto are meant to be passed to the socket() function. canonname
+        will always be an empty string, sockaddr is a tuple describing a socket address, whose
+        format is (address, port), and is meant to be passed to the socket.connect() method.
     """
     if not isinstance(port, int):
         raise ValueError("Port must be an integer")
-    if not _is_ipv4_string(host):
-        host = gethostbyname(host)
-    return [(AF_INET, type, proto, "", (host, port))]
+    if _is_ipv4_string(host):
+        hosts = [host]
+    else:
+        hosts = [
+            _the_interface.pretty_ip(address)
+            for address in _the_interface.get_host_addresses(host)
+        ]
+    return [(AF_INET, type, proto, "", (host, port)) for host in hosts]
 
 
 def gethostbyname(hostname: str) -> str:
@@ -203,6 +239,69 @@ def gethostbyname(hostname: str) -> str:
     return address
 
 
+class GCPolicy:
+    """
+    When the socket layer runs garbage collection.
+
+    Rather than calling gc.collect() after every receive and send, the socket layer
+    counts the bytes it has allocated and collects once alloc_threshold bytes have
+    been allocated, or when less than min_free bytes of heap are free on boards
+    with gc.mem_free(). Set alloc_threshold to 0 to collect after every call.
+
+    The policy used by the socket layer is the module's gc_policy attribute.
+    """
+
+    def __init__(self, alloc_threshold: int = 16384, min_free: int = 0) -> None:
+        """
+        :param int alloc_threshold: Bytes to allocate between collections, defaults
+            to 16384.
+        :param int min_free: Collect whenever less heap than this is free, defaults
+            to 0 which does not check the free heap.
+        """
+        self.alloc_threshold = alloc_threshold
+        self.min_free = min_free
+        # Bytes allocated since the last collection.
+        self.allocated = 0
+        # Number of allocations counted, and of collections run.
+        self.checks = 0
+        self.collections = 0
+
+    def allocate(self, nbytes: int) -> None:
+        """
+        Count memory allocated by the socket layer, and collect if it is due.
+
+        :param int nbytes: Number of bytes allocated.
+        """
+        self.checks += 1
+        self.allocated += nbytes
+        if self.allocated >= self.alloc_threshold or (
+            self.min_free and _mem_free() < self.min_free
+        ):
+            self.collect()
+
+    def collect(self) -> None:
+        """Run garbage collection now."""
+        gc.collect()
+        self.allocated = 0
+        self.collections += 1
+
+    def reset_statistics(self) -> None:
+        """Zero the checks and collections counters."""
+        self.checks = 0
+        self.collections = 0
+
+
+def _mem_free() -> int:
+    """Free heap in bytes, or a very large number if it cannot be found."""
+    try:
+        return gc.mem_free()  # pylint: disable=no-member
+    except AttributeError:
+        return 1 << 30
+
+
+gc_policy = GCPolicy()
+
+
 # pylint: disable=invalid-name, too-many-public-methods
 class socket:
     """
@@ -232,6 +331,17 @@ class socket:
         self._buffer = b""
         self._timeout = _default_socket_timeout
         self._listen_port = None
+        self._listening = False
+        # UDP sockets stay open between datagrams, only the destination changes.
+        self._udp_open = False
+        self._destination = None
+        # TCP keep-alive packets sent by the chip, set with setsockopt().
+        self._keepalive = False
+        self._keepidle = _KEEPALIVE_IDLE
+        # TCP retransmission settings, None to use the chip's settings.
+        self._retry_time = None
+        self._retry_count = None
+        self._retry_adaptive = False
 
         self._socknum = _the_interface.get_socket(reserve_socket=True)
         if self._socknum == _SOCKET_INVALID:
@@ -369,6 +479,8 @@ class socket:
                 self._listen_port,
                 wiznet5k.adafruit_wiznet5k.SNMR_UDP,
             )
+            self._udp_open = True
+            self._destination = None
             self._buffer = b""
 
     @_check_socket_closed
@@ -381,6 +493,7 @@ class socket:
         if self._listen_port is None:
             raise RuntimeError("Use bind to set the port before listen!")
         _the_interface.socket_listen(self._socknum, self._listen_port)
+        self._listening = True
         self._buffer = b""
 
     @_check_socket_closed
@@ -405,13 +518,31 @@ class socket:
             if self._status == wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSED:
                 self.close()
                 self.listen()
+            _the_interface.socket_wait_event(
+                self._socknum,
+                wiznet5k.adafruit_wiznet5k.SNIR_CON
+                | wiznet5k.adafruit_wiznet5k.SNIR_DISCON
+                | wiznet5k.adafruit_wiznet5k.SNIR_TIMEOUT,
+                0,
+                stamp + self._timeout if self._timeout else None,
+            )
 
         _, addr = _the_interface.socket_accept(self._socknum)
         current_socknum = self._socknum
         # Create a new socket object and swap socket nums, so we can continue listening
         client_sock = socket()
-        self._socknum = client_sock._socknum  # pylint: disable=protected-access
-        client_sock._socknum = current_socknum  # pylint: disable=protected-access
+        # pylint: disable=protected-access
+        self._socknum = client_sock._socknum
+        client_sock._socknum = current_socknum
+        client_sock._keepalive = self._keepalive
+        client_sock._keepidle = self._keepidle
+        client_sock._set_keepalive_timer()
+        # The connection keeps the retry settings of the listening hardware socket.
+        client_sock._retry_time = self._retry_time
+        client_sock._retry_count = self._retry_count
+        if self._retry_time is not None or self._retry_count is not None:
+            self._set_retries(self._retry_time, self._retry_count)
+        # pylint: enable=protected-access
         self._bind((None, self._listen_port))
         self.listen()
         while self._status != wiznet5k.adafruit_wiznet5k.SNSR_SOCK_LISTEN:
@@ -421,21 +552,43 @@ class socket:
     @_check_socket_closed
     def connect(self, address: Tuple[str, int]) -> None:
         """
-        Connect to a remote socket at address.
+        Connect to a remote socket at address. If a host name has several addresses,
+        a TCP connection is tried to each in turn until one succeeds.
 
         :param Tuple[str, int] address: Remote socket as a (host, port) tuple.
+
+        :raises ConnectionError: If the TCP connection cannot be established.
         """
+        if _is_ipv4_string(address[0]):
+            hosts = [_the_interface.unpretty_ip(address[0])]
+        else:
+            hosts = _the_interface.get_host_addresses(address[0])
+        if self._sock_type == SOCK_DGRAM:
+            hosts = hosts[:1]
         if self._listen_port is not None:
             _the_interface.src_port = self._listen_port
-        result = _the_interface.socket_connect(
-            self._socknum,
-            _the_interface.unpretty_ip(gethostbyname(address[0])),
-            address[1],
-            self._sock_type,
-        )
-        _the_interface.src_port = 0
+        try:
+            for host in hosts:
+                start = time.monotonic()
+                try:
+                    result = _the_interface.socket_connect(
+                        self._socknum, host, address[1], self._sock_type
+                    )
+                    break
+                except ConnectionError:
+                    if host is hosts[-1]:
+                        raise
+        finally:
+            _the_interface.src_port = 0
         if not result:
             raise RuntimeError("Failed to connect to host ", address[0])
+        if self._sock_type == SOCK_DGRAM:
+            self._udp_open = True
+            self._destination = address
+        else:
+            if self._retry_adaptive:
+                self._adapt_retry_time(time.monotonic() - start)
+            self._set_keepalive_timer()
         self._buffer = b""
 
     @_check_socket_closed
@@ -452,15 +605,40 @@ class socket:
         """
         timeout = 0 if self._timeout is None else self._timeout
         bytes_sent = _the_interface.socket_write(self._socknum, data, timeout)
-        gc.collect()
+        gc_policy.allocate(bytes_sent)
         return bytes_sent
 
+    @_check_socket_closed
+    def sendall(self, data: Union[bytes, bytearray]) -> None:
+        """
+        Send all the data to the socket. The socket must be connected to a remote socket.
+
+        The data is streamed into the socket's TX buffer while earlier data is still
+        being sent, and the method returns once all of it has been sent.
+
+        :param bytearray data: Data to send to the socket.
+
+        :raises RuntimeError: If the data cannot be sent.
+        """
+        timeout = 0 if self._timeout is None else self._timeout
+        view = memoryview(data)
+        bytes_sent = 0
+        while bytes_sent < len(view):
+            bytes_sent += _the_interface.socket_write(
+                self._socknum, view[bytes_sent:], timeout, flush=False
+            )
+        _the_interface.socket_flush(self._socknum, timeout)
+
     @_check_socket_closed
     def sendto(self, data: bytearray, *flags_and_or_address: any) -> int:
         """
         Send data to the socket. The socket should not be connected to a remote socket, since the
         destination socket is specified by address. Return the number of bytes sent..
 
+        A UDP socket is opened by the first datagram and stays open, later datagrams only
+        update the destination when the address changes. The method returns once the
+        datagram has been copied to the chip.
+
         Either:
         :param bytearray data: Data to send to the socket.
         :param [Tuple[str, int]] address: Remote socket as a (host, port) tuple.
@@ -476,8 +654,64 @@ class socket:
             address = other_args[-1]
         else:
             raise ValueError("Incorrect number of arguments, should be 2 or 3.")
-        self.connect(address)
-        return self.send(data)
+        if self._sock_type != SOCK_DGRAM:
+            self.connect(address)
+            return self.send(data)
+        # The datagram is sent while the caller carries on, the next datagram waits
+        # for it to complete.
+        self._set_destination(address)
+        timeout = 0 if self._timeout is None else self._timeout
+        return _the_interface.socket_write(self._socknum, data, timeout, flush=False)
+
+    @_check_socket_closed
+    def sendmmsg(
+        self,
+        datagrams: Sequence[ReadableBuffer],
+        address: Optional[Tuple[str, int]] = None,
+    ) -> int:
+        """
+        Send several datagrams from a UDP socket to the same remote socket. Each
+        datagram is copied to the TX buffer while the previous one is being sent.
+
+        :param Sequence[ReadableBuffer] datagrams: The datagrams to send.
+        :param Optional[Tuple[str, int]] address: Remote socket as a (host, port)
+            tuple, defaults to None which sends to the connected remote socket or the
+            address of the last sendto().
+
+        :return int: The number of datagrams sent.
+
+        :raises RuntimeError: If the socket is not a UDP socket or has no destination.
+        """
+        if self._sock_type != SOCK_DGRAM:
+            raise RuntimeError("Socket must be a UDP socket.")
+        if address is not None:
+            self._set_destination(address)
+        elif self._destination is None:
+            raise RuntimeError("The socket has no destination.")
+        timeout = 0 if self._timeout is None else self._timeout
+        sent = 0
+        for datagram in datagrams:
+            _the_interface.socket_write(self._socknum, datagram, timeout, flush=False)
+            sent += 1
+        return sent
+
+    def _set_destination(self, address: Tuple[str, int]) -> None:
+        """
+        Open the UDP socket if needed and set the destination of its datagrams,
+        writing the destination registers only when the address changes. A datagram
+        still being sent is finished first, so that it is not sent to the new address.
+
+        :param Tuple[str, int] address: Remote socket as a (host, port) tuple.
+        """
+        if not self._udp_open:
+            self.connect(address)
+        elif address != self._destination:
+            host = _the_interface.unpretty_ip(gethostbyname(address[0]))
+            _the_interface.socket_flush(
+                self._socknum, 0 if self._timeout is None else self._timeout
+            )
+            _the_interface.socket_set_destination(self._socknum, host, address[1])
+            self._destination = address
 
     @_check_socket_closed
     def recv(
@@ -495,12 +729,7 @@ class socket:
 
         :return bytes: Data from the socket.
         """
-        stamp = time.monotonic()
-        while not self._available():
-            if self._timeout and 0 < self._timeout < time.monotonic() - stamp:
-                break
-            time.sleep(0.05)
-        bytes_on_socket = self._available()
+        bytes_on_socket = self._wait_for_data()
         if not bytes_on_socket:
             return b""
         bytes_to_read = min(bytes_on_socket, bufsize)
@@ -508,8 +737,26 @@ class socket:
             bytes_read = _the_interface.socket_read(self._socknum, bytes_to_read)[1]
         else:
             bytes_read = _the_interface.read_udp(self._socknum, bytes_to_read)[1]
-        gc.collect()
-        return bytes(bytes_read)
+        gc_policy.allocate(len(bytes_read))
+        return bytes_read
+
+    def _wait_for_data(self) -> int:
+        """
+        Wait until data is available on the socket or the socket times out.
+
+        :return int: Number of bytes available, 0 if the socket timed out.
+        """
+        stamp = time.monotonic()
+        stop_time = stamp + self._timeout if self._timeout else None
+        bytes_on_socket = self._available()
+        while not bytes_on_socket:
+            if self._timeout and 0 < self._timeout < time.monotonic() - stamp:
+                break
+            _the_interface.socket_wait_event(
+                self._socknum, wiznet5k.adafruit_wiznet5k.SNIR_RECV, 0.05, stop_time
+            )
+            bytes_on_socket = self._available()
+        return bytes_on_socket
 
     def _embed_recv(
         self, bufsize: int = 0, flags: int = 0
@@ -529,10 +776,9 @@ class socket:
                 self._buffer += _the_interface.socket_read(self._socknum, avail)[1]
             elif self._sock_type == SOCK_DGRAM:
                 self._buffer += _the_interface.read_udp(self._socknum, avail)[1]
-        gc.collect()
         ret = self._buffer
         self._buffer = b""
-        gc.collect()
+        gc_policy.allocate(len(ret))
         return ret
 
     @_check_socket_closed
@@ -560,7 +806,8 @@ class socket:
     def recv_into(self, buffer: bytearray, nbytes: int = 0, flags: int = 0) -> int:
         """
         Receive up to nbytes bytes from the socket, storing the data into a buffer
-        rather than creating a new bytestring.
+        rather than creating a new bytestring. The data is copied directly from the
+        chip into the buffer.
 
         :param bytearray buffer: Data buffer to read into.
         :param nbytes: Maximum number of bytes to receive (if 0, use length of buffer).
@@ -568,12 +815,14 @@ class socket:
 
         :return int: the number of bytes received
         """
-        if nbytes == 0:
+        if nbytes == 0 or nbytes > len(buffer):
             nbytes = len(buffer)
-        bytes_received = self.recv(nbytes)
-        nbytes = len(bytes_received)
-        buffer[:nbytes] = bytes_received
-        return nbytes
+        if not self._wait_for_data():
+            return 0
+        view = memoryview(buffer)[:nbytes]
+        if self._sock_type == SOCK_STREAM:
+            return _the_interface.socket_read_into(self._socknum, view)
+        return _the_interface.read_udp_into(self._socknum, view)
 
     @_check_socket_closed
     def recvfrom_into(
@@ -598,6 +847,35 @@ class socket:
             ),
         )
 
+    @_check_socket_closed
+    def recvmmsg(
+        self, buffers: Sequence[WriteableBuffer]
+    ) -> List[Tuple[int, Tuple[str, int]]]:
+        """
+        Receive several UDP messages, one into each buffer, waiting until at least one
+        message is available or the socket times out. The messages waiting on the chip
+        are read with one SPI burst. If a message is longer than its buffer, the rest
+        of the message is discarded.
+
+        :param Sequence[WriteableBuffer] buffers: The buffers to read into.
+
+        :return List[Tuple[int, Tuple[str, int]]]: The number of bytes received and the
+            (address, port) the message came from, for each buffer filled. An empty
+            list if the socket timed out.
+
+        :raises RuntimeError: If the socket is not a UDP socket.
+        """
+        if self._sock_type != SOCK_DGRAM:
+            raise RuntimeError("Socket must be a UDP socket.")
+        if not self._wait_for_data():
+            return []
+        return [
+            (length, (_the_interface.pretty_ip(from_ip), from_port))
+            for length, from_ip, from_port in _the_interface.read_udp_many_into(
+                self._socknum, buffers
+            )
+        ]
+
     def _readline(self) -> bytes:
         """
         Read a line from the socket.
@@ -625,7 +903,7 @@ class socket:
                     self.close()
                     raise RuntimeError("Didn't receive response, failing out...")
         firstline, self._buffer = self._buffer.split(b"\r\n", 1)
-        gc.collect()
+        gc_policy.allocate(len(firstline) + len(self._buffer))
         return firstline
 
     def _disconnect(self) -> None:
@@ -640,10 +918,58 @@ class socket:
         Mark the socket closed. Once that happens, all future operations on the socket object
         will fail. The remote end will receive no more data.
         """
+        if self._udp_open:
+            # Let a datagram queued by sendto() or sendmmsg() be sent first.
+            try:
+                _the_interface.socket_flush(
+                    self._socknum, 0 if self._timeout is None else self._timeout
+                )
+            except RuntimeError:
+                pass
         _the_interface.release_socket(self._socknum)
         _the_interface.socket_close(self._socknum)
         self._socket_closed = True
 
+    def _poll(self) -> int:
+        """
+        Return the POLLIN, POLLOUT, POLLERR, POLLHUP and POLLNVAL flags for the socket.
+
+        A listening TCP socket is readable when a connection is ready to be accepted,
+        and has an error when the hardware socket has closed. A connected TCP socket
+        hangs up when the connection is closed or closing.
+
+        :return int: The event flags.
+        """
+        if self._socket_closed:
+            return POLLNVAL
+        status, rx_size, tx_free = _the_interface.socket_state(self._socknum)
+        events = POLLIN if rx_size or self._buffer else 0
+        if self._sock_type == SOCK_DGRAM:
+            if tx_free:
+                events |= POLLOUT
+        elif self._listening:
+            if status in (
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_SYNRECV,
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_ESTABLISHED,
+            ):
+                events |= POLLIN
+            elif status == wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSED:
+                events |= POLLERR
+        else:
+            if tx_free and status in (
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_ESTABLISHED,
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSE_WAIT,
+            ):
+                events |= POLLOUT
+            if status in (
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSED,
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSE_WAIT,
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_FIN_WAIT,
+                wiznet5k.adafruit_wiznet5k.SNSR_SOCK_TIME_WAIT,
+            ):
+                events |= POLLHUP
+        return events
+
     def _available(self) -> int:
         """
         Return how many bytes of data are available to be read from the socket.
@@ -652,6 +978,114 @@ class socket:
         """
         return _the_interface.socket_available(self._socknum, self._sock_type)
 
+    @_check_socket_closed
+    def setsockopt(self, level: int, optname: int, value: int) -> None:
+        """
+        Set a socket option.
+
+        SO_KEEPALIVE makes the chip send TCP keep-alive packets on an idle connection
+        once data has been sent or received, every 60 seconds or every TCP_KEEPIDLE
+        seconds. If the peer stops responding the chip closes the connection, without
+        waking the application. SO_REUSEADDR is accepted and ignored.
+
+        On the W6100 and W5100S, TCP_RETRY_TIME and TCP_RETRY_COUNT set the socket's
+        retransmission timeout and retry count. TCP_RETRY_ADAPTIVE sets the timeout to
+        four times the time taken to connect, once, when the connection is made. It is
+        not updated while the connection is open, as the chip does not report when
+        sent data is acknowledged.
+
+        :param int level: SOL_SOCKET or IPPROTO_TCP.
+        :param int optname: SO_KEEPALIVE or SO_REUSEADDR for SOL_SOCKET, TCP_KEEPIDLE,
+            TCP_RETRY_TIME, TCP_RETRY_COUNT or TCP_RETRY_ADAPTIVE for IPPROTO_TCP.
+        :param int value: The option value. TCP_KEEPIDLE is rounded up to a multiple of
+            5 seconds, up to 1275 seconds. TCP_RETRY_TIME is in milliseconds, 1 - 6553.
+
+        :raises ValueError: If the option is not supported or the value is invalid.
+        """
+        if level == SOL_SOCKET and optname == SO_KEEPALIVE:
+            self._keepalive = bool(value)
+            self._set_keepalive_timer()
+        elif level == IPPROTO_TCP and optname == TCP_KEEPIDLE:
+            if not 0 < value <= 1275:
+                raise ValueError("TCP_KEEPIDLE must be 1 - 1275 seconds.")
+            self._keepidle = value
+            self._set_keepalive_timer()
+        elif level == IPPROTO_TCP and optname == TCP_RETRY_TIME:
+            if not 0 < value <= _RETRY_TIME_MAX:
+                raise ValueError("TCP_RETRY_TIME must be 1 - 6553 milliseconds.")
+            self._set_retries(value, self._retry_count)
+        elif level == IPPROTO_TCP and optname == TCP_RETRY_COUNT:
+            self._set_retries(self._retry_time, value)
+        elif level == IPPROTO_TCP and optname == TCP_RETRY_ADAPTIVE:
+            if value and _the_interface.chip == "w5500":
+                raise ValueError("The chip has no per socket retry settings.")
+            self._retry_adaptive = bool(value)
+        elif not (level == SOL_SOCKET and optname == SO_REUSEADDR):
+            raise ValueError("Unsupported socket option.")
+
+    @_check_socket_closed
+    def getsockopt(self, level: int, optname: int) -> int:
+        """
+        Return the value of a socket option.
+
+        :param int level: SOL_SOCKET or IPPROTO_TCP.
+        :param int optname: SO_KEEPALIVE for SOL_SOCKET, TCP_KEEPIDLE, TCP_RETRY_TIME,
+            TCP_RETRY_COUNT or TCP_RETRY_ADAPTIVE for IPPROTO_TCP.
+
+        :return int: The option value.
+
+        :raises ValueError: If the option is not supported.
+        """
+        if level == SOL_SOCKET and optname == SO_KEEPALIVE:
+            return int(self._keepalive)
+        if level == IPPROTO_TCP and optname == TCP_KEEPIDLE:
+            return self._keepidle
+        if level == IPPROTO_TCP and optname == TCP_RETRY_TIME:
+            return self._retry_time or 0
+        if level == IPPROTO_TCP and optname == TCP_RETRY_COUNT:
+            return 0 if self._retry_count is None else self._retry_count
+        if level == IPPROTO_TCP and optname == TCP_RETRY_ADAPTIVE:
+            return int(self._retry_adaptive)
+        raise ValueError("Unsupported socket option.")
+
+    @_check_socket_closed
+    def send_keepalive(self) -> None:
+        """
+        Send a TCP keep-alive packet now, on a connection without SO_KEEPALIVE. If the
+        peer does not respond the chip closes the connection.
+        """
+        _the_interface.socket_send_keepalive(self._socknum)
+
+    def _set_keepalive_timer(self) -> None:
+        """Set the chip's keep-alive interval from the socket options."""
+        if self._sock_type == SOCK_STREAM:
+            _the_interface.socket_set_keepalive(
+                self._socknum, self._keepidle if self._keepalive else 0
+            )
+
+    def _set_retries(
+        self, retry_time: Optional[int], retry_count: Optional[int]
+    ) -> None:
+        """Set the chip's retransmission timeout in milliseconds and retry count."""
+        _the_interface.socket_set_retries(
+            self._socknum, None if retry_time is None else retry_time * 10, retry_count
+        )
+        self._retry_time = retry_time
+        self._retry_count = retry_count
+
+    def _adapt_retry_time(self, rtt: float) -> None:
+        """
+        Set the retransmission timeout from the time taken to connect, which is about
+        one round trip to the peer. Called once per connection; the timeout then stays
+        fixed, as SEND_OK only reports that data has left the chip, not the peer's ACK.
+
+        :param float rtt: The time taken to connect in seconds.
+        """
+        retry_time = int(rtt * 1000 * _RETRY_RTT_FACTOR)
+        self._set_retries(
+            min(max(retry_time, _RETRY_TIME_MIN), _RETRY_TIME_MAX), self._retry_count
+        )
+
     @_check_socket_closed
     def settimeout(self, value: Optional[float]) -> None:
         """
@@ -730,3 +1164,125 @@ class socket:
     def proto(self):
         """Socket protocol (always 0x00 in this implementation)."""
         return 0
+
+
+class poll:
+    """
+    A polling object to wait on several sockets at once, like select.poll().
+
+    Each registered socket costs a single burst of register reads per pass (two on
+    the W6100). In interrupt mode the sockets are only read again after the INTn pin
+    has signalled an event.
+    """
+
+    def __init__(self) -> None:
+        self._registered = {}
+
+    def register(self, sock: socket, eventmask: int = POLLIN | POLLOUT) -> None:
+        """
+        Register a socket, or modify the events of a registered socket.
+
+        :param socket sock: The socket to watch.
+        :param int eventmask: POLLIN and/or POLLOUT, defaults to POLLIN | POLLOUT.
+            POLLERR, POLLHUP and POLLNVAL are always reported.
+        """
+        self._registered[sock] = eventmask
+
+    def modify(self, sock: socket, eventmask: int) -> None:
+        """
+        Modify the events of a registered socket.
+
+        :param socket sock: The registered socket.
+        :param int eventmask: POLLIN and/or POLLOUT.
+
+        :raises KeyError: If the socket is not registered.
+        """
+        if sock not in self._registered:
+            raise KeyError("The socket is not registered.")
+        self._registered[sock] = eventmask
+
+    def unregister(self, sock: socket) -> None:
+        """
+        Stop watching a socket.
+
+        :param socket sock: The registered socket.
+
+        :raises KeyError: If the socket is not registered.
+        """
+        del self._registered[sock]
+
+    def poll(self, timeout: Optional[float] = None) -> List[Tuple[socket, int]]:
+        """
+        Wait until at least one registered socket has an event.
+
+        :param Optional[float] timeout: Time to wait in milliseconds, defaults to None.
+            None or a negative value waits indefinitely, 0 checks the sockets once.
+
+        :return List[Tuple[socket, int]]: (socket, events) pairs for the sockets that
+            have events, empty if the timeout expired.
+        """
+        stop_time = None
+        if timeout is not None and timeout >= 0:
+            stop_time = time.monotonic() + timeout / 1000
+        while True:
+            ready = []
+            writing = False
+            for sock, eventmask in self._registered.items():
+                # pylint: disable=protected-access
+                events = sock._poll() & (eventmask | POLLERR | POLLHUP | POLLNVAL)
+                if events:
+                    ready.append((sock, events))
+                writing = writing or eventmask & POLLOUT
+            if ready or (stop_time is not None and time.monotonic() >= stop_time):
+                return ready
+            wait_until = stop_time
+            if writing:
+                # Space freed in a TX buffer does not raise an interrupt.
+                wait_until = time.monotonic() + _POLL_INTERVAL
+                if stop_time is not None:
+                    wait_until = min(wait_until, stop_time)
+            _the_interface.wait_for_interrupt(_POLL_INTERVAL, wait_until)
+
+
+def select(
+    rlist: List[socket],
+    wlist: List[socket],
+    xlist: List[socket],
+    timeout: Optional[float] = None,
+) -> Tuple[List[socket], List[socket], List[socket]]:
+    """
+    Wait until one or more sockets are ready, like select.select().
+
+    :param List[socket] rlist: Sockets to wait on until they are ready for reading. A
+        listening socket is ready for reading when a connection can be accepted.
+    :param List[socket] wlist: Sockets to wait on until they are ready for writing.
+    :param List[socket] xlist: Sockets to wait on for an error or a closed connection.
+    :param Optional[float] timeout: Time to wait in seconds, defaults to None which
+        waits indefinitely. 0 checks the sockets once.
+
+    :return Tuple[List[socket], List[socket], List[socket]]: The sockets from each
+        list that are ready.
+    """
+    eventmasks = {}
+    for sock in rlist:
+        eventmasks[sock] = POLLIN
+    for sock in wlist:
+        eventmasks[sock] = eventmasks.get(sock, 0) | POLLOUT
+    for sock in xlist:
+        eventmasks[sock] = eventmasks.get(sock, 0)
+    poller = poll()
+    for sock, eventmask in eventmasks.items():
+        poller.register(sock, eventmask)
+    ready = poller.poll(None if timeout is None else timeout * 1000)
+    readable, writable, errored = [], [], []
+    for sock, events in ready:
+        # As with select.select(), a socket with an error or a closed connection is
+        # returned in every list it was given in.
+        failed = events & (POLLERR | POLLHUP | POLLNVAL)
+        if events & POLLIN or failed and sock in rlist:
+            readable.append(sock)
+        if events & POLLOUT or failed and sock in wlist:
+            writable.append(sock)
+        if failed and sock in xlist:
+            errored.append(sock)
+    return readable, writable, errored
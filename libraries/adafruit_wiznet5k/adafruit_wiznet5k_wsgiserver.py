@@ -38,9 +38,7 @@ except ImportError:
     pass
 
 import io
-import gc
 from micropython import const
-import adafruit_wiznet5k as wiznet5k
 import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
 
 _the_interface: Optional[WIZNET5K] = None  # pylint: disable=invalid-name
@@ -112,19 +110,20 @@ class WSGIServer:
         check for new incoming client requests. When a request comes in,
         the application callable will be invoked.
         """
-        for sock in self._client_sock:
+        readable, _, errored = socket.select(
+            self._client_sock, [], self._client_sock, 0
+        )
+        for sock in errored:
+            self._client_sock.remove(sock)
+        for sock in readable:
+            if sock in errored:
+                continue
             if sock._available():  # pylint: disable=protected-access
                 environ = self._get_environ(sock)
                 result = self.application(environ, self._start_response)
                 self.finish_response(result, sock)
                 self._client_sock.remove(sock)
                 break
-        for sock in self._client_sock:
-            if (
-                sock._status  # pylint: disable=protected-access
-                == wiznet5k.adafruit_wiznet5k.SNSR_SOCK_CLOSED
-            ):
-                self._client_sock.remove(sock)
         for _ in range(len(self._client_sock), self.MAX_SOCK_NUM):
             try:
                 new_sock = socket.socket()
@@ -149,20 +148,14 @@ class WSGIServer:
             for header in self._response_headers:
                 response += "{0}: {1}\r\n".format(*header)
             response += "\r\n"
-            client.send(response.encode("utf-8"))
+            client.sendall(response.encode("utf-8"))
+            sent = len(response)
             for data in result:
                 if not isinstance(data, bytes):
                     data = data.encode("utf-8")
-                if len(data) < 0x800:
-                    client.send(data)
-                else:
-                    # split to chunks of 2 kb
-                    data_chunks = [
-                        data[i : i + 0x800] for i in range(0, len(data), 0x800)
-                    ]
-                    for data_chunk in data_chunks:
-                        client.send(data_chunk)
-            gc.collect()
+                client.sendall(data)
+                sent += len(data)
+            socket.gc_policy.allocate(sent)
         finally:
             client._disconnect()  # pylint: disable=protected-access
             client.close()
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Shared fixtures, the driver running against the simulated chip."""
+
+import os
+import socket as host_socket
+import sys
+import time
+
+import pytest
+
+# The package is not installed, import it from the libraries directory. The
+# micropython module it imports is provided by Adafruit-Blinka on a host computer.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "libraries"))
+
+# pylint: disable=wrong-import-position
+from adafruit_wiznet5k.adafruit_wiznet5k import WIZNET5K
+import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
+from adafruit_wiznet5k.adafruit_wiznet5k_simulator import WIZNETSimulator
+
+LOOPBACK = ((127, 0, 0, 1), (255, 0, 0, 0), (127, 0, 0, 1), (127, 0, 0, 1))
+
+
+@pytest.fixture
+def free_port():
+    """Find a port on the loopback interface that is free for TCP and UDP."""
+
+    def find() -> int:
+        while True:
+            with host_socket.socket() as tcp, host_socket.socket(
+                host_socket.AF_INET, host_socket.SOCK_DGRAM
+            ) as udp:
+                tcp.bind(("127.0.0.1", 0))
+                port = tcp.getsockname()[1]
+                try:
+                    udp.bind(("127.0.0.1", port))
+                except OSError:
+                    continue
+                return port
+
+    return find
+
+
+@pytest.fixture
+def make_interface(monkeypatch):
+    """Make simulated chips and WIZNET5K drivers for them, closed after the test."""
+    simulators = []
+
+    def make(chip="w5500", *, irq=False, ifconfig=LOOPBACK, **kwargs):
+        sim = WIZNETSimulator(chip)
+        simulators.append(sim)
+        sleep = time.sleep
+        with monkeypatch.context() as patch:
+            # The simulated chip is ready at once, skip the reset delays.
+            patch.setattr(
+                time,
+                "sleep",
+                lambda seconds: None if seconds >= 0.5 else sleep(seconds),
+            )
+            eth = WIZNET5K(
+                sim.spi, sim.cs, is_dhcp=False, irq=sim.irq if irq else None, **kwargs
+            )
+        if ifconfig is not None:
+            eth.ifconfig = ifconfig
+        socket.set_interface(eth)
+        return sim, eth
+
+    yield make
+    for sim in simulators:
+        sim.close()
+
+
+@pytest.fixture(params=["w5500", "w5100s", "w6100"])
+def interface(request, make_interface):
+    """A simulated chip of each type and its driver, set as the socket interface."""
+    return make_interface(request.param)
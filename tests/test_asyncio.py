@@ -0,0 +1,180 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for asyncio sockets and the task that polls them."""
+
+import asyncio
+import socket as host_socket
+import threading
+import time
+
+import pytest
+
+import adafruit_wiznet5k.adafruit_wiznet5k_asyncio as wiz_asyncio
+from adafruit_wiznet5k.adafruit_wiznet5k_asyncio import AsyncSocket
+
+MODES = pytest.mark.parametrize("irq", [False, True], ids=["polling", "interrupt"])
+
+
+def echo_server(listener: host_socket.socket) -> None:
+    """Echo everything received on one connection, in a thread."""
+
+    def run():
+        conn, _ = listener.accept()
+        with conn:
+            while True:
+                data = conn.recv(4096)
+                if not data:
+                    break
+                conn.sendall(data)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+@pytest.fixture
+def host_listener():
+    """A TCP socket on the host, listening on the loopback interface."""
+    listener = host_socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    yield listener
+    listener.close()
+
+
+@MODES
+def test_client_echo(make_interface, host_listener, irq):
+    make_interface(irq=irq)
+    echo_server(host_listener)
+    payload = bytes(range(256)) * 40
+
+    async def client():
+        sock = AsyncSocket()
+        await sock.connect(host_listener.getsockname())
+
+        async def receive():
+            buffer = bytearray(len(payload))
+            received = 0
+            while received < len(payload):
+                length = await sock.recv_into(memoryview(buffer)[received:])
+                assert length
+                received += length
+            return bytes(buffer)
+
+        task = asyncio.create_task(receive())
+        await sock.sendall(payload)
+        data = await task
+        sock.close()
+        return data
+
+    assert asyncio.run(client()) == payload
+
+
+@MODES
+def test_server_accepts_while_other_tasks_run(make_interface, free_port, irq):
+    make_interface(irq=irq)
+    port = free_port()
+    replies = []
+
+    def peer():
+        time.sleep(0.1)
+        with host_socket.create_connection(("127.0.0.1", port)) as conn:
+            conn.sendall(b"abc")
+            replies.append(conn.recv(10))
+
+    async def server():
+        listener = AsyncSocket()
+        listener.bind((None, port))
+        listener.listen()
+        conn, _ = await listener.accept()
+        buffer = bytearray(16)
+        length = await conn.recv_into(buffer)
+        await conn.sendall(buffer[:length].upper())
+        # The peer closing the connection ends the stream.
+        assert await conn.recv_into(buffer) == 0
+        conn.close()
+        listener.close()
+
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.005)
+
+    async def main():
+        task = asyncio.create_task(ticker())
+        threading.Thread(target=peer, daemon=True).start()
+        await server()
+        task.cancel()
+
+    asyncio.run(main())
+    assert replies == [b"ABC"]
+    # The ticker ran while the server waited for the connection.
+    assert len(ticks) > 10
+
+
+def test_connect_refused_raises(make_interface, free_port):
+    make_interface()
+
+    async def connect():
+        sock = AsyncSocket()
+        try:
+            await sock.connect(("127.0.0.1", free_port()))
+        finally:
+            sock.close()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(connect())
+
+
+def test_poller_backs_off_while_waiting_for_interrupt(
+    make_interface, host_listener, monkeypatch
+):
+    _, eth = make_interface(irq=True)
+    echo_server(host_listener)
+    calls = []
+    wait_for_interrupt = eth.wait_for_interrupt
+
+    def counted(*args):
+        calls.append(args)
+        return wait_for_interrupt(*args)
+
+    monkeypatch.setattr(eth, "wait_for_interrupt", counted)
+
+    async def idle_receive():
+        sock = AsyncSocket()
+        await sock.connect(host_listener.getsockname())
+        calls.clear()
+        try:
+            await asyncio.wait_for(sock.recv_into(bytearray(8)), 0.3)
+        except asyncio.TimeoutError:
+            pass
+        sock.close()
+
+    asyncio.run(idle_receive())
+    # At most one pass of the poller every _POLL_INTERVAL once it has backed off.
+    # pylint: disable=protected-access
+    assert len(calls) < 0.3 / wiz_asyncio._POLL_INTERVAL + 10
+
+
+def test_udp_connect_keeps_socket_for_sendto(make_interface):
+    make_interface()
+    receiver = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2)
+
+    async def send():
+        sock = AsyncSocket(type=wiz_asyncio.socket.SOCK_DGRAM)
+        await sock.connect(receiver.getsockname())
+        # pylint: disable=protected-access
+        socknum = sock.socket._socknum
+        sock.socket.sendto(b"a", receiver.getsockname())
+        sock.socket.sendmmsg([b"b", b"c"])
+        assert sock.socket._socknum == socknum
+        sock.close()
+
+    try:
+        asyncio.run(send())
+        assert [receiver.recv(8) for _ in range(3)] == [b"a", b"b", b"c"]
+    finally:
+        receiver.close()
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for per-socket TX and RX buffer sizes."""
+
+import socket as host_socket
+import threading
+
+import pytest
+
+import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
+
+# Uneven TX and RX sizes in KB for each chip, using all of its memory.
+SIZES = {
+    "w5500": ([8, 1, 4, 2, 1, 0, 0, 0], [1, 8, 2, 4, 1, 0, 0, 0]),
+    "w6100": ([8, 1, 4, 2, 1, 0, 0, 0], [1, 8, 2, 4, 1, 0, 0, 0]),
+    "w5100s": ([4, 1, 2, 1], [1, 4, 1, 2]),
+}
+
+
+@pytest.fixture(params=sorted(SIZES))
+def uneven_interface(request, make_interface):
+    """Each chip type with uneven buffer sizes."""
+    tx_sizes, rx_sizes = SIZES[request.param]
+    sim, eth = make_interface(
+        request.param, tx_buffer_sizes=tx_sizes, rx_buffer_sizes=rx_sizes
+    )
+    return sim, eth, tx_sizes, rx_sizes
+
+
+def echo_server(listener: host_socket.socket, connections: int) -> None:
+    """Echo everything received on each connection, in a thread."""
+
+    def run():
+        for _ in range(connections):
+            conn, _ = listener.accept()
+            with conn:
+                while True:
+                    data = conn.recv(4096)
+                    if not data:
+                        break
+                    conn.sendall(data)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def test_sizes_written_to_chip(uneven_interface):
+    sim, eth, tx_sizes, rx_sizes = uneven_interface
+    for sock in range(eth.max_sockets):
+        assert sim.buffer_sizes(sock) == (tx_sizes[sock] * 1024, rx_sizes[sock] * 1024)
+
+
+def test_data_wraps_around_uneven_buffers(uneven_interface):
+    _, eth, tx_sizes, rx_sizes = uneven_interface
+    usable = [
+        sock for sock in range(1, eth.max_sockets) if tx_sizes[sock] and rx_sizes[sock]
+    ]
+    listener = host_socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    echo_server(listener, len(usable))
+    payload = bytes(i * 7 & 0xFF for i in range(10000))
+    used = []
+    try:
+        for _ in usable:
+            sock = socket.socket()
+            sock.settimeout(2)
+            sock.connect(listener.getsockname())
+            used.append(sock._socknum)  # pylint: disable=protected-access
+            received = bytearray()
+            # Several times the smaller buffer sizes, so both ring buffers wrap.
+            for start in range(0, len(payload), 2500):
+                sock.sendall(payload[start : start + 2500])
+                while len(received) < start + 2500:
+                    received += sock.recv(4096)
+            sock.close()
+            assert received == payload
+    finally:
+        listener.close()
+    assert sorted(used) == usable
+
+
+def test_socket_without_buffers_not_allocated(make_interface):
+    _, eth = make_interface(
+        tx_buffer_sizes=[0, 4, 4, 0, 4, 0, 4, 0],
+        rx_buffer_sizes=[0, 4, 4, 0, 4, 0, 4, 0],
+    )
+    # Socket 0 has no memory, so it is not handed out for unreserved use.
+    assert eth.get_socket() != 0
+    reserved = [eth.get_socket(reserve_socket=True) for _ in range(4)]
+    assert sorted(reserved) == [1, 2, 4, 6]
+    with pytest.raises(RuntimeError):
+        eth.get_socket(reserve_socket=True)
+    with pytest.raises(RuntimeError):
+        eth.get_socket()
+    for sock in reserved:
+        eth.release_socket(sock)
+
+
+@pytest.mark.parametrize(
+    "sizes",
+    [
+        [2] * 7,  # One size short.
+        [4] * 8,  # More than 16 KB.
+        [3, 2, 2, 2, 2, 2, 2, 1],  # Not a valid size.
+    ],
+)
+def test_invalid_sizes_raise(make_interface, sizes):
+    with pytest.raises(ValueError):
+        make_interface(tx_buffer_sizes=sizes)
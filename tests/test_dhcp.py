@@ -0,0 +1,193 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the DHCP client state machine against a DHCP server on the host."""
+
+import socket as host_socket
+import threading
+import time
+
+import pytest
+
+import adafruit_wiznet5k.adafruit_wiznet5k_dhcp as wiz_dhcp
+
+DISCOVER, OFFER, REQUEST, ACK, NAK = 1, 2, 3, 5, 6
+LEASED_IP = bytes((10, 0, 0, 50))
+
+
+class DHCPServer:
+    """Answer DISCOVER with an OFFER and REQUEST with an ACK, or NAK if told to."""
+
+    def __init__(self, port: int, lease: int = 3600) -> None:
+        self.lease = lease
+        self.naks = 0
+        # Message types received, in order.
+        self.received = []
+        self._sock = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", port))
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                data, address = self._sock.recvfrom(1024)
+            except OSError:
+                return
+            message_type = data[242]
+            self.received.append(message_type)
+            if message_type == DISCOVER:
+                reply_type = OFFER
+            elif self.naks:
+                self.naks -= 1
+                reply_type = NAK
+            else:
+                reply_type = ACK
+            reply = bytearray(300)
+            reply[0] = 2
+            reply[4:8] = data[4:8]
+            reply[16:20] = LEASED_IP
+            reply[28:34] = data[28:34]
+            reply[236:240] = b"c\x82Sc"
+            options = (
+                bytes((53, 1, reply_type, 1, 4, 255, 255, 255, 0, 3, 4, 10, 0, 0, 1))
+                + bytes((6, 4, 10, 0, 0, 2, 54, 4, 10, 0, 0, 1, 51, 4))
+                + self.lease.to_bytes(4, "big")
+                + b"\xff"
+            )
+            reply[240 : 240 + len(options)] = options
+            self._sock.sendto(reply, address)
+
+
+@pytest.fixture
+def dhcp_server(monkeypatch, free_port):
+    """Run a DHCP server on unprivileged ports."""
+    server_port = free_port()
+    monkeypatch.setattr(wiz_dhcp, "_DHCP_SERVER_PORT", server_port)
+    monkeypatch.setattr(wiz_dhcp, "_DHCP_CLIENT_PORT", free_port())
+    server = DHCPServer(server_port)
+    yield server
+    server.close()
+
+
+def test_blocking_lease(make_interface, dhcp_server):
+    _, eth = make_interface()
+    eth.set_dhcp()
+    assert dhcp_server.received == [DISCOVER, REQUEST]
+    assert eth.ip_address == LEASED_IP
+    assert eth.ifconfig[2:] == (bytes((10, 0, 0, 1)), bytes((10, 0, 0, 2)))
+
+
+def test_non_blocking_lease_and_renewal(make_interface, dhcp_server):
+    _, eth = make_interface()
+    eth.set_dhcp(blocking=False)
+    deadline = time.monotonic() + 5
+    while eth.ip_address != LEASED_IP:
+        assert time.monotonic() < deadline
+        eth.maintain_dhcp_lease()
+    # pylint: disable=protected-access
+    client = eth._dhcp_client
+    # Make the renewal time pass.
+    client._t1 = time.monotonic() - 1
+    while dhcp_server.received[-1] != REQUEST or len(dhcp_server.received) < 3:
+        assert time.monotonic() < deadline
+        eth.maintain_dhcp_lease()
+    while client._dhcp_state != wiz_dhcp._STATE_BOUND:
+        assert time.monotonic() < deadline
+        eth.maintain_dhcp_lease()
+    assert dhcp_server.received == [DISCOVER, REQUEST, REQUEST]
+
+
+def test_saved_lease_requested_with_init_reboot(make_interface, dhcp_server):
+    store = bytearray(32)
+    _, eth = make_interface()
+    eth.set_dhcp(lease_store=store, lease_offset=8)
+    assert store[8:12] == b"WZL\x01" and store[12:16] == LEASED_IP
+
+    dhcp_server.received.clear()
+    _, eth = make_interface()
+    client = wiz_dhcp.DHCP(eth, eth.mac_address, lease_store=store, lease_offset=8)
+    # pylint: disable=protected-access
+    assert client._dhcp_state == wiz_dhcp._STATE_INIT_REBOOT
+    assert client.request_dhcp_lease()
+    # The saved lease is confirmed by a single REQUEST.
+    assert dhcp_server.received == [REQUEST]
+    assert eth.ip_address == LEASED_IP
+
+
+def test_refused_saved_lease_falls_back_to_discovery(make_interface, dhcp_server):
+    store = bytearray(16)
+    _, eth = make_interface()
+    eth.set_dhcp(lease_store=store)
+
+    dhcp_server.received.clear()
+    dhcp_server.naks = 1
+    _, eth = make_interface()
+    client = wiz_dhcp.DHCP(eth, eth.mac_address, lease_store=store)
+    assert client.request_dhcp_lease()
+    assert dhcp_server.received == [REQUEST, DISCOVER, REQUEST]
+    assert eth.ip_address == LEASED_IP
+
+
+def test_expired_saved_lease_ignored(make_interface):
+    _, eth = make_interface()
+    store = bytearray(b"WZL\x01" + LEASED_IP + bytes((10, 0, 0, 1)))
+    store += int(time.time() - 1).to_bytes(4, "big")
+    client = wiz_dhcp.DHCP(eth, eth.mac_address, lease_store=store)
+    # pylint: disable=protected-access
+    assert client._dhcp_state == wiz_dhcp._STATE_INIT
+
+
+class CountingStore(bytearray):
+    """Non-volatile memory which counts the writes made to it."""
+
+    writes = 0
+
+    def __setitem__(self, index, value):
+        self.writes += 1
+        super().__setitem__(index, value)
+
+
+def renew(eth, dhcp_server) -> None:
+    """Make the renewal time pass and maintain the lease until it is renewed."""
+    # pylint: disable=protected-access
+    client = eth._dhcp_client
+    client._t1 = time.monotonic() - 1
+    requests = dhcp_server.received.count(REQUEST)
+    deadline = time.monotonic() + 5
+    while (
+        dhcp_server.received.count(REQUEST) == requests
+        or client._dhcp_state != wiz_dhcp._STATE_BOUND
+    ):
+        assert time.monotonic() < deadline
+        eth.maintain_dhcp_lease()
+
+
+def test_renewal_only_saves_lease_when_saved_expiry_lapsing(
+    make_interface, dhcp_server
+):
+    store = CountingStore(16)
+    _, eth = make_interface()
+    eth.set_dhcp(lease_store=store)
+    assert store.writes == 1
+    renew(eth, dhcp_server)
+    # Same address and server, and most of the lease left on the saved expiry.
+    assert store.writes == 1
+    saved = int(time.time() + 100).to_bytes(4, "big")
+    store[12:16] = saved
+    store.writes = 0
+    renew(eth, dhcp_server)
+    assert store.writes == 1
+    assert int.from_bytes(store[12:16], "big") >= time.time() + 3500
+
+
+def test_lease_not_saved_with_clock_unset(make_interface, dhcp_server, monkeypatch):
+    store = bytearray(16)
+    _, eth = make_interface()
+    # The clock of a board without an RTC starts at 2000-01-01.
+    monkeypatch.setattr(wiz_dhcp.time, "time", lambda: 946684800.0)
+    eth.set_dhcp(lease_store=store)
+    assert eth.ip_address == LEASED_IP
+    assert store == bytearray(16)
@@ -0,0 +1,236 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for parsing DNS responses, the DNS cache and looking up host names."""
+
+import socket as host_socket
+import threading
+import time
+
+import pytest
+
+from adafruit_wiznet5k.adafruit_wiznet5k import SNSR_SOCK_CLOSED
+import adafruit_wiznet5k.adafruit_wiznet5k_dns as wiz_dns
+
+QUERY_ID = 0x1234
+QUESTION = b"\x03www\x07example\x03com\x00\x00\x01\x00\x01"
+QUERY_LENGTH = 12 + len(QUESTION)
+# Pointer to the name in the question.
+NAME = b"\xc0\x0c"
+
+
+def answer(owner: bytes, record_type: int, ttl: int, data: bytes) -> bytes:
+    """Encode a class IN answer."""
+    return (
+        owner
+        + record_type.to_bytes(2, "big")
+        + b"\x00\x01"
+        + ttl.to_bytes(4, "big")
+        + len(data).to_bytes(2, "big")
+        + data
+    )
+
+
+def response(*answers: bytes) -> bytearray:
+    """Encode a response to the query for www.example.com."""
+    header = (
+        QUERY_ID.to_bytes(2, "big")
+        + b"\x81\x80\x00\x01"
+        + len(answers).to_bytes(2, "big")
+        + b"\x00\x00\x00\x00"
+    )
+    return bytearray(header + QUESTION + b"".join(answers))
+
+
+def parse(data: bytearray):
+    return wiz_dns._parse_dns_response(  # pylint: disable=protected-access
+        response=data, query_id=QUERY_ID, query_length=QUERY_LENGTH, debug=False
+    )
+
+
+def test_truncated_cname_raises_value_error():
+    # The CNAME data is a label that claims five bytes but has two.
+    data = response(answer(NAME, 5, 300, b"\x05ab"))
+    with pytest.raises(ValueError, match="Invalid name"):
+        parse(data)
+
+
+def test_all_a_records_returned_with_shortest_ttl():
+    data = response(
+        answer(NAME, 1, 300, b"\x0a\x00\x00\x01"),
+        answer(NAME, 1, 60, b"\x0a\x00\x00\x02"),
+    )
+    assert parse(data) == ([b"\x0a\x00\x00\x01", b"\x0a\x00\x00\x02"], 60)
+
+
+def test_cname_chain_followed_to_a_records():
+    # www.example.com -> a.example.com (at offset 45) -> 10.0.0.3
+    data = response(
+        answer(NAME, 5, 120, b"\x01a\xc0\x10"),
+        answer(b"\xc0\x2d", 1, 600, b"\x0a\x00\x00\x03"),
+    )
+    assert parse(data) == ([b"\x0a\x00\x00\x03"], 120)
+
+
+def test_a_records_for_other_names_ignored():
+    data = response(answer(b"\x01b\xc0\x10", 1, 300, b"\x0a\x00\x00\x04"))
+    with pytest.raises(ValueError, match="No type A"):
+        parse(data)
+
+
+def test_truncated_answer_uses_complete_answers():
+    data = response(
+        answer(NAME, 1, 300, b"\x0a\x00\x00\x01"),
+        answer(NAME, 1, 300, b"\x0a\x00\x00\x02"),
+    )
+    assert parse(data[:-2]) == ([b"\x0a\x00\x00\x01"], 300)
+
+
+def test_forward_name_pointer_rejected():
+    data = response(answer(b"\xc0\xff", 1, 300, b"\x0a\x00\x00\x01"))
+    with pytest.raises(ValueError, match="Invalid name"):
+        parse(data)
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(wiz_dns.time, "monotonic", lambda: now[0])
+    cache = wiz_dns.DNSCache(size=2, max_ttl=100, negative_ttl=5)
+    cache.add(b"a.com", [b"\x0a\x00\x00\x01", b"\x0a\x00\x00\x02"], ttl=300)
+    cache.add(b"bad.com", None)
+    assert cache.lookup_all(b"a.com") == (
+        True,
+        [b"\x0a\x00\x00\x01", b"\x0a\x00\x00\x02"],
+    )
+    assert cache.lookup(b"bad.com") == (True, None)
+    now[0] += 5
+    # Failed lookups are kept for negative_ttl.
+    assert cache.lookup(b"bad.com") == (False, None)
+    now[0] += 94
+    assert cache.lookup(b"a.com") == (True, b"\x0a\x00\x00\x01")
+    now[0] += 1
+    # The TTL is limited to max_ttl.
+    assert cache.lookup(b"a.com") == (False, None)
+
+
+def test_cache_replaces_least_recently_used():
+    cache = wiz_dns.DNSCache(size=2)
+    cache.add(b"a.com", b"\x0a\x00\x00\x01", ttl=60)
+    cache.add(b"b.com", b"\x0a\x00\x00\x02", ttl=60)
+    cache.lookup(b"a.com")
+    cache.add(b"c.com", b"\x0a\x00\x00\x03", ttl=60)
+    assert cache.lookup(b"a.com")[0]
+    assert not cache.lookup(b"b.com")[0]
+    assert cache.lookup(b"c.com")[0]
+
+
+@pytest.fixture
+def dns_server(monkeypatch, free_port):
+    """A DNS server on the host that answers with two addresses and a CNAME."""
+    server = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+    port = free_port()
+    server.bind(("127.0.0.1", port))
+    monkeypatch.setattr(wiz_dns, "_DNS_PORT", port)
+    queries = []
+
+    def run():
+        while True:
+            try:
+                query, address = server.recvfrom(512)
+            except OSError:
+                return
+            end = query.index(b"\x00", 12) + 5
+            name = query[12 : end - 4]
+            queries.append(name)
+            if name.startswith(b"\x07missing"):
+                # NXDOMAIN
+                server.sendto(query[:2] + b"\x81\x83" + query[4:end], address)
+                continue
+            # Pointer to the CNAME data, after the owner and fixed fields.
+            cname = b"\xc0" + bytes([end + 12])
+            answers = answer(NAME, 5, 300, b"\x01a\xc0\x0c") + answer(
+                cname, 1, 300, b"\x0a\x00\x00\x01"
+            )
+            answers += answer(cname, 1, 300, b"\x0a\x00\x00\x02")
+            server.sendto(
+                query[:2] + b"\x81\x80\x00\x01\x00\x03" + query[8:end] + answers,
+                address,
+            )
+
+    threading.Thread(target=run, daemon=True).start()
+    yield queries
+    server.close()
+
+
+def test_get_host_by_name_uses_dns_server_and_cache(make_interface, dns_server):
+    _, eth = make_interface()
+    assert eth.get_host_addresses("www.example.com") == [
+        b"\x0a\x00\x00\x01",
+        b"\x0a\x00\x00\x02",
+    ]
+    assert eth.get_host_by_name("www.example.com") == b"\x0a\x00\x00\x01"
+    # The second lookup is answered from the cache.
+    assert len(dns_server) == 1
+    with pytest.raises(RuntimeError):
+        eth.get_host_by_name("missing.example.com")
+
+
+def test_lookup_with_link_down_does_not_break_later_lookups(make_interface, dns_server):
+    sim, eth = make_interface()
+    sim.link = False
+    assert not eth.link_status
+    with pytest.raises(ConnectionError):
+        eth.get_host_by_name("www.example.com")
+    # pylint: disable=protected-access
+    assert eth.dns_client._sock is None and not eth.dns_client._queries
+    sim.link = True
+    assert eth.get_host_by_name("www.example.com") == b"\x0a\x00\x00\x01"
+    assert eth.dns_client._sock is None
+    assert all(
+        eth.socket_status(sock) == SNSR_SOCK_CLOSED for sock in range(eth.max_sockets)
+    )
+
+
+def test_query_waits_for_chip_to_send_earlier_query(
+    make_interface, dns_server, monkeypatch
+):
+    _, eth = make_interface()
+    client = eth.dns_client
+    busy = [False]
+    destinations = []
+    socket_set_destination = eth.socket_set_destination
+
+    def set_destination(*args):
+        destinations.append(args)
+        socket_set_destination(*args)
+
+    monkeypatch.setattr(eth, "socket_send_busy", lambda sock: busy[0])
+    monkeypatch.setattr(eth, "socket_set_destination", set_destination)
+    first = client.start_query(b"www.example.com")
+    # The chip is still sending the first query, the second is not written.
+    busy[0] = True
+    second = client.start_query(b"www.example.org")
+    client.poll()
+    assert not destinations
+    busy[0] = False
+    results = {}
+    deadline = time.monotonic() + 2
+    while len(results) < 2:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+        client.poll()
+        for query_id in (first, second):
+            if query_id not in results:
+                result = client.result(query_id)
+                if result is not None:
+                    results[query_id] = result
+    assert len(destinations) == 1
+    assert len(dns_server) == 2
+    assert (
+        results[first][0]
+        == results[second][0]
+        == [
+            b"\x0a\x00\x00\x01",
+            b"\x0a\x00\x00\x02",
+        ]
+    )
@@ -0,0 +1,189 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the SNTP client against NTP servers on the host."""
+
+import socket as host_socket
+import threading
+import time
+
+import pytest
+
+import adafruit_wiznet5k.adafruit_wiznet5k_dns as wiz_dns
+import adafruit_wiznet5k.adafruit_wiznet5k_ntp as wiz_ntp
+
+NTP_TO_UNIX = 2208988800
+
+
+def ntp_timestamp(seconds: float) -> bytes:
+    """Convert Unix seconds to an NTP timestamp."""
+    seconds += NTP_TO_UNIX
+    return (int(seconds) & 0xFFFFFFFF).to_bytes(4, "big") + int(
+        seconds % 1 * 2**32
+    ).to_bytes(4, "big")
+
+
+class NTPServer:
+    """An NTP server whose clock is offset from the host clock."""
+
+    def __init__(self, port, offset, *, delay=0.0, processing=0.0, stratum=2):
+        self.offset = offset
+        # Network delay before the request is received, and the time between
+        # receiving the request and sending the response.
+        self.delay = delay
+        self.processing = processing
+        self.stratum = stratum
+        self.requests = 0
+        self._sock = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+        self._sock.bind(("127.0.0.1", port))
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                request, address = self._sock.recvfrom(512)
+            except OSError:
+                return
+            self.requests += 1
+            time.sleep(self.delay)
+            response = bytearray(48)
+            response[0] = 0x24  # Version 4, server mode.
+            response[1] = self.stratum
+            response[24:32] = request[40:48]
+            response[32:40] = ntp_timestamp(time.time() + self.offset)
+            time.sleep(self.processing)
+            response[40:48] = ntp_timestamp(time.time() + self.offset)
+            self._sock.sendto(response, address)
+
+
+@pytest.fixture
+def ntp_port(monkeypatch, free_port):
+    """Use an unprivileged port for NTP."""
+    port = free_port()
+    monkeypatch.setattr(wiz_ntp, "_NTP_PORT", port)
+    return port
+
+
+def clock_error(ntp: wiz_ntp.NTP, offset: float) -> float:
+    """Difference between the client's clock and the server's clock, in seconds."""
+    return (ntp.time_ns() - time.time_ns()) / 1e9 - offset
+
+
+def test_timestamp_ns_handles_ntp_eras():
+    # pylint: disable=protected-access
+    packet = bytes(32) + ntp_timestamp(1.5)
+    assert wiz_ntp._timestamp_ns(packet, 32) == 1500000000
+    # The 32 bit seconds wrap to era 1 on 2036-02-07.
+    after_wrap = 2**32 - NTP_TO_UNIX + 10
+    packet = bytes(32) + ntp_timestamp(after_wrap)
+    assert wiz_ntp._timestamp_ns(packet, 32) == after_wrap * 1000000000
+
+
+def test_offset_excludes_server_processing_time(make_interface, ntp_port):
+    _, eth = make_interface()
+    server = NTPServer(ntp_port, 1000.5, processing=0.2)
+    try:
+        ntp = wiz_ntp.NTP(eth, "127.0.0.1", utc=0)
+        ntp.synchronize()
+        assert ntp.synchronized
+        assert abs(clock_error(ntp, 1000.5)) < 0.02
+        # The time the server held the request is not part of the round trip.
+        assert ntp.delay < 100000000
+    finally:
+        server.close()
+
+
+def test_network_delay_measured(make_interface, ntp_port):
+    _, eth = make_interface()
+    server = NTPServer(ntp_port, -20.0, delay=0.1)
+    try:
+        ntp = wiz_ntp.NTP(eth, "127.0.0.1", utc=0)
+        ntp.synchronize()
+        assert ntp.delay >= 100000000
+        # Delay on the way out only makes the offset wrong by half the delay.
+        assert abs(clock_error(ntp, -20.0)) < 0.07
+    finally:
+        server.close()
+
+
+def test_unsynchronised_server_ignored(make_interface, ntp_port):
+    _, eth = make_interface()
+    server = NTPServer(ntp_port, 5.0, stratum=0)
+    try:
+        ntp = wiz_ntp.NTP(eth, "127.0.0.1", utc=0, timeout=0.2)
+        with pytest.raises(TimeoutError):
+            ntp.synchronize()
+        assert server.requests == 1
+        assert not ntp.synchronized
+    finally:
+        server.close()
+
+
+def test_poll_synchronises(make_interface, ntp_port):
+    _, eth = make_interface()
+    server = NTPServer(ntp_port, 42.0)
+    try:
+        ntp = wiz_ntp.NTP(eth, "127.0.0.1", utc=0)
+        deadline = time.monotonic() + 2
+        while not ntp.synchronized:
+            assert time.monotonic() < deadline
+            ntp.poll()
+        assert abs(clock_error(ntp, 42.0)) < 0.02
+    finally:
+        server.close()
+
+
+def test_poll_looks_up_host_name_without_blocking(
+    make_interface, ntp_port, free_port, monkeypatch
+):
+    _, eth = make_interface()
+    # A DNS server that never answers.
+    dns_server = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+    dns_port = free_port()
+    dns_server.bind(("127.0.0.1", dns_port))
+    monkeypatch.setattr(wiz_dns, "_DNS_PORT", dns_port)
+    try:
+        ntp = wiz_ntp.NTP(eth, "ntp.example.com", utc=0)
+        start = time.monotonic()
+        while time.monotonic() - start < 0.5:
+            before = time.monotonic()
+            ntp.poll()
+            assert time.monotonic() - before < 0.05
+        assert dns_server.recv(512)
+        assert not ntp.synchronized
+    finally:
+        dns_server.close()
+
+
+def test_host_name_resolved_from_dns_cache(make_interface, ntp_port):
+    _, eth = make_interface()
+    eth.dns_cache.add(b"ntp.example.com", b"\x7f\x00\x00\x01", 60)
+    server = NTPServer(ntp_port, 7.0)
+    try:
+        ntp = wiz_ntp.NTP(eth, ["ntp.example.com"], utc=0)
+        ntp.synchronize()
+        assert abs(clock_error(ntp, 7.0)) < 0.02
+    finally:
+        server.close()
+
+
+def test_link_down_does_not_leave_socket_open(make_interface, ntp_port):
+    sim, eth = make_interface()
+    server = NTPServer(ntp_port, 3.0)
+    try:
+        ntp = wiz_ntp.NTP(eth, "127.0.0.1", utc=0)
+        sim.link = False
+        assert not eth.link_status
+        with pytest.raises(ConnectionError):
+            ntp.synchronize()
+        # pylint: disable=protected-access
+        assert ntp._sock is None
+        sim.link = True
+        ntp.synchronize()
+        assert abs(clock_error(ntp, 3.0)) < 0.02
+        assert ntp._sock is None
+    finally:
+        server.close()
@@ -0,0 +1,362 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for sending and receiving through the simulated chip."""
+
+import socket as host_socket
+import threading
+import time
+
+import pytest
+
+import adafruit_wiznet5k.adafruit_wiznet5k_socket as socket
+
+
+@pytest.fixture
+def host_listener():
+    """A TCP socket on the host, listening on the loopback interface."""
+    listener = host_socket.socket()
+    listener.setsockopt(host_socket.SOL_SOCKET, host_socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    yield listener
+    listener.close()
+
+
+@pytest.fixture
+def host_udp():
+    """A UDP socket on the host, bound to the loopback interface."""
+    sock = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(2)
+    yield sock
+    sock.close()
+
+
+def receive_all(listener: host_socket.socket, received: list) -> threading.Thread:
+    """Accept a connection and collect everything sent on it, in a thread."""
+
+    def run():
+        conn, _ = listener.accept()
+        conn.settimeout(5)
+        data = b""
+        with conn:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+        received.append(data)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_sendall_pipelines_large_payload(interface, host_listener):
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.connect(host_listener.getsockname())
+    # Several times the TX buffer, so data is written while the chip is sending.
+    payload = bytes(i & 0xFF for i in range(65536))
+    sock.sendall(payload)
+    sock.close()
+    thread.join(5)
+    assert received == [payload]
+
+
+def test_socket_send_queues_data_behind_send_in_progress(interface, host_listener):
+    _, eth = interface
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.connect(host_listener.getsockname())
+    socknum = sock._socknum  # pylint: disable=protected-access
+    chunks = [bytes([65 + i]) * 100 for i in range(8)]
+    for chunk in chunks:
+        assert eth.socket_send(socknum, chunk) == len(chunk)
+    while eth.socket_send_busy(socknum):
+        pass
+    sock.close()
+    thread.join(5)
+    assert received == [b"".join(chunks)]
+
+
+def test_recvmmsg_reads_waiting_messages(interface, host_udp):
+    sock = socket.socket(type=socket.SOCK_DGRAM)
+    sock.settimeout(1)
+    sock.bind((None, 0))
+    # Learn the port from the first datagram the chip sends.
+    sock.sendto(b"hello", host_udp.getsockname())
+    _, address = host_udp.recvfrom(16)
+    messages = [b"m%02d" % i + b"x" * (i % 7) for i in range(20)]
+    for message in messages:
+        host_udp.sendto(message, address)
+    time.sleep(0.05)
+    buffers = [bytearray(6) for _ in range(8)]
+    received = []
+    while len(received) < len(messages):
+        results = sock.recvmmsg(buffers)
+        assert results
+        for (length, source), buffer in zip(results, buffers):
+            assert source == host_udp.getsockname()
+            received.append(bytes(buffer[:length]))
+    # Each message is truncated to its buffer.
+    assert received == [message[:6] for message in messages]
+    sock.close()
+
+
+def test_read_udp_many_into_returns_source_of_each_message(interface, host_udp):
+    _, eth = interface
+    sock = socket.socket(type=socket.SOCK_DGRAM)
+    sock.bind((None, 0))
+    sock.sendto(b"hello", host_udp.getsockname())
+    _, address = host_udp.recvfrom(16)
+    host_udp.sendto(b"one", address)
+    host_udp.sendto(b"three", address)
+    time.sleep(0.05)
+    buffers = [bytearray(8), bytearray(8), bytearray(8)]
+    # pylint: disable=protected-access
+    results = eth.read_udp_many_into(sock._socknum, buffers)
+    host, port = host_udp.getsockname()
+    assert results == [
+        (3, eth.unpretty_ip(host), port),
+        (5, eth.unpretty_ip(host), port),
+    ]
+    assert buffers[0][:3] == b"one" and buffers[1][:5] == b"three"
+    assert not eth.read_udp_many_into(sock._socknum, buffers)
+    sock.close()
+
+
+@pytest.mark.parametrize("irq", [False, True], ids=["polling", "interrupt"])
+def test_select_and_poll(make_interface, free_port, irq):
+    make_interface(irq=irq)
+    port = free_port()
+    server = socket.socket()
+    server.bind((None, port))
+    server.listen()
+    udp = socket.socket(type=socket.SOCK_DGRAM)
+    udp.bind((None, free_port()))
+    try:
+        assert socket.select([server, udp], [udp], [server], 0) == ([], [udp], [])
+
+        client = host_socket.create_connection(("127.0.0.1", port))
+        readable, _, _ = socket.select([server, udp], [], [], 2)
+        assert readable == [server]
+        conn, _ = server.accept()
+
+        # Nothing to read, select times out.
+        start = time.monotonic()
+        assert socket.select([udp, conn], [], [], 0.2) == ([], [], [])
+        assert time.monotonic() - start >= 0.2
+
+        threading.Timer(0.1, lambda: client.send(b"hi")).start()
+        readable, _, _ = socket.select([udp, conn], [], [], 2)
+        assert readable == [conn]
+        assert conn.recv(10) == b"hi"
+
+        poller = socket.poll()
+        poller.register(conn, socket.POLLIN)
+        client.close()
+        events = poller.poll(2000)
+        assert events and events[0][1] & socket.POLLHUP
+        conn.close()
+    finally:
+        server.close()
+        udp.close()
+
+
+@pytest.fixture
+def host_udp_pair():
+    """Two UDP sockets on the host, bound to the loopback interface."""
+    socks = []
+    for _ in range(2):
+        sock = host_socket.socket(host_socket.AF_INET, host_socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.settimeout(2)
+        socks.append(sock)
+    yield socks
+    for sock in socks:
+        sock.close()
+
+
+def test_sendto_keeps_socket_open_and_destination(
+    interface, host_udp_pair, monkeypatch
+):
+    _, eth = interface
+    calls = []
+
+    def recorded(name):
+        method = getattr(eth, name)
+
+        def call(*args, **kwargs):
+            calls.append(name)
+            return method(*args, **kwargs)
+
+        return call
+
+    for name in ("socket_connect", "socket_set_destination"):
+        monkeypatch.setattr(eth, name, recorded(name))
+    first, second = host_udp_pair
+    sock = socket.socket(type=socket.SOCK_DGRAM)
+    for message in (b"a", b"b", b"c"):
+        sock.sendto(message, first.getsockname())
+    # The socket is opened once, and the destination is only written when it changes.
+    assert calls == ["socket_connect"]
+    sock.sendto(b"d", second.getsockname())
+    sock.sendto(b"e", first.getsockname())
+    assert calls == ["socket_connect"] + ["socket_set_destination"] * 2
+    received = [first.recvfrom(8) for _ in range(4)] + [second.recvfrom(8)]
+    assert [data for data, _ in received] == [b"a", b"b", b"c", b"e", b"d"]
+    # Every datagram came from the same source port.
+    assert len({address for _, address in received}) == 1
+    sock.close()
+
+
+def test_sendto_alternating_destinations_delivers_each_datagram(
+    interface, host_udp_pair
+):
+    first, second = host_udp_pair
+    sock = socket.socket(type=socket.SOCK_DGRAM)
+    for index in range(10):
+        sock.sendto(b"%d" % index, host_udp_pair[index % 2].getsockname())
+    assert [first.recv(8) for _ in range(5)] == [b"0", b"2", b"4", b"6", b"8"]
+    assert [second.recv(8) for _ in range(5)] == [b"1", b"3", b"5", b"7", b"9"]
+    sock.close()
+
+
+def test_sendmmsg_sends_to_last_destination(interface, host_udp):
+    sock = socket.socket(type=socket.SOCK_DGRAM)
+    assert sock.sendmmsg([b"one", b"two"], host_udp.getsockname()) == 2
+    assert sock.sendmmsg([b"three"]) == 1
+    assert [host_udp.recv(8) for _ in range(3)] == [b"one", b"two", b"three"]
+    sock.close()
+
+
+def test_gc_policy_collects_after_threshold(interface, host_listener, monkeypatch):
+    policy = socket.GCPolicy(alloc_threshold=1000)
+    monkeypatch.setattr(socket, "gc_policy", policy)
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.connect(host_listener.getsockname())
+    for _ in range(10):
+        sock.send(b"x" * 250)
+    assert policy.checks == 10
+    # 2500 bytes sent, collected at 1000 and 2000.
+    assert policy.collections == 2
+    assert policy.allocated == 500
+    policy.alloc_threshold = 0
+    policy.reset_statistics()
+    sock.send(b"y")
+    sock.send(b"z")
+    assert policy.collections == 2
+    sock.close()
+    thread.join(5)
+    assert received == [b"x" * 2500 + b"yz"]
+
+
+def test_gc_policy_collects_when_heap_low(monkeypatch):
+    policy = socket.GCPolicy(min_free=4096)
+    free = [8192]
+    monkeypatch.setattr(socket, "_mem_free", lambda: free[0])
+    policy.allocate(10)
+    assert policy.collections == 0
+    free[0] = 2048
+    policy.allocate(10)
+    assert policy.collections == 1 and policy.allocated == 0
+
+
+def test_keepalive_sets_chip_timer(interface, host_listener):
+    sim, _ = interface
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 12)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    sock.connect(host_listener.getsockname())
+    socknum = sock._socknum  # pylint: disable=protected-access
+    # Rounded up to units of 5 seconds.
+    assert sim.socket_register(socknum, "Sn_KPALVTR") == 3
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) == 1
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 12
+    sock.send(b"hi")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 0)
+    assert sim.socket_register(socknum, "Sn_KPALVTR") == 0
+    sock.send_keepalive()
+    sock.close()
+    thread.join(5)
+    assert received == [b"hi"]
+
+
+def test_keepalive_default_interval_and_invalid_options(interface):
+    sock = socket.socket()
+    assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) == 0
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE) == 60
+    for idle in (0, 1276):
+        with pytest.raises(ValueError):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle)
+    with pytest.raises(ValueError):
+        sock.setsockopt(socket.SOL_SOCKET, 0x0080, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.close()
+
+
+@pytest.mark.parametrize("chip", ["w5100s", "w6100"])
+def test_retry_options_set_socket_registers(make_interface, host_listener, chip):
+    sim, eth = make_interface(chip)
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_TIME, 100)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_COUNT, 2)
+    sock.connect(host_listener.getsockname())
+    socknum = sock._socknum  # pylint: disable=protected-access
+    # In units of 100 µs.
+    assert sim.socket_register(socknum, "Sn_RTR", 2) == 1000
+    assert sim.socket_register(socknum, "Sn_RCR") == 2
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_TIME) == 100
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_COUNT) == 2
+    sock.close()
+    thread.join(5)
+    # Released sockets go back to the chip's settings.
+    assert sim.socket_register(socknum, "Sn_RTR", 2) == eth.rtr
+    assert sim.socket_register(socknum, "Sn_RCR") == eth.rcr
+
+
+@pytest.mark.parametrize("chip", ["w5100s", "w6100"])
+def test_adaptive_retry_time_set_when_connected(make_interface, host_listener, chip):
+    sim, _ = make_interface(chip)
+    received = []
+    thread = receive_all(host_listener, received)
+    sock = socket.socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_ADAPTIVE, 1)
+    assert sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_TIME) == 0
+    sock.connect(host_listener.getsockname())
+    socknum = sock._socknum  # pylint: disable=protected-access
+    # Connecting over the loopback interface is quick, so the lower limit is used.
+    # pylint: disable=protected-access
+    assert (
+        sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_RETRY_TIME)
+        == socket._RETRY_TIME_MIN
+    )
+    assert sim.socket_register(socknum, "Sn_RTR", 2) == socket._RETRY_TIME_MIN * 10
+    sock.send(b"x" * 100)
+    # The timeout is fixed once connected.
+    assert sim.socket_register(socknum, "Sn_RTR", 2) == socket._RETRY_TIME_MIN * 10
+    sock.close()
+    thread.join(5)
+
+
+def test_retry_options_need_per_socket_registers(make_interface):
+    make_interface("w5500")
+    sock = socket.socket()
+    for option in (
+        socket.TCP_RETRY_TIME,
+        socket.TCP_RETRY_COUNT,
+        socket.TCP_RETRY_ADAPTIVE,
+    ):
+        with pytest.raises(ValueError):
+            sock.setsockopt(socket.IPPROTO_TCP, option, 1)
+    sock.close()
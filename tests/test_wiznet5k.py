@@ -0,0 +1,150 @@
+# SPDX-FileCopyrightText: 2026 Adafruit_CircuitPython_Wiznet5k contributors
+#
+# SPDX-License-Identifier: MIT
+"""Tests for the interface registers of each chip type."""
+
+import time
+
+import pytest
+
+from adafruit_wiznet5k.adafruit_wiznet5k import SNMR_UDP
+
+CHIPS = {"w5500": 8, "w5100s": 4, "w6100": 8}
+
+
+def test_chip_detected(interface):
+    sim, eth = interface
+    assert eth.chip == sim.chip
+    assert eth.max_sockets == CHIPS[sim.chip]
+
+
+def test_network_registers_at_chip_addresses(interface):
+    sim, eth = interface
+    eth.ifconfig = ((10, 0, 0, 2), (255, 255, 255, 0), (10, 0, 0, 1), (10, 0, 0, 3))
+    eth.mac_address = "02:00:00:00:00:01"
+    assert sim.common_register("SIPR", 4) == 0x0A000002
+    assert sim.common_register("SUBR", 4) == 0xFFFFFF00
+    assert sim.common_register("GAR", 4) == 0x0A000001
+    assert sim.common_register("SHAR", 6) == 0x020000000001
+    eth.rtr = 1000
+    eth.rcr = 5
+    assert sim.common_register("RTR", 2) == 1000
+    assert sim.common_register("RCR") == 5
+    assert (eth.rtr, eth.rcr) == (1000, 5)
+
+
+def test_socket_registers_at_socket_addresses(interface):
+    sim, eth = interface
+    for sock in range(eth.max_sockets):
+        eth.socket_set_destination(sock, bytes((10, 0, 0, sock)), 5000 + sock)
+    for sock in range(eth.max_sockets):
+        assert sim.socket_register(sock, "Sn_DIPR", 4) == 0x0A000000 + sock
+        assert sim.socket_register(sock, "Sn_DPORT", 2) == 5000 + sock
+        assert eth.remote_ip(sock) == "10.0.0.%d" % sock
+        assert eth.remote_port(sock) == 5000 + sock
+
+
+def test_chip_rebound_after_reset(interface):
+    sim, eth = interface
+    eth.sw_reset()
+    assert eth.chip == sim.chip
+    eth.socket_set_destination(eth.max_sockets - 1, b"\x0a\x00\x00\x09", 9)
+    assert sim.socket_register(eth.max_sockets - 1, "Sn_DPORT", 2) == 9
+
+
+def test_socket_number_out_of_range(interface):
+    _, eth = interface
+    with pytest.raises(ValueError):
+        eth.socket_set_destination(eth.max_sockets, b"\x0a\x00\x00\x01", 1)
+
+
+def test_network_configuration_read_from_shadow_copy(interface):
+    sim, eth = interface
+    eth.mac_address = "02:00:00:00:00:01"
+    assert eth.ifconfig[0] == bytes((127, 0, 0, 1))
+    sim.reset_statistics()
+    for _ in range(10):
+        assert eth.ip_address == bytes((127, 0, 0, 1))
+        assert eth.mac_address == bytes((2, 0, 0, 0, 0, 1))
+        assert eth.ifconfig[1] == bytes((255, 0, 0, 0))
+    assert sim.transactions == 0
+
+
+def test_shadow_copy_cleared_on_reset(interface):
+    _, eth = interface
+    assert eth.ip_address == bytes((127, 0, 0, 1))
+    eth.sw_reset()
+    # The chip's registers are back to their defaults, and so is what is read.
+    assert eth.ip_address == bytes(4)
+    assert eth.ifconfig[2] == bytes(4)
+
+
+def test_link_callback_called_when_link_changes(interface):
+    sim, eth = interface
+    events = []
+    eth.link_callback = events.append
+    assert eth.link_status
+    events.clear()
+    sim.link = False
+    assert not eth.link_status
+    assert not eth.link_status
+    sim.link = True
+    assert eth.link_status
+    assert eth.link_status
+    assert events == [False, True]
+
+
+def test_link_checked_at_interval_while_up(interface):
+    sim, eth = interface
+    events = []
+    eth.link_callback = events.append
+    eth.link_check_interval = 0.1
+    assert eth.link_status
+    events.clear()
+    sock = eth.get_socket()
+    sim.link = False
+    # The link was up less than link_check_interval ago, the PHY is not read.
+    eth.socket_open(sock, SNMR_UDP)
+    eth.socket_close(sock)
+    assert not events
+    time.sleep(0.1)
+    with pytest.raises(ConnectionError):
+        eth.socket_open(sock, SNMR_UDP)
+    assert events == [False]
+    # While the link is down the PHY is read on every call.
+    sim.link = True
+    eth.socket_open(sock, SNMR_UDP)
+    eth.socket_close(sock)
+    assert events == [False, True]
+
+
+def test_sockets_reserved_until_released(interface):
+    _, eth = interface
+    # Socket 0 is handed out for unreserved use, and is never reserved.
+    assert eth.get_socket() == 0
+    reserved = [eth.get_socket(reserve_socket=True) for _ in range(eth.max_sockets - 1)]
+    assert reserved == list(range(1, eth.max_sockets))
+    with pytest.raises(RuntimeError):
+        eth.get_socket(reserve_socket=True)
+    assert eth.get_socket() == 0
+    # Released sockets are reused in the order they were released.
+    eth.release_socket(2)
+    eth.release_socket(1)
+    eth.release_socket(1)
+    assert eth.get_socket(reserve_socket=True) == 2
+    assert eth.get_socket(reserve_socket=True) == 1
+    with pytest.raises(RuntimeError):
+        eth.get_socket(reserve_socket=True)
+
+
+def test_open_unreserved_socket_not_allocated(interface):
+    _, eth = interface
+    # An unreserved socket in use, e.g. by the DNS client, is skipped.
+    eth.socket_open(0, SNMR_UDP)
+    eth.socket_open(1, SNMR_UDP)
+    assert eth.get_socket() == 2
+    assert eth.get_socket(reserve_socket=True) == 2
+    eth.socket_close(1)
+    assert eth.get_socket(reserve_socket=True) == 1
+    eth.socket_close(0)
+    assert eth.get_socket() == 0